@@ -0,0 +1,317 @@
+"""baseline：应用模型对应的全部表
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 19:07:33.713953
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 已有库（由 docs/omms.sql 或旧版 create_all 建表）只补建缺失的表
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'departments' not in existing:
+        op.create_table('departments',
+        sa.Column('dept_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('dept_name', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('parent_id', sa.Integer(), nullable=True),
+        sa.Column('sort_order', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('dept_id')
+        )
+        op.create_index(op.f('ix_departments_dept_name'), 'departments', ['dept_name'], unique=True)
+
+    if 'medicines' not in existing:
+        op.create_table('medicines',
+        sa.Column('medicine_id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('medicine_name', sa.String(length=100), nullable=False),
+        sa.Column('specification', sa.String(length=100), nullable=False),
+        sa.Column('dosage_form', sa.String(length=50), nullable=False),
+        sa.Column('manufacturer', sa.String(length=100), nullable=False),
+        sa.Column('unit', sa.String(length=20), nullable=False),
+        sa.Column('price', sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column('warning_stock', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('medicine_id')
+        )
+
+    if 'pharmacy_prescriptions' not in existing:
+        op.create_table('pharmacy_prescriptions',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('patient', sa.String(length=50), nullable=False),
+        sa.Column('department', sa.String(length=50), nullable=False),
+        sa.Column('doctor', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'record_templates' not in existing:
+        op.create_table('record_templates',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('scope', sa.String(length=50), nullable=False),
+        sa.Column('fields_json', sa.Text(), nullable=True),
+        sa.Column('defaults_json', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_record_templates_name'), 'record_templates', ['name'], unique=False)
+        op.create_index(op.f('ix_record_templates_scope'), 'record_templates', ['scope'], unique=False)
+
+    if 'records' not in existing:
+        op.create_table('records',
+        sa.Column('id', sa.String(length=24), nullable=False),
+        sa.Column('dept_id', sa.Integer(), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=True),
+        sa.Column('patient_name', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.String(length=19), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('template_id', sa.Integer(), nullable=True),
+        sa.Column('chief_complaint', sa.Text(), nullable=True),
+        sa.Column('diagnosis', sa.Text(), nullable=True),
+        sa.Column('prescriptions_json', sa.Text(), nullable=True),
+        sa.Column('labs_json', sa.Text(), nullable=True),
+        sa.Column('imaging_json', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_records_created_at'), 'records', ['created_at'], unique=False)
+        op.create_index(op.f('ix_records_dept_id'), 'records', ['dept_id'], unique=False)
+        op.create_index(op.f('ix_records_doctor_id'), 'records', ['doctor_id'], unique=False)
+        op.create_index(op.f('ix_records_patient_name'), 'records', ['patient_name'], unique=False)
+        op.create_index(op.f('ix_records_status'), 'records', ['status'], unique=False)
+        op.create_index(op.f('ix_records_template_id'), 'records', ['template_id'], unique=False)
+
+    if 'suppliers' not in existing:
+        op.create_table('suppliers',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('contact', sa.String(length=50), nullable=True),
+        sa.Column('phone', sa.String(length=30), nullable=True),
+        sa.Column('address', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'users' not in existing:
+        op.create_table('users',
+        sa.Column('user_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('password', sa.String(length=255), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('real_name', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('last_login_at', sa.DateTime(), nullable=True),
+        sa.Column('role_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('user_id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('phone')
+        )
+        op.create_index(op.f('ix_users_role_id'), 'users', ['role_id'], unique=False)
+        op.create_index(op.f('ix_users_status'), 'users', ['status'], unique=False)
+        op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    if 'doctors' not in existing:
+        op.create_table('doctors',
+        sa.Column('doctor_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('doctor_name', sa.String(length=50), nullable=False),
+        sa.Column('dept_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=50), nullable=True),
+        sa.Column('specialty', sa.String(length=100), nullable=True),
+        sa.Column('introduction', sa.Text(), nullable=True),
+        sa.Column('available_status', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['dept_id'], ['departments.dept_id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+        sa.PrimaryKeyConstraint('doctor_id')
+        )
+        op.create_index(op.f('ix_doctors_available_status'), 'doctors', ['available_status'], unique=False)
+        op.create_index(op.f('ix_doctors_dept_id'), 'doctors', ['dept_id'], unique=False)
+        op.create_index(op.f('ix_doctors_doctor_name'), 'doctors', ['doctor_name'], unique=False)
+        op.create_index(op.f('ix_doctors_user_id'), 'doctors', ['user_id'], unique=True)
+
+    if 'inventory_batches' not in existing:
+        op.create_table('inventory_batches',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('medicine_id', sa.BigInteger(), nullable=False),
+        sa.Column('batch_no', sa.String(length=50), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('received_at', sa.Date(), nullable=False),
+        sa.Column('expiry_date', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['medicine_id'], ['medicines.medicine_id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_inventory_batches_medicine_id'), 'inventory_batches', ['medicine_id'], unique=False)
+
+    if 'inventory_logs' not in existing:
+        op.create_table('inventory_logs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('type', sa.String(length=8), nullable=False),
+        sa.Column('medicine_id', sa.BigInteger(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('time', sa.DateTime(), nullable=True),
+        sa.Column('note', sa.String(length=255), nullable=True),
+        sa.Column('batch_no', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['medicine_id'], ['medicines.medicine_id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_inventory_logs_medicine_id'), 'inventory_logs', ['medicine_id'], unique=False)
+
+    if 'medicine_stocks' not in existing:
+        op.create_table('medicine_stocks',
+        sa.Column('stock_id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('medicine_id', sa.BigInteger(), nullable=False),
+        sa.Column('current_stock', sa.Integer(), nullable=False),
+        sa.Column('last_stock_in_time', sa.DateTime(), nullable=True),
+        sa.Column('last_stock_out_time', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['medicine_id'], ['medicines.medicine_id'], ),
+        sa.PrimaryKeyConstraint('stock_id')
+        )
+        op.create_index(op.f('ix_medicine_stocks_medicine_id'), 'medicine_stocks', ['medicine_id'], unique=True)
+
+    if 'patients' not in existing:
+        op.create_table('patients',
+        sa.Column('patient_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('gender', sa.Integer(), nullable=True),
+        sa.Column('birthday', sa.Date(), nullable=True),
+        sa.Column('id_card', sa.String(length=18), nullable=True),
+        sa.Column('address', sa.String(length=255), nullable=True),
+        sa.Column('emergency_contact', sa.String(length=50), nullable=True),
+        sa.Column('emergency_phone', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+        sa.PrimaryKeyConstraint('patient_id'),
+        sa.UniqueConstraint('id_card')
+        )
+        op.create_index(op.f('ix_patients_name'), 'patients', ['name'], unique=False)
+        op.create_index(op.f('ix_patients_user_id'), 'patients', ['user_id'], unique=True)
+
+    if 'prescription_items' not in existing:
+        op.create_table('prescription_items',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('prescription_id', sa.String(length=32), nullable=False),
+        sa.Column('medicine_id', sa.BigInteger(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=True),
+        sa.Column('qty', sa.Integer(), nullable=False),
+        sa.Column('unit', sa.String(length=20), nullable=True),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['medicine_id'], ['medicines.medicine_id'], ),
+        sa.ForeignKeyConstraint(['prescription_id'], ['pharmacy_prescriptions.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_prescription_items_prescription_id'), 'prescription_items', ['prescription_id'], unique=False)
+
+    if 'supplier_orders' not in existing:
+        op.create_table('supplier_orders',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('supplier_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_supplier_orders_supplier_id'), 'supplier_orders', ['supplier_id'], unique=False)
+
+    if 'doctor_schedules' not in existing:
+        op.create_table('doctor_schedules',
+        sa.Column('schedule_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('work_date', sa.Date(), nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=False),
+        sa.Column('end_time', sa.Time(), nullable=False),
+        sa.Column('max_appointments', sa.Integer(), nullable=False),
+        sa.Column('booked', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['doctor_id'], ['doctors.doctor_id'], ),
+        sa.PrimaryKeyConstraint('schedule_id')
+        )
+        op.create_index(op.f('ix_doctor_schedules_doctor_id'), 'doctor_schedules', ['doctor_id'], unique=False)
+        op.create_index(op.f('ix_doctor_schedules_status'), 'doctor_schedules', ['status'], unique=False)
+        op.create_index(op.f('ix_doctor_schedules_work_date'), 'doctor_schedules', ['work_date'], unique=False)
+
+    if 'supplier_order_items' not in existing:
+        op.create_table('supplier_order_items',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('order_id', sa.String(length=32), nullable=False),
+        sa.Column('medicine_id', sa.BigInteger(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=True),
+        sa.Column('qty', sa.Integer(), nullable=False),
+        sa.Column('unit', sa.String(length=20), nullable=True),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['medicine_id'], ['medicines.medicine_id'], ),
+        sa.ForeignKeyConstraint(['order_id'], ['supplier_orders.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_supplier_order_items_order_id'), 'supplier_order_items', ['order_id'], unique=False)
+
+    if 'appointments' not in existing:
+        op.create_table('appointments',
+        sa.Column('appt_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('schedule_id', sa.Integer(), nullable=False),
+        sa.Column('appt_time', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.Integer(), nullable=False),
+        sa.Column('symptom_desc', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['doctor_id'], ['doctors.doctor_id'], ),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.patient_id'], ),
+        sa.ForeignKeyConstraint(['schedule_id'], ['doctor_schedules.schedule_id'], ),
+        sa.PrimaryKeyConstraint('appt_id')
+        )
+        op.create_index(op.f('ix_appointments_appt_time'), 'appointments', ['appt_time'], unique=False)
+        op.create_index(op.f('ix_appointments_doctor_id'), 'appointments', ['doctor_id'], unique=False)
+        op.create_index(op.f('ix_appointments_patient_id'), 'appointments', ['patient_id'], unique=False)
+        op.create_index(op.f('ix_appointments_schedule_id'), 'appointments', ['schedule_id'], unique=False)
+        op.create_index(op.f('ix_appointments_status'), 'appointments', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('appointments')
+    op.drop_table('supplier_order_items')
+    op.drop_table('doctor_schedules')
+    op.drop_table('supplier_orders')
+    op.drop_table('prescription_items')
+    op.drop_table('patients')
+    op.drop_table('medicine_stocks')
+    op.drop_table('inventory_logs')
+    op.drop_table('inventory_batches')
+    op.drop_table('doctors')
+    op.drop_table('users')
+    op.drop_table('suppliers')
+    op.drop_table('records')
+    op.drop_table('record_templates')
+    op.drop_table('pharmacy_prescriptions')
+    op.drop_table('medicines')
+    op.drop_table('departments')
@@ -0,0 +1,73 @@
+"""legacy columns：补齐 docs/omms.sql 旧表结构与模型的差异（原 scripts/init_db.py migrate_schema_with_mysql）
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _try(sql: str) -> None:
+    # 旧库的索引/外键可能已手工补过，与原脚本一致忽略失败
+    try:
+        op.execute(sql)
+    except sa.exc.DBAPIError:
+        pass
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        # 其他方言的表只会由 0001 按模型创建，不存在旧结构
+        return
+    insp = sa.inspect(bind)
+    tables = set(insp.get_table_names())
+
+    def columns(table: str) -> set[str]:
+        return {c["name"] for c in insp.get_columns(table)}
+
+    if "departments" in tables:
+        cols = columns("departments")
+        if "parent_id" not in cols:
+            op.execute("ALTER TABLE departments ADD COLUMN parent_id BIGINT(20) NULL DEFAULT NULL AFTER description")
+        if "sort_order" not in cols:
+            op.execute("ALTER TABLE departments ADD COLUMN sort_order INT(11) NULL DEFAULT 0 AFTER parent_id")
+    if "doctors" in tables:
+        cols = columns("doctors")
+        if "doctor_name" not in cols:
+            if "name" in cols:
+                op.execute("ALTER TABLE doctors CHANGE COLUMN name doctor_name VARCHAR(50) NOT NULL")
+            else:
+                op.execute("ALTER TABLE doctors ADD COLUMN doctor_name VARCHAR(50) NOT NULL AFTER user_id")
+        if "dept_id" not in cols:
+            op.execute("ALTER TABLE doctors ADD COLUMN dept_id BIGINT(20) NULL AFTER doctor_name")
+            _try("ALTER TABLE doctors ADD INDEX idx_doctors_dept_id (dept_id)")
+            _try("ALTER TABLE doctors ADD CONSTRAINT doctors_ibfk_2 FOREIGN KEY (dept_id) REFERENCES departments(dept_id) ON DELETE RESTRICT ON UPDATE RESTRICT")
+            _try("UPDATE doctors d LEFT JOIN departments dep ON dep.dept_name = d.department SET d.dept_id = dep.dept_id")
+        if "intro" in cols and "introduction" not in cols:
+            op.execute("ALTER TABLE doctors CHANGE COLUMN intro introduction TEXT NULL")
+        if "department" in cols:
+            _try("ALTER TABLE doctors DROP COLUMN department")
+    if "doctor_schedules" in tables:
+        if "booked" not in columns("doctor_schedules"):
+            op.execute("ALTER TABLE doctor_schedules ADD COLUMN booked INT(11) NULL DEFAULT 0 AFTER max_appointments")
+    if "appointments" in tables:
+        if "schedule_id" not in columns("appointments"):
+            op.execute("ALTER TABLE appointments ADD COLUMN schedule_id BIGINT(20) NULL AFTER doctor_id")
+            _try("ALTER TABLE appointments ADD INDEX idx_appointments_schedule_id (schedule_id)")
+            _try("ALTER TABLE appointments ADD CONSTRAINT appointments_ibfk_3 FOREIGN KEY (schedule_id) REFERENCES doctor_schedules(schedule_id) ON DELETE CASCADE ON UPDATE RESTRICT")
+
+
+def downgrade() -> None:
+    # 旧结构补丁不可逆
+    pass
@@ -0,0 +1,51 @@
+"""composite indexes：按接口的实际筛选/排序组合补充联合索引
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 19:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_appointments_schedule_id_status', 'appointments', ['schedule_id', 'status']),
+    ('ix_appointments_patient_id_appt_time', 'appointments', ['patient_id', 'appt_time']),
+    ('ix_appointments_doctor_id_appt_time', 'appointments', ['doctor_id', 'appt_time']),
+    ('ix_doctor_schedules_doctor_id_work_date', 'doctor_schedules', ['doctor_id', 'work_date']),
+    ('ix_records_dept_id_created_at', 'records', ['dept_id', 'created_at']),
+    ('ix_records_doctor_id_created_at', 'records', ['doctor_id', 'created_at']),
+    ('ix_records_status_created_at', 'records', ['status', 'created_at']),
+    ('ix_inventory_logs_type_id', 'inventory_logs', ['type', 'id']),
+    ('ix_pharmacy_prescriptions_status_created_at', 'pharmacy_prescriptions', ['status', 'created_at']),
+    ('ix_pharmacy_prescriptions_created_at', 'pharmacy_prescriptions', ['created_at']),
+    ('ix_inventory_batches_expiry_date', 'inventory_batches', ['expiry_date']),
+]
+
+
+def upgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # docs/omms.sql 建的旧表已有 uk_doctor_time(doctor_id, appt_time)、uk_doctor_date(doctor_id, work_date)，
+        # 列组合相同的索引不重复创建
+        existing = [ix['column_names'] for ix in insp.get_indexes(table)]
+        existing += [uc['column_names'] for uc in insp.get_unique_constraints(table)]
+        if columns in existing:
+            continue
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    for name, table, _ in reversed(INDEXES):
+        if name in {ix['name'] for ix in insp.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,36 @@
+"""resource versions：ETag / Last-Modified 使用的资源版本号表
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 20:10:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+RESOURCES = ['departments', 'doctors', 'record-templates', 'record-dictionaries', 'suppliers']
+
+
+def upgrade() -> None:
+    table = op.create_table('resource_versions',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    now = datetime.now().replace(microsecond=0)
+    op.bulk_insert(table, [{'name': name, 'version': 1, 'updated_at': now} for name in RESOURCES])
+
+
+def downgrade() -> None:
+    op.drop_table('resource_versions')
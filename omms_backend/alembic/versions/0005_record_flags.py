@@ -0,0 +1,45 @@
+"""record flags：records 增加 has_lab / has_imaging 标记列及联合索引，按 JSON 列回填
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FLAGS = [
+    ('has_lab', 'labs_json', 'ix_records_has_lab_created_at'),
+    ('has_imaging', 'imaging_json', 'ix_records_has_imaging_created_at'),
+]
+
+
+def upgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    columns = {c['name'] for c in insp.get_columns('records')}
+    indexes = {ix['name'] for ix in insp.get_indexes('records')}
+    for column, source, index in FLAGS:
+        if column not in columns:
+            op.add_column('records', sa.Column(column, sa.Boolean(), nullable=False, server_default=sa.text('0')))
+        # 与原列表接口的判断一致：JSON 文本长于 "[]" 即视为有项目
+        op.execute(f"UPDATE records SET {column} = 1 WHERE COALESCE(LENGTH({source}), 0) > 2")
+        if index not in indexes:
+            op.create_index(index, 'records', [column, 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    indexes = {ix['name'] for ix in insp.get_indexes('records')}
+    for column, _, index in reversed(FLAGS):
+        if index in indexes:
+            op.drop_index(index, table_name='records')
+        op.drop_column('records', column)
@@ -0,0 +1,72 @@
+"""record created_at datetime：records.created_at 由 VARCHAR(19) 改为 DATETIME 并回填
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 23:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 包含 created_at 的索引，换列前删除、换列后按原样重建
+INDEXES = [
+    ('ix_records_created_at', ['created_at']),
+    ('ix_records_dept_id_created_at', ['dept_id', 'created_at']),
+    ('ix_records_doctor_id_created_at', ['doctor_id', 'created_at']),
+    ('ix_records_status_created_at', ['status', 'created_at']),
+    ('ix_records_has_lab_created_at', ['has_lab', 'created_at']),
+    ('ix_records_has_imaging_created_at', ['has_imaging', 'created_at']),
+]
+
+# 原值为 "YYYY-MM-DD HH:MM"（个别为带秒的 19 位）；SQLite 按 SQLAlchemy 的 DateTime 存储格式写入文本
+TO_DATETIME = {
+    'mysql': "CAST(created_at AS DATETIME)",
+    'sqlite': "strftime('%Y-%m-%d %H:%M:%S.000000', created_at)",
+}
+TO_STRING = {
+    'mysql': "DATE_FORMAT(created_at, '%Y-%m-%d %H:%i')",
+    'sqlite': "strftime('%Y-%m-%d %H:%M', created_at)",
+}
+
+
+def _swap_column(new_type, expressions: dict) -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    existing = {ix['name'] for ix in insp.get_indexes('records')}
+    for name, _ in INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name='records')
+
+    op.add_column('records', sa.Column('created_at_new', new_type, nullable=True))
+    op.execute(f"UPDATE records SET created_at_new = {expressions.get(bind.dialect.name, 'created_at')}")
+    bad = bind.execute(
+        sa.text("SELECT id, created_at FROM records WHERE created_at_new IS NULL AND created_at IS NOT NULL LIMIT 5")
+    ).all()
+    if bad:
+        raise RuntimeError(f"records.created_at 存在无法转换的值，请先修正后再迁移: {bad}")
+
+    with op.batch_alter_table('records') as batch:
+        batch.drop_column('created_at')
+        batch.alter_column('created_at_new', new_column_name='created_at', existing_type=new_type, nullable=False)
+    for name, columns in INDEXES:
+        op.create_index(name, 'records', columns, unique=False)
+
+
+def upgrade() -> None:
+    column = {c['name']: c for c in sa.inspect(op.get_bind()).get_columns('records')}['created_at']
+    if isinstance(column['type'], sa.DateTime):
+        return
+    _swap_column(sa.DateTime(), TO_DATETIME)
+
+
+def downgrade() -> None:
+    _swap_column(sa.String(length=19), TO_STRING)
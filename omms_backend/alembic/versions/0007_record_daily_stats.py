@@ -0,0 +1,50 @@
+"""record daily stats：按日期/科室/医生汇总的病历数表，并由 records 回填
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('record_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('dept_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('doctor_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('total', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('draft', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('finalized', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('cancelled', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('with_lab', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('with_imaging', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'dept_id', 'doctor_id')
+    )
+    op.create_index('ix_record_daily_stats_dept_id_day', 'record_daily_stats', ['dept_id', 'day'], unique=False)
+    op.create_index('ix_record_daily_stats_doctor_id_day', 'record_daily_stats', ['doctor_id', 'day'], unique=False)
+    op.execute(
+        "INSERT INTO record_daily_stats (day, dept_id, doctor_id, total, draft, finalized, cancelled, with_lab, with_imaging) "
+        "SELECT DATE(created_at), dept_id, doctor_id, COUNT(*), "
+        "SUM(CASE WHEN status = 'draft' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN status = 'finalized' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN has_lab THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN has_imaging THEN 1 ELSE 0 END) "
+        "FROM records GROUP BY DATE(created_at), dept_id, doctor_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_record_daily_stats_doctor_id_day', table_name='record_daily_stats')
+    op.drop_index('ix_record_daily_stats_dept_id_day', table_name='record_daily_stats')
+    op.drop_table('record_daily_stats')
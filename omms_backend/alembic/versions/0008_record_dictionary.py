@@ -0,0 +1,69 @@
+"""record dictionary：检验/影像项目词典及引用次数表，并由 records 与模板回填
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 01:10:00.000000
+
+"""
+import json
+from collections import Counter
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NAME_MAX_LENGTH = 160
+
+
+def _names(values) -> set:
+    if not isinstance(values, list):
+        return set()
+    return {v.strip()[:NAME_MAX_LENGTH] for v in values if isinstance(v, str) and v.strip()}
+
+
+def _loads(text_val, default):
+    try:
+        return json.loads(text_val) if text_val else default
+    except Exception:
+        return default
+
+
+def upgrade() -> None:
+    dictionary = op.create_table('record_dictionary',
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=NAME_MAX_LENGTH), nullable=False),
+    sa.Column('usage_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'name')
+    )
+    op.create_index('ix_record_dictionary_kind_usage_count', 'record_dictionary', ['kind', 'usage_count'], unique=False)
+
+    # 项目名在 JSON 数组中，SQL 无法在 MySQL 5.5 上展开，逐行解析后批量写入
+    bind = op.get_bind()
+    counts: Counter = Counter()
+    records = bind.execute(
+        sa.text("SELECT labs_json, imaging_json FROM records WHERE has_lab = 1 OR has_imaging = 1")
+        .execution_options(yield_per=1000)
+    )
+    for labs_json, imaging_json in records:
+        counts.update(('labs', name) for name in _names(_loads(labs_json, [])))
+        counts.update(('imaging', name) for name in _names(_loads(imaging_json, [])))
+    for (defaults_json,) in bind.execute(sa.text("SELECT defaults_json FROM record_templates")):
+        defaults = _loads(defaults_json, {})
+        if isinstance(defaults, dict):
+            for kind in ('labs', 'imaging'):
+                counts.update((kind, name) for name in _names(defaults.get(kind)))
+    if counts:
+        op.bulk_insert(dictionary, [
+            {'kind': kind, 'name': name, 'usage_count': n} for (kind, name), n in counts.items()
+        ])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_record_dictionary_kind_usage_count', table_name='record_dictionary')
+    op.drop_table('record_dictionary')
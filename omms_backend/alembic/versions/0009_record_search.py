@@ -0,0 +1,66 @@
+"""record search：主诉/诊断全文索引（SQLite FTS5 trigram 虚表，MySQL 5.7.6+ FULLTEXT ngram）
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 02:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FULLTEXT_MIN_VERSION = (5, 7, 6)
+
+
+def _mysql_fulltext(bind) -> bool:
+    return bind.dialect.name == 'mysql' and (bind.dialect.server_version_info or ()) >= FULLTEXT_MIN_VERSION
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # 外部内容表：只存索引，正文取自 records；由触发器随 records 写入同步（含绕过 ORM 的批量写入）
+        op.execute(
+            "CREATE VIRTUAL TABLE records_fts USING fts5("
+            "chief_complaint, diagnosis, content='records', content_rowid='rowid', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER records_fts_ai AFTER INSERT ON records BEGIN "
+            "INSERT INTO records_fts(rowid, chief_complaint, diagnosis) "
+            "VALUES (new.rowid, new.chief_complaint, new.diagnosis); END"
+        )
+        op.execute(
+            "CREATE TRIGGER records_fts_ad AFTER DELETE ON records BEGIN "
+            "INSERT INTO records_fts(records_fts, rowid, chief_complaint, diagnosis) "
+            "VALUES ('delete', old.rowid, old.chief_complaint, old.diagnosis); END"
+        )
+        op.execute(
+            "CREATE TRIGGER records_fts_au AFTER UPDATE OF chief_complaint, diagnosis ON records BEGIN "
+            "INSERT INTO records_fts(records_fts, rowid, chief_complaint, diagnosis) "
+            "VALUES ('delete', old.rowid, old.chief_complaint, old.diagnosis); "
+            "INSERT INTO records_fts(rowid, chief_complaint, diagnosis) "
+            "VALUES (new.rowid, new.chief_complaint, new.diagnosis); END"
+        )
+        op.execute("INSERT INTO records_fts(records_fts) VALUES('rebuild')")
+    elif _mysql_fulltext(bind):
+        op.execute("ALTER TABLE records ADD FULLTEXT INDEX ix_records_fulltext (chief_complaint, diagnosis) WITH PARSER ngram")
+    # 其他数据库（含 MySQL 5.5）不建索引，/records/search 退回 LIKE
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for trigger in ('records_fts_au', 'records_fts_ad', 'records_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS records_fts")
+    elif bind.dialect.name == 'mysql':
+        # 在旧版本上升级时未建索引，按实际存在与否删除
+        if any(ix['name'] == 'ix_records_fulltext' for ix in sa.inspect(bind).get_indexes('records')):
+            op.drop_index('ix_records_fulltext', table_name='records')
@@ -0,0 +1,38 @@
+"""department sort_order：回填 NULL 并改为 NOT NULL（0002 在旧库上补的列允许 NULL）
+
+科室列表按 (sort_order, dept_id) 做游标分页，sort_order 为 NULL 的行不满足游标的元组比较，会从后续页中丢失
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 04:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    column = next(c for c in sa.inspect(bind).get_columns('departments') if c['name'] == 'sort_order')
+    if not column['nullable']:
+        # 0001 按模型建的表本就是 NOT NULL
+        return
+    op.execute("UPDATE departments SET sort_order = 0 WHERE sort_order IS NULL")
+    if bind.dialect.name == 'mysql':
+        op.execute("ALTER TABLE departments MODIFY COLUMN sort_order INT(11) NOT NULL DEFAULT 0")
+    else:
+        with op.batch_alter_table('departments') as batch:
+            batch.alter_column('sort_order', existing_type=sa.Integer(), nullable=False, server_default=sa.text('0'))
+
+
+def downgrade() -> None:
+    # 回填前哪些行为 NULL 已无从得知，NOT NULL 与模型一致，降级时保留
+    pass
@@ -0,0 +1,91 @@
+"""record search stable rowid：SQLite FTS5 索引改用独立的整数键，不再依赖 records 的隐式 rowid
+
+records 以字符串为主键，VACUUM 可能重排其隐式 rowid，0009 的外部内容表随之指向错误的病历。
+改为 records_fts_ids 映射表（INTEGER PRIMARY KEY 即 rowid 别名，VACUUM 不会改变）分配键，
+records_fts 改为自存正文的普通 FTS5 表，不再从 records 按 rowid 回读
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 05:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = ('records_fts_au', 'records_fts_ad', 'records_fts_ai')
+_SEARCH_ID = "(SELECT search_id FROM records_fts_ids WHERE record_id = {}.id)"
+
+
+def _drop() -> None:
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS records_fts")
+    op.execute("DROP TABLE IF EXISTS records_fts_ids")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _drop()
+    op.execute(
+        "CREATE TABLE records_fts_ids ("
+        "search_id INTEGER PRIMARY KEY, record_id VARCHAR(24) NOT NULL UNIQUE)"
+    )
+    op.execute("CREATE VIRTUAL TABLE records_fts USING fts5(chief_complaint, diagnosis, tokenize='trigram')")
+    new_id, old_id = _SEARCH_ID.format('new'), _SEARCH_ID.format('old')
+    op.execute(
+        "CREATE TRIGGER records_fts_ai AFTER INSERT ON records BEGIN "
+        "INSERT INTO records_fts_ids(record_id) VALUES (new.id); "
+        f"INSERT INTO records_fts(rowid, chief_complaint, diagnosis) VALUES ({new_id}, new.chief_complaint, new.diagnosis); END"
+    )
+    op.execute(
+        "CREATE TRIGGER records_fts_ad AFTER DELETE ON records BEGIN "
+        f"DELETE FROM records_fts WHERE rowid = {old_id}; "
+        "DELETE FROM records_fts_ids WHERE record_id = old.id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER records_fts_au AFTER UPDATE OF id, chief_complaint, diagnosis ON records BEGIN "
+        "UPDATE records_fts_ids SET record_id = new.id WHERE record_id = old.id; "
+        f"UPDATE records_fts SET chief_complaint = new.chief_complaint, diagnosis = new.diagnosis WHERE rowid = {new_id}; END"
+    )
+    op.execute("INSERT INTO records_fts_ids(record_id) SELECT id FROM records")
+    op.execute(
+        "INSERT INTO records_fts(rowid, chief_complaint, diagnosis) "
+        "SELECT m.search_id, r.chief_complaint, r.diagnosis FROM records_fts_ids m JOIN records r ON r.id = m.record_id"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _drop()
+    # 恢复 0009 的外部内容表与触发器
+    op.execute(
+        "CREATE VIRTUAL TABLE records_fts USING fts5("
+        "chief_complaint, diagnosis, content='records', content_rowid='rowid', tokenize='trigram')"
+    )
+    op.execute(
+        "CREATE TRIGGER records_fts_ai AFTER INSERT ON records BEGIN "
+        "INSERT INTO records_fts(rowid, chief_complaint, diagnosis) "
+        "VALUES (new.rowid, new.chief_complaint, new.diagnosis); END"
+    )
+    op.execute(
+        "CREATE TRIGGER records_fts_ad AFTER DELETE ON records BEGIN "
+        "INSERT INTO records_fts(records_fts, rowid, chief_complaint, diagnosis) "
+        "VALUES ('delete', old.rowid, old.chief_complaint, old.diagnosis); END"
+    )
+    op.execute(
+        "CREATE TRIGGER records_fts_au AFTER UPDATE OF chief_complaint, diagnosis ON records BEGIN "
+        "INSERT INTO records_fts(records_fts, rowid, chief_complaint, diagnosis) "
+        "VALUES ('delete', old.rowid, old.chief_complaint, old.diagnosis); "
+        "INSERT INTO records_fts(rowid, chief_complaint, diagnosis) "
+        "VALUES (new.rowid, new.chief_complaint, new.diagnosis); END"
+    )
+    op.execute("INSERT INTO records_fts(records_fts) VALUES('rebuild')")
@@ -3,13 +3,15 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy import func, select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from app.core.fieldsets import UnknownFieldError, parse_fields
+from app.core.pagination import CursorError, Keyset, paginate
 from app.core.response import err, ok
 from app.db.session import get_session
 from app.models.appointment import Appointment, Doctor, Department
 from app.models.patient import Patient
-from app.core.auth import get_current_user
-from app.models.user import User
+from app.core.auth import Principal, get_current_user
 from app.schemas.appointment import (
     AppointmentCreate,
     AppointmentUpdate,
@@ -21,12 +23,20 @@ from app.schemas.appointment import (
 
 router = APIRouter()
 
+APPOINTMENT_KEYSET = Keyset("appointments", (Appointment.appt_time, True), (Appointment.appt_id, True))
+
+APPOINTMENT_LIST_FIELDS = (
+    "apptId", "patientId", "patientName", "doctorId", "doctorName", "deptId", "deptName",
+    "scheduleId", "apptTime", "status", "symptomDesc", "createdAt", "updatedAt",
+)
+
 
 @router.get(
     "/appointments",
     summary="预约列表查询",
     description="查询预约列表，支持按患者、医生、状态筛选和分页查询",
     response_model=AppointmentListResponse,
+    response_model_exclude_unset=True,
 )
 async def list_appointments(
     patientId: Optional[int] = Query(default=None),
@@ -34,13 +44,18 @@ async def list_appointments(
     status: Optional[int] = Query(default=None),
     page: int = Query(default=1, ge=1),
     pageSize: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="上一页返回的 nextCursor，传入时忽略 page"),
+    totalMode: str = Query(default="exact", pattern="^(exact|estimate|none)$", description="总数：exact 精确 | estimate 估算 | none 不计算"),
+    fields: Optional[str] = Query(default=None, description="逗号分隔的返回字段，如 apptId,patientName,apptTime,status；apptId 总是返回，默认全部字段"),
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """查询预约列表"""
-    # 计算分页偏移量
-    offset = (page - 1) * pageSize
-    
+    try:
+        selected = parse_fields(fields, APPOINTMENT_LIST_FIELDS, always=("apptId",))
+    except UnknownFieldError as exc:
+        return err(400, f"不支持的字段: {exc}")
+
     # 构建查询语句
     stmt = select(
         Appointment,
@@ -58,49 +73,52 @@ async def list_appointments(
         stmt = stmt.where(Appointment.doctor_id == doctorId)
     if status is not None:
         stmt = stmt.where(Appointment.status == status)
+    if "symptomDesc" not in selected:
+        # 症状描述为 Text 列，列表未请求时不读取
+        stmt = stmt.options(defer(Appointment.symptom_desc))
 
     if current_user and current_user.role_id == 3:
         pid_res = await session.execute(select(Patient.patient_id).where(Patient.user_id == current_user.user_id))
         pid_row = pid_res.first()
         if not pid_row:
-            return ok({"list": [], "total": 0, "page": page, "pageSize": pageSize})
+            return ok({"list": [], "total": 0, "page": page, "pageSize": pageSize, "nextCursor": None})
         stmt = stmt.where(Appointment.patient_id == int(pid_row[0]))
     
-    # 查询总数
-    total_stmt = select(func.count()).select_from(stmt.subquery())
-    total_res = await session.execute(total_stmt)
-    total = int(total_res.scalar_one())
-    
-    # 查询分页数据
-    stmt = stmt.order_by(Appointment.appt_time.desc()).offset(offset).limit(pageSize)
-    res = await session.execute(stmt)
+    # 按 (appt_time, appt_id) 倒序分页，传入 cursor 时不再使用 OFFSET
+    try:
+        result = await paginate(
+            session, stmt, APPOINTMENT_KEYSET, lambda row: (row[0].appt_time, row[0].appt_id),
+            page=page, page_size=pageSize, cursor=cursor, total_mode=totalMode,
+        )
+    except CursorError:
+        return err(400, "cursor 无效")
     
     # 构建响应数据
     appointment_list = []
-    for appointment, patient_name, doctor_name, dept_name, dept_id in res:
-        appointment_list.append(
-            AppointmentOut(
-                apptId=appointment.appt_id,
-                patientId=appointment.patient_id,
-                patientName=patient_name,
-                doctorId=appointment.doctor_id,
-                doctorName=doctor_name,
-                deptId=dept_id,
-                deptName=dept_name,
-                scheduleId=appointment.schedule_id,
-                apptTime=appointment.appt_time.strftime("%Y-%m-%d %H:%M:%S") if appointment.appt_time else None,
-                status=appointment.status,
-                symptomDesc=appointment.symptom_desc,
-                createdAt=appointment.created_at,
-                updatedAt=appointment.updated_at,
-            )
-        )
+    for appointment, patient_name, doctor_name, dept_name, dept_id in result.rows:
+        item = {
+            "apptId": appointment.appt_id,
+            "patientId": appointment.patient_id,
+            "patientName": patient_name,
+            "doctorId": appointment.doctor_id,
+            "doctorName": doctor_name,
+            "deptId": dept_id,
+            "deptName": dept_name,
+            "scheduleId": appointment.schedule_id,
+            "apptTime": appointment.appt_time.strftime("%Y-%m-%d %H:%M:%S") if appointment.appt_time else None,
+            "status": appointment.status,
+            "symptomDesc": appointment.symptom_desc if "symptomDesc" in selected else None,
+            "createdAt": appointment.created_at,
+            "updatedAt": appointment.updated_at,
+        }
+        appointment_list.append({name: item[name] for name in selected})
     
     return ok({
         "list": appointment_list,
-        "total": total,
+        "total": result.total,
         "page": page,
-        "pageSize": pageSize
+        "pageSize": pageSize,
+        "nextCursor": result.next_cursor,
     })
 
 
@@ -113,7 +131,7 @@ async def list_appointments(
 async def create_appointment(
     payload: AppointmentCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """创建预约"""
     patient = await session.get(Patient, payload.patientId)
@@ -1,11 +1,13 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.etag import conditional_get
+from app.core.pagination import CursorError, Keyset, paginate
 from app.core.response import err, ok
-from app.db.session import get_session
+from app.db.session import get_read_session, get_session
 from app.models.appointment import Department
 from app.schemas.appointment import (
     DepartmentCreate,
@@ -18,35 +20,35 @@ from app.schemas.appointment import (
 
 router = APIRouter()
 
+DEPARTMENT_KEYSET = Keyset("departments", (Department.sort_order, False), (Department.dept_id, False))
+
 
 @router.get(
     "/departments",
     summary="科室列表查询",
     description="查询科室列表，支持分页查询",
     response_model=DepartmentListResponse,
+    dependencies=[Depends(conditional_get("departments"))],
 )
 async def list_departments(
     page: int = Query(default=1, ge=1),
     pageSize: int = Query(default=20, ge=1, le=100),
-    session: AsyncSession = Depends(get_session),
+    cursor: Optional[str] = Query(default=None, description="上一页返回的 nextCursor，传入时忽略 page"),
+    totalMode: str = Query(default="exact", pattern="^(exact|estimate|none)$", description="总数：exact 精确 | estimate 估算 | none 不计算"),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """查询科室列表"""
-    # 计算分页偏移量
-    offset = (page - 1) * pageSize
-    
-    # 查询总数
-    total_stmt = select(func.count()).select_from(Department)
-    total_res = await session.execute(total_stmt)
-    total = int(total_res.scalar_one())
-    
-    # 查询分页数据
-    stmt = select(Department).order_by(Department.sort_order, Department.dept_id).offset(offset).limit(pageSize)
-    res = await session.execute(stmt)
-    departments = res.scalars().all()
+    try:
+        result = await paginate(
+            session, select(Department), DEPARTMENT_KEYSET, lambda dept: (dept.sort_order, dept.dept_id),
+            page=page, page_size=pageSize, cursor=cursor, total_mode=totalMode, scalars=True,
+        )
+    except CursorError:
+        return err(400, "cursor 无效")
     
     # 构建响应数据
     department_list = []
-    for dept in departments:
+    for dept in result.rows:
         department_list.append(
             DepartmentOut(
                 deptId=dept.dept_id,
@@ -61,9 +63,10 @@ async def list_departments(
     
     return ok({
         "list": department_list,
-        "total": total,
+        "total": result.total,
         "page": page,
-        "pageSize": pageSize
+        "pageSize": pageSize,
+        "nextCursor": result.next_cursor,
     })
 
 
@@ -90,7 +93,7 @@ async def create_department(
         dept_name=payload.deptName,
         description=payload.deptDesc,
         parent_id=payload.parentId,
-        sort_order=payload.sortOrder,
+        sort_order=payload.sortOrder if payload.sortOrder is not None else 0,
         created_at=now,
         updated_at=now,
     )
@@ -118,10 +121,11 @@ async def create_department(
     summary="科室详情",
     description="根据科室ID获取科室详情",
     response_model=DepartmentResponse,
+    dependencies=[Depends(conditional_get("departments"))],
 )
 async def get_department(
     dept_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """获取科室详情"""
     department = await session.get(Department, dept_id)
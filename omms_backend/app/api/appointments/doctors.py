@@ -1,11 +1,13 @@
 from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.etag import conditional_get
+from app.core.pagination import CursorError, Keyset, paginate
 from app.core.response import err, ok
-from app.db.session import get_session
+from app.db.session import get_read_session, get_session
 from app.models.appointment import Doctor, Department, Schedule
 from app.models.user import User
 from app.models.appointment import Appointment
@@ -20,41 +22,42 @@ from app.schemas.appointment import (
 
 router = APIRouter()
 
+DOCTOR_KEYSET = Keyset("doctors", (Doctor.doctor_id, False))
+
 
 @router.get(
     "/doctors",
     summary="医生列表查询",
     description="查询医生列表，支持按科室筛选和分页查询",
     response_model=DoctorListResponse,
+    dependencies=[Depends(conditional_get("doctors"))],
 )
 async def list_doctors(
     deptId: Optional[int] = Query(default=None),
     page: int = Query(default=1, ge=1),
     pageSize: int = Query(default=20, ge=1, le=100),
-    session: AsyncSession = Depends(get_session),
+    cursor: Optional[str] = Query(default=None, description="上一页返回的 nextCursor，传入时忽略 page"),
+    totalMode: str = Query(default="exact", pattern="^(exact|estimate|none)$", description="总数：exact 精确 | estimate 估算 | none 不计算"),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """查询医生列表"""
-    # 计算分页偏移量
-    offset = (page - 1) * pageSize
-    
     # 构建查询语句
     stmt = select(Doctor, Department.dept_name).join(Department, Doctor.dept_id == Department.dept_id)
     
     if deptId:
         stmt = stmt.where(Doctor.dept_id == deptId)
     
-    # 查询总数
-    total_stmt = select(func.count()).select_from(stmt.subquery())
-    total_res = await session.execute(total_stmt)
-    total = int(total_res.scalar_one())
-    
-    # 查询分页数据
-    stmt = stmt.order_by(Doctor.doctor_id).offset(offset).limit(pageSize)
-    res = await session.execute(stmt)
+    try:
+        result = await paginate(
+            session, stmt, DOCTOR_KEYSET, lambda row: (row[0].doctor_id,),
+            page=page, page_size=pageSize, cursor=cursor, total_mode=totalMode,
+        )
+    except CursorError:
+        return err(400, "cursor 无效")
     
     # 构建响应数据
     doctor_list = []
-    for doctor, dept_name in res:
+    for doctor, dept_name in result.rows:
         doctor_list.append(
             DoctorOut(
                 doctorId=doctor.doctor_id,
@@ -71,9 +74,10 @@ async def list_doctors(
     
     return ok({
         "list": doctor_list,
-        "total": total,
+        "total": result.total,
         "page": page,
-        "pageSize": pageSize
+        "pageSize": pageSize,
+        "nextCursor": result.next_cursor,
     })
 
 
@@ -136,10 +140,11 @@ async def create_doctor(
     summary="医生详情",
     description="根据医生ID获取医生详情",
     response_model=DoctorResponse,
+    dependencies=[Depends(conditional_get("doctors"))],
 )
 async def get_doctor(
     doctor_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """获取医生详情"""
     try:
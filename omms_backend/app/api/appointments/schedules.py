@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import CursorError, Keyset, paginate
 from app.core.response import err, ok
 from app.db.session import get_session
 from app.models.appointment import Schedule, Doctor, Department, Appointment
@@ -14,6 +15,8 @@ from app.schemas.appointment import (
 
 router = APIRouter()
 
+SCHEDULE_KEYSET = Keyset("schedules", (Schedule.work_date, False), (Schedule.schedule_id, False))
+
 
 @router.get(
     "/schedules",
@@ -27,14 +30,13 @@ async def list_schedules(
     workDate: Optional[str] = Query(default=None),
     page: int = Query(default=1, ge=1),
     pageSize: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="上一页返回的 nextCursor，传入时忽略 page"),
+    totalMode: str = Query(default="exact", pattern="^(exact|estimate|none)$", description="总数：exact 精确 | estimate 估算 | none 不计算"),
     session: AsyncSession = Depends(get_session),
 ):
     """查询排班列表"""
-    # 计算分页偏移量
-    offset = (page - 1) * pageSize
-    
     # 构建查询语句
-    stmt = select(Schedule, Doctor.doctor_name, Department.dept_name).join(
+    stmt = select(Schedule, Doctor.doctor_name, Department.dept_name, Doctor.dept_id).join(
         Doctor, Schedule.doctor_id == Doctor.doctor_id
     ).join(Department, Doctor.dept_id == Department.dept_id)
     
@@ -49,25 +51,29 @@ async def list_schedules(
         except ValueError:
             return err(400, "workDate 格式错误，应为 YYYY-MM-DD")
     
-    # 查询总数
-    total_stmt = select(func.count()).select_from(stmt.subquery())
-    total_res = await session.execute(total_stmt)
-    total = int(total_res.scalar_one())
-    
-    # 查询分页数据
-    stmt = stmt.order_by(Schedule.work_date, Schedule.schedule_id).offset(offset).limit(pageSize)
-    res = await session.execute(stmt)
+    try:
+        result = await paginate(
+            session, stmt, SCHEDULE_KEYSET, lambda row: (row[0].work_date, row[0].schedule_id),
+            page=page, page_size=pageSize, cursor=cursor, total_mode=totalMode,
+        )
+    except CursorError:
+        return err(400, "cursor 无效")
     
-    # 构建响应数据
-    schedule_list = []
-    for schedule, doctor_name, dept_name in res:
-        # 查询已预约数量
-        booked_stmt = select(func.count()).select_from(Appointment).where(
-            (Appointment.schedule_id == schedule.schedule_id) & (Appointment.status != 2)  # 排除已取消的预约
+    # 构建响应数据；当前页各排班的已预约数量一次分组统计（排除已取消的预约）
+    schedule_ids = [row[0].schedule_id for row in result.rows]
+    booked_by_schedule: dict[int, int] = {}
+    if schedule_ids:
+        booked_stmt = (
+            select(Appointment.schedule_id, func.count())
+            .where(Appointment.schedule_id.in_(schedule_ids) & (Appointment.status != 2))
+            .group_by(Appointment.schedule_id)
         )
-        booked_res = await session.execute(booked_stmt)
-        booked_count = int(booked_res.scalar_one())
-        
+        booked_by_schedule = {sid: int(cnt) for sid, cnt in (await session.execute(booked_stmt)).all()}
+
+    schedule_list = []
+    for schedule, doctor_name, dept_name, dept_id in result.rows:
+        booked_count = booked_by_schedule.get(schedule.schedule_id, 0)
+
         # 将日期与时间格式化为字符串
         work_date_str = (
             schedule.work_date.strftime("%Y-%m-%d")
@@ -87,11 +93,6 @@ async def list_schedules(
         # 根据start_time和end_time生成workPeriod
         work_period = f"{start_time_str} - {end_time_str}"
         
-        # 获取医生信息以获取dept_id
-        doctor_stmt = select(Doctor.dept_id).where(Doctor.doctor_id == schedule.doctor_id)
-        doctor_res = await session.execute(doctor_stmt)
-        dept_id = doctor_res.scalar_one()
-        
         schedule_list.append(
             ScheduleOut(
                 scheduleId=schedule.schedule_id,
@@ -112,7 +113,8 @@ async def list_schedules(
     
     return ok({
         "list": schedule_list,
-        "total": total,
+        "total": result.total,
         "page": page,
-        "pageSize": pageSize
+        "pageSize": pageSize,
+        "nextCursor": result.next_cursor,
     })
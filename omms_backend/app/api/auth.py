@@ -1,14 +1,20 @@
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.metrics import record_hash_pool_rejection
 from app.core.response import err, ok
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.security import (
+    HashPoolBusy,
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+)
 from app.db.session import get_session
 from app.models.user import User
-from app.core.auth import get_current_user
+from app.core.auth import Principal, get_current_user
 from app.schemas.auth import (
     LoginRequest,
     LoginResponse,
@@ -23,6 +29,15 @@ from app.core.settings import settings
 router = APIRouter(tags=["auth"])
 
 
+def hash_pool_busy(e: HashPoolBusy) -> HTTPException:
+    record_hash_pool_rejection()
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="服务繁忙，请稍后重试",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
 @router.post(
     "/auth/register",
     summary="用户注册",
@@ -33,10 +48,14 @@ async def register(payload: RegisterRequest, session: AsyncSession = Depends(get
     exists = await session.execute(select(User).where(User.username == payload.username))
     if exists.scalars().first():
         return err(400, "用户名已存在")
+    try:
+        hashed = await get_password_hash_async(payload.password)
+    except HashPoolBusy as e:
+        raise hash_pool_busy(e)
     now = datetime.now()
     user = User(
         username=payload.username,
-        password=get_password_hash(payload.password),
+        password=hashed,
         email=payload.email,
         phone=payload.phone,
         real_name=payload.realName,
@@ -76,7 +95,11 @@ async def login(payload: LoginRequest, session: AsyncSession = Depends(get_sessi
     if user.status != 1:
         return err(403, "用户已禁用")
     # 验证用户密码
-    if not verify_password(payload.password, user.password):
+    try:
+        matched = await verify_password_async(payload.password, user.password)
+    except HashPoolBusy as e:
+        raise hash_pool_busy(e)
+    if not matched:
         return err(401, "用户名或密码错误")
     user.last_login_at = datetime.now()
     await session.commit()
@@ -109,14 +132,17 @@ async def login(payload: LoginRequest, session: AsyncSession = Depends(get_sessi
     description="返回当前登录用户的基础信息。",
     response_model=RegisterResponse,
 )
-async def me(current: User = Depends(get_current_user)):
+async def me(current: Principal = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+    user = await session.get(User, current.user_id)
+    if not user:
+        return err(404, "用户不存在")
     return ok(
         UserOut(
-            userId=current.user_id,
-            username=current.username,
-            email=current.email,
-            phone=current.phone,
-            realName=current.real_name,
-            roleId=current.role_id,
+            userId=user.user_id,
+            username=user.username,
+            email=user.email,
+            phone=user.phone,
+            realName=user.real_name,
+            roleId=user.role_id,
         )
     )
@@ -1,12 +1,14 @@
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func
+from sqlalchemy import insert, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.etag import conditional_get
+from app.core.pagination import CursorError, Keyset, paginate
 from app.core.response import ok, err
-from app.db.session import get_session
+from app.db.session import get_read_session, get_session
 from app.core.auth import require_auth
 from app.models.medicine import Medicine
 from app.models.inventory import InventoryBatch, InventoryLog, MedicineStock
@@ -32,6 +34,24 @@ from app.schemas.pharmacy import (
 
 router = APIRouter(tags=["pharmacy"], dependencies=[Depends(require_auth)])
 
+MEDICINE_KEYSET = Keyset("medicines", (Medicine.medicine_id, False))
+
+
+async def medicines_by_id(session: AsyncSession, ids: Iterable[int]) -> Dict[int, Medicine]:
+    ids = list(set(ids))
+    if not ids:
+        return {}
+    rows = (await session.execute(select(Medicine).where(Medicine.medicine_id.in_(ids)))).scalars().all()
+    return {m.medicine_id: m for m in rows}
+
+
+async def stocks_by_medicine(session: AsyncSession, ids: Iterable[int]) -> Dict[int, MedicineStock]:
+    ids = list(set(ids))
+    if not ids:
+        return {}
+    rows = (await session.execute(select(MedicineStock).where(MedicineStock.medicine_id.in_(ids)))).scalars().all()
+    return {s.medicine_id: s for s in rows}
+
 
 @router.get(
     "/pharmacy/medicines",
@@ -42,11 +62,18 @@ async def list_medicines(
     lowStockOnly: Optional[bool] = Query(default=False),
     page: int = Query(default=1, ge=1),
     pageSize: int = Query(default=100, ge=1, le=500),
+    cursor: Optional[str] = Query(default=None, description="上一页返回的 nextCursor，传入时忽略 page"),
+    totalMode: str = Query(default="exact", pattern="^(exact|estimate|none)$", description="总数：exact 精确 | estimate 估算 | none 不计算"),
     session: AsyncSession = Depends(get_session),
 ):
-    stmt = select(Medicine)
-    total = int((await session.execute(select(func.count()).select_from(stmt.subquery()))).scalar_one())
-    rows = (await session.execute(stmt.order_by(Medicine.medicine_id).offset((page - 1) * pageSize).limit(pageSize))).scalars().all()
+    try:
+        result = await paginate(
+            session, select(Medicine), MEDICINE_KEYSET, lambda m: (m.medicine_id,),
+            page=page, page_size=pageSize, cursor=cursor, total_mode=totalMode, scalars=True,
+        )
+    except CursorError:
+        return err(400, "cursor 无效")
+    rows = result.rows
     mids = [m.medicine_id for m in rows]
     stock_map = {}
     if mids:
@@ -66,7 +93,7 @@ async def list_medicines(
     ]
     if lowStockOnly:
         data = [x for x in data if (x.currentStock or 0) <= (x.warningStock or 0)]
-    return ok({"list": data, "total": total, "page": page, "pageSize": pageSize})
+    return ok({"list": data, "total": result.total, "page": page, "pageSize": pageSize, "nextCursor": result.next_cursor})
 
 
 @router.get(
@@ -76,7 +103,7 @@ async def list_medicines(
 )
 async def list_batches(
     expiringInDays: Optional[int] = Query(default=None),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     stmt = select(InventoryBatch)
     if expiringInDays is not None and expiringInDays >= 0:
@@ -113,7 +140,7 @@ async def list_batches(
 )
 async def list_logs(
     type: Optional[str] = Query(default=None),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     stmt = select(InventoryLog)
     if type in ("in", "out"):
@@ -258,16 +285,23 @@ async def update_prescription_status(pid: str, payload: UpdatePrescriptionStatus
         return err(400, "非法状态流转")
     p.status = target
     if target == "dispensed":
+        # 药品与库存按处方明细一次查出，避免逐条查询
+        med_ids = [item.medicine_id for item in p.items]
+        meds = await medicines_by_id(session, med_ids)
+        stocks = await stocks_by_medicine(session, med_ids)
+        logs = []
         for item in p.items:
-            med = (await session.execute(select(Medicine).where(Medicine.medicine_id == item.medicine_id))).scalars().first()
+            med = meds.get(item.medicine_id)
             if not med:
                 return err(404, f"药品不存在: {item.medicine_id}")
-            stock = (await session.execute(select(MedicineStock).where(MedicineStock.medicine_id == item.medicine_id))).scalars().first()
+            stock = stocks.get(item.medicine_id)
             if not stock or (stock.current_stock or 0) < item.qty:
                 return err(400, f"库存不足: {med.medicine_name}")
             stock.current_stock = int(stock.current_stock or 0) - int(item.qty)
-            log = InventoryLog(type="out", medicine_id=item.medicine_id, quantity=item.qty, note=f"处方发药 {pid}", time=datetime.now())
-            session.add(log)
+            logs.append({"type": "out", "medicine_id": item.medicine_id, "quantity": item.qty, "note": f"处方发药 {pid}", "time": datetime.now()})
+        # 出库日志批量写入，语句条数不随明细数增长
+        if logs:
+            await session.execute(insert(InventoryLog), logs)
     await session.commit()
     return ok({"id": p.id, "status": p.status})
 
@@ -276,8 +310,9 @@ async def update_prescription_status(pid: str, payload: UpdatePrescriptionStatus
     "/pharmacy/suppliers",
     summary="供应商列表",
     description="查询供应商列表",
+    dependencies=[Depends(conditional_get("suppliers"))],
 )
-async def list_suppliers(session: AsyncSession = Depends(get_session)):
+async def list_suppliers(session: AsyncSession = Depends(get_read_session)):
     rows: List[Supplier] = (await session.execute(select(Supplier).order_by(Supplier.id))).scalars().all()
     data = [
         SupplierOut(id=s.id, name=s.name, contact=s.contact, phone=s.phone, address=s.address)
@@ -349,14 +384,17 @@ async def create_order(payload: CreateOrderPayload, session: AsyncSession = Depe
     session.add(order)
     await session.flush()
     amount = 0.0
+    meds = await medicines_by_id(session, [it.medicineId for it in payload.items])
+    items = []
     for it in payload.items:
-        med = (await session.execute(select(Medicine).where(Medicine.medicine_id == it.medicineId))).scalars().first()
+        med = meds.get(it.medicineId)
         if not med:
             return err(404, f"药品不存在: {it.medicineId}")
         price = float(it.price if it.price is not None else float(med.price or 0.0))
-        item = SupplierOrderItem(order_id=order.id, medicine_id=it.medicineId, name=med.medicine_name, qty=it.qty, unit=it.unit or med.unit, price=price)
-        session.add(item)
+        items.append({"order_id": order.id, "medicine_id": it.medicineId, "name": med.medicine_name, "qty": it.qty, "unit": it.unit or med.unit, "price": price})
         amount += price * it.qty
+    if items:
+        await session.execute(insert(SupplierOrderItem), items)
     order.amount = amount
     await session.commit()
     await session.refresh(order)
@@ -378,21 +416,27 @@ async def update_order_status(oid: str, payload: UpdateOrderStatusPayload, sessi
         return err(400, "订单不可更新")
     order.status = payload.status
     if payload.status == "completed":
-        # 将订单项入库并写日志
+        # 将订单项入库并写日志；药品与库存一次查出
+        med_ids = [it.medicine_id for it in order.items]
+        meds = await medicines_by_id(session, med_ids)
+        stocks = await stocks_by_medicine(session, med_ids)
+        batches, logs = [], []
         for it in order.items:
-            med = (await session.execute(select(Medicine).where(Medicine.medicine_id == it.medicine_id))).scalars().first()
+            med = meds.get(it.medicine_id)
             if not med:
                 return err(404, f"药品不存在: {it.medicine_id}")
             batch_no = f"B-{oid}-{it.medicine_id}"
-            batch = InventoryBatch(medicine_id=it.medicine_id, batch_no=batch_no, quantity=it.qty, received_at=date.today())
-            log = InventoryLog(type="in", medicine_id=it.medicine_id, quantity=it.qty, note=f"订单入库 {oid}", batch_no=batch_no, time=datetime.now())
-            stock = (await session.execute(select(MedicineStock).where(MedicineStock.medicine_id == it.medicine_id))).scalars().first()
+            batches.append({"medicine_id": it.medicine_id, "batch_no": batch_no, "quantity": it.qty, "received_at": date.today()})
+            logs.append({"type": "in", "medicine_id": it.medicine_id, "quantity": it.qty, "note": f"订单入库 {oid}", "batch_no": batch_no, "time": datetime.now()})
+            stock = stocks.get(it.medicine_id)
             if not stock:
                 stock = MedicineStock(medicine_id=it.medicine_id, current_stock=0)
                 session.add(stock)
-                await session.flush()
+                stocks[it.medicine_id] = stock
             stock.current_stock = int(stock.current_stock or 0) + int(it.qty)
-            session.add(batch)
-            session.add(log)
+        # 批次与入库日志批量写入
+        if batches:
+            await session.execute(insert(InventoryBatch), batches)
+            await session.execute(insert(InventoryLog), logs)
     await session.commit()
     return ok({"id": order.id, "status": order.status})
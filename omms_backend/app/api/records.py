@@ -1,14 +1,22 @@
 import json
 import random
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select, or_
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.etag import conditional_get
+from app.core.export import stream_export, yield_per_options
+from app.core.fieldsets import UnknownFieldError, parse_fields
+from app.core.pagination import count_rows
+from app.core.record_dictionary import dictionary_names
+from app.core.record_search import RecordSearch, record_search
+from app.core.record_stats import records_stats_data
+from app.core.response_cache import cached
 from app.core.response import err, ok
-from app.db.session import get_session
+from app.db.session import get_read_session, get_session, read_session_scope
 from app.models.record import MedicalRecord, RecordTemplate
 from app.models.appointment import Department, Doctor
 from app.models.patient import Patient
@@ -17,7 +25,6 @@ from app.schemas.record import (
     RecordUpdate,
     TemplateCreate,
     TemplateUpdate,
-    MedicalRecordOut,
     RecordsListResponse,
     RecordResponse,
     RecordStatusResponse,
@@ -39,6 +46,9 @@ def gen_record_id(date_str: str) -> str:
     return f"MR-{date_str.replace('-', '')}-{str(random.randint(0, 9999)).zfill(4)}"
 
 
+RECORD_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
 def now_date_str() -> str:
     return datetime.now().strftime("%Y-%m-%d")
 
@@ -63,6 +73,37 @@ def to_json_str(val: Optional[List[str]]) -> Optional[str]:
     return json.dumps([v for v in val if isinstance(v, str) and v.strip()], ensure_ascii=False)
 
 
+def has_items(text_val: Optional[str]) -> bool:
+    return len(to_list(text_val)) > 0
+
+
+def to_time_str(val: Optional[datetime]) -> str:
+    return val.strftime(RECORD_TIME_FORMAT) if val else ""
+
+
+def day_range(date_str: str) -> tuple[datetime, datetime]:
+    """YYYY-MM-DD -> [当日 00:00, 次日 00:00)；格式非法时抛出 ValueError"""
+    start = datetime.strptime(date_str, "%Y-%m-%d")
+    return start, start + timedelta(days=1)
+
+
+def date_bounds(date: Optional[str], dateStart: Optional[str], dateEnd: Optional[str]) -> Optional[tuple[datetime, datetime]]:
+    """日期或区间 -> [起始, 结束) 的整日范围，区间优先；未传时返回 None"""
+    if dateStart and dateEnd:
+        return day_range(dateStart)[0], day_range(dateEnd)[1]
+    if date:
+        return day_range(date)
+    return None
+
+
+def created_at_filters(date: Optional[str], dateStart: Optional[str], dateEnd: Optional[str]) -> list:
+    """created_at 的半开范围条件，可走索引"""
+    bounds = date_bounds(date, dateStart, dateEnd)
+    if bounds is None:
+        return []
+    return [MedicalRecord.created_at >= bounds[0], MedicalRecord.created_at < bounds[1]]
+
+
 def to_date_str(val: Optional[object]) -> Optional[str]:
     if not val:
         return None
@@ -74,11 +115,98 @@ def to_date_str(val: Optional[object]) -> Optional[str]:
     return s if s.strip() else None
 
 
+RECORD_LIST_FIELDS = (
+    "id", "patient", "department", "doctor", "createdAt", "status", "hasLab", "hasImaging",
+    "chiefComplaint", "diagnosis", "prescriptions", "labs", "imaging",
+)
+
+# 列表字段 -> 需要读取的列；hasLab / hasImaging 读取标记列，未请求的 Text/JSON 列不读取也不解析
+RECORD_LIST_COLUMNS = {
+    "id": MedicalRecord.id,
+    "patient": MedicalRecord.patient_name,
+    "department": MedicalRecord.dept_id,
+    "doctor": MedicalRecord.doctor_id,
+    "createdAt": MedicalRecord.created_at,
+    "status": MedicalRecord.status,
+    "chiefComplaint": MedicalRecord.chief_complaint,
+    "diagnosis": MedicalRecord.diagnosis,
+    "prescriptions": MedicalRecord.prescriptions_json,
+    "labs": MedicalRecord.labs_json,
+    "imaging": MedicalRecord.imaging_json,
+}
+
+RECORD_LIST_GETTERS = {
+    "id": lambda r, depts, doctors: r.id,
+    "patient": lambda r, depts, doctors: r.patient_name or "",
+    "department": lambda r, depts, doctors: depts.get(r.dept_id, str(r.dept_id)),
+    "doctor": lambda r, depts, doctors: doctors.get(r.doctor_id, str(r.doctor_id)),
+    "createdAt": lambda r, depts, doctors: to_time_str(r.created_at),
+    "status": lambda r, depts, doctors: r.status,
+    "hasLab": lambda r, depts, doctors: bool(r.has_lab),
+    "hasImaging": lambda r, depts, doctors: bool(r.has_imaging),
+    "chiefComplaint": lambda r, depts, doctors: r.chief_complaint or "",
+    "diagnosis": lambda r, depts, doctors: r.diagnosis or "",
+    "prescriptions": lambda r, depts, doctors: to_list(r.prescriptions_json),
+    "labs": lambda r, depts, doctors: to_list(r.labs_json),
+    "imaging": lambda r, depts, doctors: to_list(r.imaging_json),
+}
+
+
+def record_list_filters(status, date, dateStart, dateEnd, patientKeyword, deptId, doctorId, hasLab=None, hasImaging=None) -> list:
+    filters = created_at_filters(date, dateStart, dateEnd)
+    if status:
+        filters.append(MedicalRecord.status == status)
+    if deptId:
+        filters.append(MedicalRecord.dept_id == deptId)
+    if doctorId:
+        filters.append(MedicalRecord.doctor_id == doctorId)
+    if patientKeyword:
+        kw = "".join((patientKeyword or "").split()).lower()
+        filters.append(func.lower(func.replace(MedicalRecord.patient_name, " ", "")).like(f"%{kw}%"))
+    if hasLab is not None:
+        filters.append(MedicalRecord.has_lab == hasLab)
+    if hasImaging is not None:
+        filters.append(MedicalRecord.has_imaging == hasImaging)
+    return filters
+
+
+def record_list_stmt(filters: list, fields: tuple, search: Optional[RecordSearch] = None):
+    columns = [RECORD_LIST_COLUMNS[name] for name in fields if name in RECORD_LIST_COLUMNS]
+    stmt = select(*columns, MedicalRecord.has_lab, MedicalRecord.has_imaging).where(*filters)
+    if search is not None:
+        return search.apply(stmt)
+    return stmt.order_by(MedicalRecord.created_at.desc(), MedicalRecord.id.desc())
+
+
+async def query_record_list(
+    session: AsyncSession, filters: list, fields: tuple, page: int, pageSize: int, search: Optional[RecordSearch] = None
+) -> dict:
+    """筛选、总数与分页均在 SQL 中完成；JSON 列只对当前页解析，科室/医生名称只查询当前页用到的"""
+    count_stmt = select(MedicalRecord.id).where(*filters)
+    total = await count_rows(session, search.apply(count_stmt) if search is not None else count_stmt)
+    stmt = record_list_stmt(filters, fields, search).offset(max(0, (page - 1) * pageSize)).limit(max(0, pageSize))
+    rows = (await session.execute(stmt)).all()
+
+    dept_map, doctor_map = {}, {}
+    if "department" in fields and rows:
+        dept_ids = {r.dept_id for r in rows}
+        dept_rows = await session.execute(select(Department.dept_id, Department.dept_name).where(Department.dept_id.in_(dept_ids)))
+        dept_map = {row[0]: row[1] for row in dept_rows.all()}
+    if "doctor" in fields and rows:
+        doctor_ids = {r.doctor_id for r in rows}
+        doctor_rows = await session.execute(select(Doctor.doctor_id, Doctor.doctor_name).where(Doctor.doctor_id.in_(doctor_ids)))
+        doctor_map = {row[0]: row[1] for row in doctor_rows.all()}
+    getters = [(name, RECORD_LIST_GETTERS[name]) for name in fields]
+    items = [{name: get(r, dept_map, doctor_map) for name, get in getters} for r in rows]
+    return {"list": items, "total": total, "page": page, "pageSize": pageSize}
+
+
 @router.get(
     "/records",
     summary="病历列表查询",
     description="按状态、日期或日期范围、科室、医生、患者关键词筛选病历列表，支持分页与检验/影像过滤。",
     response_model=RecordsListResponse,
+    response_model_exclude_unset=True,
 )
 async def list_records(
     status: Optional[str] = Query(default=None),
@@ -92,91 +220,93 @@ async def list_records(
     hasImaging: Optional[bool] = Query(default=None),
     page: int = Query(default=1),
     pageSize: int = Query(default=20),
-    session: AsyncSession = Depends(get_session),
+    fields: Optional[str] = Query(default=None, description="逗号分隔的返回字段，如 id,patient,status,createdAt；id 总是返回，默认全部字段"),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    stmt = select(MedicalRecord)
-    if status:
-        stmt = stmt.where(MedicalRecord.status == status)
-    if dateStart and dateEnd:
-        stmt = stmt.where(MedicalRecord.created_at >= f"{dateStart} 00:00").where(MedicalRecord.created_at <= f"{dateEnd} 23:59")
-    elif date:
-        stmt = stmt.where(MedicalRecord.created_at.like(f"{date}%"))
-    if deptId:
-        stmt = stmt.where(MedicalRecord.dept_id == deptId)
-    if doctorId:
-        stmt = stmt.where(MedicalRecord.doctor_id == doctorId)
-    if patientKeyword:
-        kw = "".join((patientKeyword or "").split()).lower()
-        stmt = stmt.where(func.lower(func.replace(MedicalRecord.patient_name, " ", "")).like(f"%{kw}%"))
+    try:
+        selected = parse_fields(fields, RECORD_LIST_FIELDS, always=("id",))
+    except UnknownFieldError as exc:
+        return err(400, f"不支持的字段: {exc}")
+    try:
+        filters = record_list_filters(status, date, dateStart, dateEnd, patientKeyword, deptId, doctorId, hasLab, hasImaging)
+    except ValueError:
+        return err(400, "日期格式错误")
+    return ok(await query_record_list(session, filters, selected, page, pageSize))
 
-    res = await session.execute(stmt.order_by(MedicalRecord.created_at.desc()))
-    dept_rows = await session.execute(select(Department.dept_id, Department.dept_name))
-    dept_map = {row[0]: row[1] for row in dept_rows.all()}
-    doctor_rows = await session.execute(select(Doctor.doctor_id, Doctor.doctor_name))
-    doctor_map = {row[0]: row[1] for row in doctor_rows.all()}
-    all_items = []
-    for r in res.scalars().all():
-        prescriptions = to_list(r.prescriptions_json)
-        labs = to_list(r.labs_json)
-        imaging = to_list(r.imaging_json)
-        item = {
-            "id": r.id,
-            "patient": r.patient_name or "",
-            "department": dept_map.get(r.dept_id, str(r.dept_id)),
-            "doctor": doctor_map.get(r.doctor_id, str(r.doctor_id)),
-            "createdAt": r.created_at,
-            "status": r.status,
-            "hasLab": len(labs) > 0,
-            "hasImaging": len(imaging) > 0,
-            "chiefComplaint": r.chief_complaint or "",
-            "diagnosis": r.diagnosis or "",
-            "prescriptions": prescriptions,
-            "labs": labs,
-            "imaging": imaging,
-        }
-        all_items.append(item)
-    if hasLab is not None:
-        all_items = [x for x in all_items if x["hasLab"] == hasLab]
-    if hasImaging is not None:
-        all_items = [x for x in all_items if x["hasImaging"] == hasImaging]
-    total = len(all_items)
-    start = max(0, (page - 1) * pageSize)
-    end = start + pageSize
-    return ok({"list": all_items[start:end], "total": total, "page": page, "pageSize": pageSize})
+
+@router.get(
+    "/records/export",
+    summary="导出病历列表",
+    description="按与 /records 相同的筛选条件与 fields 以 NDJSON / CSV 流式导出，逐行读取与写出",
+)
+async def export_records(
+    status: Optional[str] = Query(default=None),
+    date: Optional[str] = Query(default=None),
+    dateStart: Optional[str] = Query(default=None),
+    dateEnd: Optional[str] = Query(default=None),
+    patientKeyword: Optional[str] = Query(default=None),
+    deptId: Optional[int] = Query(default=None),
+    doctorId: Optional[int] = Query(default=None),
+    hasLab: Optional[bool] = Query(default=None),
+    hasImaging: Optional[bool] = Query(default=None),
+    fields: Optional[str] = Query(default=None, description="逗号分隔的导出字段，默认全部字段"),
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$", description="导出格式"),
+):
+    try:
+        selected = parse_fields(fields, RECORD_LIST_FIELDS, always=("id",))
+    except UnknownFieldError as exc:
+        return err(400, f"不支持的字段: {exc}")
+    try:
+        filters = record_list_filters(status, date, dateStart, dateEnd, patientKeyword, deptId, doctorId, hasLab, hasImaging)
+    except ValueError:
+        return err(400, "日期格式错误")
+    stmt = record_list_stmt(filters, selected).execution_options(**yield_per_options())
+    getters = [(name, RECORD_LIST_GETTERS[name]) for name in selected]
+
+    async def rows():
+        async with read_session_scope() as session:
+            # 科室、医生为小表，整表读入名称映射
+            dept_map = dict((await session.execute(select(Department.dept_id, Department.dept_name))).all())
+            doctor_map = dict((await session.execute(select(Doctor.doctor_id, Doctor.doctor_name))).all())
+            result = await session.stream(stmt)
+            async for r in result:
+                yield {name: get(r, dept_map, doctor_map) for name, get in getters}
+
+    return stream_export(rows(), format, selected, "records")
 
 
 @router.get(
-    "/records/{id}",
-    summary="病历详情",
-    description="按病历号获取病历详情。",
-    response_model=RecordResponse,
+    "/records/search",
+    summary="病历全文检索",
+    description="按主诉与诊断全文检索病历，多个关键词以空格分隔且需同时命中，结果按相关度排序，可叠加状态、日期、科室、医生筛选。",
+    response_model=RecordsListResponse,
+    response_model_exclude_unset=True,
 )
-async def get_record(id: str, session: AsyncSession = Depends(get_session)):
-    r = await session.get(MedicalRecord, id)
-    if not r:
-        return err(404, "Record not found")
-    prescriptions = to_list(r.prescriptions_json)
-    labs = to_list(r.labs_json)
-    imaging = to_list(r.imaging_json)
-    dept = await session.get(Department, r.dept_id)
-    doc = await session.get(Doctor, r.doctor_id)
-    return ok(
-        {
-            "id": r.id,
-            "patient": r.patient_name or "",
-            "department": dept.dept_name if dept else str(r.dept_id),
-            "doctor": doc.doctor_name if doc else str(r.doctor_id),
-            "createdAt": r.created_at,
-            "status": r.status,
-            "hasLab": len(labs) > 0,
-            "hasImaging": len(imaging) > 0,
-            "chiefComplaint": r.chief_complaint or "",
-            "diagnosis": r.diagnosis or "",
-            "prescriptions": prescriptions,
-            "labs": labs,
-            "imaging": imaging,
-        }
-    )
+async def search_records(
+    q: Optional[str] = Query(default=None, description="检索关键词，匹配主诉与诊断"),
+    status: Optional[str] = Query(default=None),
+    date: Optional[str] = Query(default=None),
+    dateStart: Optional[str] = Query(default=None),
+    dateEnd: Optional[str] = Query(default=None),
+    deptId: Optional[int] = Query(default=None),
+    doctorId: Optional[int] = Query(default=None),
+    page: int = Query(default=1),
+    pageSize: int = Query(default=20),
+    fields: Optional[str] = Query(default=None, description="逗号分隔的返回字段，id 总是返回，默认全部字段"),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if not (q or "").strip():
+        return err(400, "检索关键词不能为空")
+    try:
+        selected = parse_fields(fields, RECORD_LIST_FIELDS, always=("id",))
+    except UnknownFieldError as exc:
+        return err(400, f"不支持的字段: {exc}")
+    try:
+        filters = record_list_filters(status, date, dateStart, dateEnd, None, deptId, doctorId)
+    except ValueError:
+        return err(400, "日期格式错误")
+    search = await record_search(session, q)
+    return ok(await query_record_list(session, filters, selected, page, pageSize, search))
 
 
 @router.post(
@@ -193,14 +323,12 @@ async def create_record(payload: RecordCreate, session: AsyncSession = Depends(g
         return err(400, msg)
     created_at_raw = payload.createdAt or compose_time(now_date_str(), payload.time)
     try:
-        ca_dt = datetime.strptime(created_at_raw, "%Y-%m-%d %H:%M")
-        if ca_dt > datetime.now():
+        created_at = datetime.strptime(created_at_raw, RECORD_TIME_FORMAT)
+        if created_at > datetime.now():
             return err(400, "createdAt不可晚于当前时间")
     except Exception:
         return err(400, "时间格式非法")
-    date_str = created_at_raw.split(" ")[0]
-    rid = gen_record_id(date_str)
-    created_at = created_at_raw
+    rid = gen_record_id(created_at.strftime("%Y-%m-%d"))
     rec = MedicalRecord(
         id=rid,
         dept_id=payload.deptId,
@@ -216,6 +344,8 @@ async def create_record(payload: RecordCreate, session: AsyncSession = Depends(g
         labs_json=to_json_str(payload.labs),
         imaging_json=to_json_str(payload.imaging),
     )
+    rec.has_lab = has_items(rec.labs_json)
+    rec.has_imaging = has_items(rec.imaging_json)
     session.add(rec)
     await session.commit()
     labs = to_list(rec.labs_json)
@@ -228,7 +358,7 @@ async def create_record(payload: RecordCreate, session: AsyncSession = Depends(g
             "patient": rec.patient_name or "",
             "department": dept.dept_name if dept else str(rec.dept_id),
             "doctor": doc.doctor_name if doc else str(rec.doctor_id),
-            "createdAt": rec.created_at,
+            "createdAt": to_time_str(rec.created_at),
             "status": rec.status,
             "hasLab": len(labs) > 0,
             "hasImaging": len(imaging) > 0,
@@ -269,14 +399,16 @@ async def update_record(id: str, payload: RecordUpdate, session: AsyncSession =
         rec.prescriptions_json = to_json_str(payload.prescriptions)
     if payload.labs is not None:
         rec.labs_json = to_json_str(payload.labs)
+        rec.has_lab = has_items(rec.labs_json)
     if payload.imaging is not None:
         rec.imaging_json = to_json_str(payload.imaging)
+        rec.has_imaging = has_items(rec.imaging_json)
     if payload.createdAt is not None:
         try:
-            ca_dt = datetime.strptime(payload.createdAt, "%Y-%m-%d %H:%M")
+            ca_dt = datetime.strptime(payload.createdAt, RECORD_TIME_FORMAT)
             if ca_dt > datetime.now():
                 return err(400, "createdAt不可晚于当前时间")
-            rec.created_at = payload.createdAt
+            rec.created_at = ca_dt
         except Exception:
             return err(400, "时间格式非法")
     if payload.deptId is not None:
@@ -293,7 +425,7 @@ async def update_record(id: str, payload: RecordUpdate, session: AsyncSession =
             "patient": rec.patient_name or "",
             "department": str(rec.dept_id),
             "doctor": str(rec.doctor_id),
-            "createdAt": rec.created_at,
+            "createdAt": to_time_str(rec.created_at),
             "status": rec.status,
             "hasLab": len(labs) > 0,
             "hasImaging": len(imaging) > 0,
@@ -349,8 +481,9 @@ async def delete_record(id: str, session: AsyncSession = Depends(get_session)):
     summary="模板列表",
     description="查询病历模板列表。",
     response_model=RecordTemplateListResponse,
+    dependencies=[Depends(conditional_get("record-templates"))],
 )
-async def get_record_templates(session: AsyncSession = Depends(get_session)):
+async def get_record_templates(session: AsyncSession = Depends(get_read_session)):
     res = await session.execute(select(RecordTemplate).order_by(RecordTemplate.id.desc()))
     items = []
     for t in res.scalars().all():
@@ -371,8 +504,9 @@ async def get_record_templates(session: AsyncSession = Depends(get_session)):
     summary="模板详情",
     description="按ID查询模板详情。",
     response_model=RecordTemplateResponse,
+    dependencies=[Depends(conditional_get("record-templates"))],
 )
-async def get_record_template_by_id(tpl_id: int, session: AsyncSession = Depends(get_session)):
+async def get_record_template_by_id(tpl_id: int, session: AsyncSession = Depends(get_read_session)):
     tpl = await session.get(RecordTemplate, tpl_id)
     if not tpl:
         return err(404, "Template not found")
@@ -491,63 +625,38 @@ async def check_doctor_dept(session: AsyncSession, dept_id: int, doctor_id: int)
 @router.get(
     "/records/stats",
     summary="病历统计数据",
-    description="返回病历的统计数据（支持日期或区间、科室/医生过滤）",
+    description="返回病历的统计数据（支持日期或区间、科室/医生过滤），默认读取按日汇总表",
     response_model=RecordsStatsResponse,
 )
+@cached("records")
 async def records_stats(
     date: Optional[str] = Query(default=None),
     dateStart: Optional[str] = Query(default=None),
     dateEnd: Optional[str] = Query(default=None),
     deptId: Optional[int] = Query(default=None),
     doctorId: Optional[int] = Query(default=None),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    stmt = select(MedicalRecord)
-    if deptId:
-        stmt = stmt.where(MedicalRecord.dept_id == deptId)
-    if doctorId:
-        stmt = stmt.where(MedicalRecord.doctor_id == doctorId)
-    if dateStart and dateEnd:
-        stmt = stmt.where(MedicalRecord.created_at >= f"{dateStart} 00:00").where(MedicalRecord.created_at <= f"{dateEnd} 23:59")
-    elif date:
-        stmt = stmt.where(MedicalRecord.created_at.like(f"{date}%"))
-    total = int((await session.execute(select(func.count()).select_from(stmt.subquery()))).scalar_one())
-    draft = int((await session.execute(select(func.count()).select_from(stmt.where(MedicalRecord.status == "draft").subquery()))).scalar_one())
-    finalized = int((await session.execute(select(func.count()).select_from(stmt.where(MedicalRecord.status == "finalized").subquery()))).scalar_one())
-    cancelled = int((await session.execute(select(func.count()).select_from(stmt.where(MedicalRecord.status == "cancelled").subquery()))).scalar_one())
-    withLab = int((await session.execute(select(func.count()).select_from(stmt.where(func.length(MedicalRecord.labs_json) > 2).subquery()))).scalar_one())
-    withImaging = int((await session.execute(select(func.count()).select_from(stmt.where(func.length(MedicalRecord.imaging_json) > 2).subquery()))).scalar_one())
-    return ok({"total": total, "draft": draft, "finalized": finalized, "cancelled": cancelled, "withLab": withLab, "withImaging": withImaging})
+    try:
+        bounds = date_bounds(date, dateStart, dateEnd)
+    except ValueError:
+        return err(400, "日期格式错误")
+    return ok(await records_stats_data(session, bounds, deptId, doctorId))
 
 @router.get(
     "/records/dictionaries",
     summary="病历词典数据",
     description="返回病历录入相关的词典数据集合",
     response_model=DictionariesResponse,
+    dependencies=[Depends(conditional_get("record-dictionaries"))],
 )
-async def records_dictionaries(session: AsyncSession = Depends(get_session)):
-    res = await session.execute(select(MedicalRecord).where(or_(func.length(MedicalRecord.imaging_json) > 2, func.length(MedicalRecord.labs_json) > 2)))
-    imaging_set, labs_set = set(BASE_IMAGING_DICT), set(BASE_LABS_DICT)
-    for r in res.scalars().all():
-        for v in to_list(r.imaging_json):
-            if isinstance(v, str) and v.strip():
-                imaging_set.add(v.strip())
-        for v in to_list(r.labs_json):
-            if isinstance(v, str) and v.strip():
-                labs_set.add(v.strip())
-    tpl_res = await session.execute(select(RecordTemplate))
-    for tpl in tpl_res.scalars().all():
-        try:
-            d = json.loads(tpl.defaults_json or "{}")
-        except Exception:
-            d = {}
-        for v in (d.get("imaging") or []):
-            if isinstance(v, str) and v.strip():
-                imaging_set.add(v.strip())
-        for v in (d.get("labs") or []):
-            if isinstance(v, str) and v.strip():
-                labs_set.add(v.strip())
-    return ok({"imaging": sorted(list(imaging_set)), "labs": sorted(list(labs_set))})
+@cached("records")
+async def records_dictionaries(session: AsyncSession = Depends(get_read_session)):
+    names = await dictionary_names(session)
+    return ok({
+        "imaging": sorted(names["imaging"] | set(BASE_IMAGING_DICT)),
+        "labs": sorted(names["labs"] | set(BASE_LABS_DICT)),
+    })
 
 
 @router.get(
@@ -555,48 +664,58 @@ async def records_dictionaries(session: AsyncSession = Depends(get_session)):
     summary="检验词典",
     description="返回检验项目词典",
     response_model=DictionaryArrayResponse,
+    dependencies=[Depends(conditional_get("record-dictionaries"))],
 )
-async def records_dictionaries_labs(session: AsyncSession = Depends(get_session)):
-    res = await session.execute(select(MedicalRecord).where(func.length(MedicalRecord.labs_json) > 2))
-    labs_set = set(BASE_LABS_DICT)
-    for r in res.scalars().all():
-        for v in to_list(r.labs_json):
-            if isinstance(v, str) and v.strip():
-                labs_set.add(v.strip())
-    tpl_res = await session.execute(select(RecordTemplate))
-    for tpl in tpl_res.scalars().all():
-        try:
-            d = json.loads(tpl.defaults_json or "{}")
-        except Exception:
-            d = {}
-        for v in (d.get("labs") or []):
-            if isinstance(v, str) and v.strip():
-                labs_set.add(v.strip())
-    return ok(sorted(list(labs_set)))
+@cached("records")
+async def records_dictionaries_labs(session: AsyncSession = Depends(get_read_session)):
+    names = await dictionary_names(session, ["labs"])
+    return ok(sorted(names["labs"] | set(BASE_LABS_DICT)))
 
 @router.get(
     "/records/dictionaries/imaging",
     summary="检查词典",
     description="返回影像检查项目词典",
     response_model=DictionaryArrayResponse,
+    dependencies=[Depends(conditional_get("record-dictionaries"))],
 )
-async def records_dictionaries_imaging(session: AsyncSession = Depends(get_session)):
-    res = await session.execute(select(MedicalRecord).where(func.length(MedicalRecord.imaging_json) > 2))
-    imaging_set = set(BASE_IMAGING_DICT)
-    for r in res.scalars().all():
-        for v in to_list(r.imaging_json):
-            if isinstance(v, str) and v.strip():
-                imaging_set.add(v.strip())
-    tpl_res = await session.execute(select(RecordTemplate))
-    for tpl in tpl_res.scalars().all():
-        try:
-            d = json.loads(tpl.defaults_json or "{}")
-        except Exception:
-            d = {}
-        for v in (d.get("imaging") or []):
-            if isinstance(v, str) and v.strip():
-                imaging_set.add(v.strip())
-    return ok(sorted(list(imaging_set)))
+@cached("records")
+async def records_dictionaries_imaging(session: AsyncSession = Depends(get_read_session)):
+    names = await dictionary_names(session, ["imaging"])
+    return ok(sorted(names["imaging"] | set(BASE_IMAGING_DICT)))
+
+@router.get(
+    "/records/{id}",
+    summary="病历详情",
+    description="按病历号获取病历详情。",
+    response_model=RecordResponse,
+)
+async def get_record(id: str, session: AsyncSession = Depends(get_session)):
+    r = await session.get(MedicalRecord, id)
+    if not r:
+        return err(404, "Record not found")
+    prescriptions = to_list(r.prescriptions_json)
+    labs = to_list(r.labs_json)
+    imaging = to_list(r.imaging_json)
+    dept = await session.get(Department, r.dept_id)
+    doc = await session.get(Doctor, r.doctor_id)
+    return ok(
+        {
+            "id": r.id,
+            "patient": r.patient_name or "",
+            "department": dept.dept_name if dept else str(r.dept_id),
+            "doctor": doc.doctor_name if doc else str(r.doctor_id),
+            "createdAt": to_time_str(r.created_at),
+            "status": r.status,
+            "hasLab": len(labs) > 0,
+            "hasImaging": len(imaging) > 0,
+            "chiefComplaint": r.chief_complaint or "",
+            "diagnosis": r.diagnosis or "",
+            "prescriptions": prescriptions,
+            "labs": labs,
+            "imaging": imaging,
+        }
+    )
+
 
 @router.get(
     "/patients",
@@ -608,7 +727,7 @@ async def get_patients(
     name: Optional[str] = Query(default=None),
     page: int = Query(default=1),
     pageSize: int = Query(default=20),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     stmt = select(Patient)
     if name:
@@ -661,6 +780,7 @@ async def get_patient_by_id(pid: int, session: AsyncSession = Depends(get_sessio
     summary="病历列表查询（扩展筛选）",
     description="支持患者关键词与日期范围筛选，返回与 /records 相同结构",
     response_model=RecordsListResponse,
+    response_model_exclude_unset=True,
 )
 async def list_records_extended(
     status: Optional[str] = Query(default=None),
@@ -674,56 +794,18 @@ async def list_records_extended(
     dateEnd: Optional[str] = Query(default=None),
     page: int = Query(default=1),
     pageSize: int = Query(default=20),
-    session: AsyncSession = Depends(get_session),
+    fields: Optional[str] = Query(default=None, description="逗号分隔的返回字段，如 id,patient,status,createdAt；id 总是返回，默认全部字段"),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    stmt = select(MedicalRecord)
-    if status:
-        stmt = stmt.where(MedicalRecord.status == status)
-    if deptId:
-        stmt = stmt.where(MedicalRecord.dept_id == deptId)
-    if doctorId:
-        stmt = stmt.where(MedicalRecord.doctor_id == doctorId)
-    if dateStart and dateEnd:
-        stmt = stmt.where(MedicalRecord.created_at >= f"{dateStart} 00:00").where(MedicalRecord.created_at <= f"{dateEnd} 23:59")
-    elif date:
-        stmt = stmt.where(MedicalRecord.created_at.like(f"{date}%"))
-    if patientKeyword:
-        kw = "".join((patientKeyword or "").split()).lower()
-        stmt = stmt.where(func.lower(func.replace(MedicalRecord.patient_name, " ", "")).like(f"%{kw}%"))
-    res = await session.execute(stmt.order_by(MedicalRecord.created_at.desc()))
-    dept_rows = await session.execute(select(Department.dept_id, Department.dept_name))
-    dept_map = {row[0]: row[1] for row in dept_rows.all()}
-    doctor_rows = await session.execute(select(Doctor.doctor_id, Doctor.doctor_name))
-    doctor_map = {row[0]: row[1] for row in doctor_rows.all()}
-    all_items = []
-    for r in res.scalars().all():
-        prescriptions = to_list(r.prescriptions_json)
-        labs = to_list(r.labs_json)
-        imaging = to_list(r.imaging_json)
-        item = {
-            "id": r.id,
-            "patient": r.patient_name or "",
-            "department": dept_map.get(r.dept_id, str(r.dept_id)),
-            "doctor": doctor_map.get(r.doctor_id, str(r.doctor_id)),
-            "createdAt": r.created_at,
-            "status": r.status,
-            "hasLab": len(labs) > 0,
-            "hasImaging": len(imaging) > 0,
-            "chiefComplaint": r.chief_complaint or "",
-            "diagnosis": r.diagnosis or "",
-            "prescriptions": prescriptions,
-            "labs": labs,
-            "imaging": imaging,
-        }
-        all_items.append(item)
-    if hasLab is not None:
-        all_items = [x for x in all_items if x["hasLab"] == hasLab]
-    if hasImaging is not None:
-        all_items = [x for x in all_items if x["hasImaging"] == hasImaging]
-    total = len(all_items)
-    start = max(0, (page - 1) * pageSize)
-    end = start + pageSize
-    return ok({"list": all_items[start:end], "total": total, "page": page, "pageSize": pageSize})
+    try:
+        selected = parse_fields(fields, RECORD_LIST_FIELDS, always=("id",))
+    except UnknownFieldError as exc:
+        return err(400, f"不支持的字段: {exc}")
+    try:
+        filters = record_list_filters(status, date, dateStart, dateEnd, patientKeyword, deptId, doctorId, hasLab, hasImaging)
+    except ValueError:
+        return err(400, "日期格式错误")
+    return ok(await query_record_list(session, filters, selected, page, pageSize))
 BASE_IMAGING_DICT = [
     "胸片",
     "腹部超声",
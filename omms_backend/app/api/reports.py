@@ -5,8 +5,11 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select, func, and_, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.export import stream_export, yield_per_options
 from app.core.response import ok, err
-from app.db.session import get_session
+from app.core.response_cache import cached
+from app.core.timing import timed
+from app.db.session import get_read_session, read_session_scope
 from app.models.appointment import Appointment, Doctor, Department
 from app.models.patient import Patient
 from app.models.prescription import Prescription, PrescriptionItem
@@ -31,15 +34,95 @@ def status_str(status_int: Optional[int]) -> str:
     return "pending"
 
 
+def custom_report_stmt(deptName: Optional[str], doctorName: Optional[str], start_dt: Optional[datetime], end_dt: Optional[datetime]):
+    stmt = (
+        select(
+            Appointment.appt_id,
+            Appointment.appt_time,
+            Appointment.status,
+            Patient.name.label("patient_name"),
+            Doctor.doctor_name,
+            Department.dept_name,
+        )
+        .join(Patient, Appointment.patient_id == Patient.patient_id)
+        .join(Doctor, Appointment.doctor_id == Doctor.doctor_id)
+        .join(Department, Doctor.dept_id == Department.dept_id)
+    )
+    if deptName:
+        stmt = stmt.where(Department.dept_name == deptName)
+    if doctorName:
+        stmt = stmt.where(Doctor.doctor_name == doctorName)
+    if start_dt:
+        stmt = stmt.where(Appointment.appt_time >= start_dt)
+    if end_dt:
+        stmt = stmt.where(Appointment.appt_time < end_dt)
+    return stmt.order_by(Appointment.appt_time.asc())
+
+
+async def drug_items_by_day(session: AsyncSession, start_dt: Optional[datetime], end_dt: Optional[datetime]) -> Dict[str, int]:
+    """按 day|doctor|department 聚合处方条目数，即使同一医生当日为不同患者开具处方也能正确计数"""
+    day = func.date(Prescription.created_at)
+    stmt = (
+        select(day, Prescription.doctor, Prescription.department, func.count(PrescriptionItem.id))
+        .join(PrescriptionItem, PrescriptionItem.prescription_id == Prescription.id)
+        .where(Prescription.created_at.is_not(None))
+        .group_by(day, Prescription.doctor, Prescription.department)
+    )
+    if start_dt:
+        stmt = stmt.where(Prescription.created_at >= start_dt)
+    if end_dt:
+        stmt = stmt.where(Prescription.created_at < end_dt)
+    return {f"{d}|{doctor}|{dept}": int(cnt or 0) for d, doctor, dept, cnt in (await session.execute(stmt)).all()}
+
+
+CUSTOM_REPORT_COLUMNS = ("id", "patient", "department", "doctor", "time", "status", "drugItems")
+
+
+def custom_report_row(row, items_by_dday: Dict[str, int]) -> dict:
+    appt_time = row.appt_time
+    tstr = appt_time.strftime("%Y-%m-%d %H:%M:%S") if appt_time else None
+    day = appt_time.strftime("%Y-%m-%d") if appt_time else ""
+    num = str(row.appt_id or 0)
+    padded = num[-4:] if len(num) >= 4 else num.zfill(4)
+    return {
+        "id": f"R-{day.replace('-', '')}-{padded}",
+        "patient": row.patient_name,
+        "department": row.dept_name,
+        "doctor": row.doctor_name,
+        "time": tstr,
+        "status": status_str(row.status),
+        "drugItems": int(items_by_dday.get(f"{day}|{row.doctor_name}|{row.dept_name}", 0)),
+    }
+
+
+DRUG_REPORT_COLUMNS = ("id", "medicine", "specification", "quantity", "unit", "patient", "department", "doctor", "date")
+
+
+def drug_report_row(p: Prescription, i: PrescriptionItem, med: Optional[Medicine]) -> dict:
+    # front-end expects no unit column now, but keep in payload for future
+    return {
+        "id": f"{p.id}-{i.id}",
+        "medicine": (med.medicine_name if med else (i.name or "")),
+        "specification": (med.specification if med else None),
+        "quantity": int(i.qty or 0),
+        "unit": i.unit,
+        "patient": p.patient,
+        "department": p.department,
+        "doctor": p.doctor,
+        "date": p.created_at.strftime("%Y-%m-%d") if p.created_at else "",
+    }
+
+
 @router.get(
     "/reports/daily/visits",
     summary="获取就诊日报",
     description="按日期查询就诊日报数据",
     response_model=DailyVisitsResponse,
 )
+@cached("reports")
 async def get_daily_visits(
     date: str = Query(..., description="日期（YYYY-MM-DD）"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     try:
         day_start = datetime.strptime(date, "%Y-%m-%d")
@@ -63,21 +146,22 @@ async def get_daily_visits(
     res = await session.execute(stmt)
     rows = res.all()
     data_list = []
-    for appt, patient_name, doctor_name, dept_name in rows:
-        date_str = appt.appt_time.strftime("%Y-%m-%d") if appt.appt_time else ""
-        num = str(appt.appt_id or 0)
-        padded = num[-4:] if len(num) >= 4 else num.zfill(4)
-        rid = f"R-{date_str.replace('-', '')}-{padded}"
-        data_list.append(
-            {
-                "id": rid,
-                "patient": patient_name,
-                "department": dept_name,
-                "doctor": doctor_name,
-                "time": appt.appt_time.strftime("%Y-%m-%d %H:%M:%S") if appt.appt_time else None,
-                "status": status_str(appt.status),
-            }
-        )
+    with timed("aggregate"):
+        for appt, patient_name, doctor_name, dept_name in rows:
+            date_str = appt.appt_time.strftime("%Y-%m-%d") if appt.appt_time else ""
+            num = str(appt.appt_id or 0)
+            padded = num[-4:] if len(num) >= 4 else num.zfill(4)
+            rid = f"R-{date_str.replace('-', '')}-{padded}"
+            data_list.append(
+                {
+                    "id": rid,
+                    "patient": patient_name,
+                    "department": dept_name,
+                    "doctor": doctor_name,
+                    "time": appt.appt_time.strftime("%Y-%m-%d %H:%M:%S") if appt.appt_time else None,
+                    "status": status_str(appt.status),
+                }
+            )
 
     return ok({"list": data_list, "total": len(data_list)})
 
@@ -88,9 +172,10 @@ async def get_daily_visits(
     description="按日期查询药品使用日报数据",
     response_model=DailyDrugsResponse,
 )
+@cached("reports")
 async def get_daily_drugs(
     date: str = Query(..., description="日期（YYYY-MM-DD）"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     try:
         day_start = datetime.strptime(date, "%Y-%m-%d")
@@ -119,39 +204,61 @@ async def get_daily_drugs(
     p_map = {p.id: p for p in prescriptions}
 
     data_list = []
-    for i in items:
-        p = p_map.get(i.prescription_id)
-        if not p:
-            # skip orphan
-            continue
-        med = med_map.get(i.medicine_id)
-        date_str = p.created_at.strftime("%Y-%m-%d") if p.created_at else ""
-        row = {
-            "id": f"{p.id}-{i.id}",
-            "medicine": (med.medicine_name if med else (i.name or "")),
-            "specification": (med.specification if med else None),
-            "quantity": int(i.qty or 0),
-            "unit": i.unit,
-            "patient": p.patient,
-            "department": p.department,
-            "doctor": p.doctor,
-            "date": date_str,
-        }
-        # front-end expects no unit column now, but keep in payload for future
-        data_list.append(row)
+    with timed("aggregate"):
+        for i in items:
+            p = p_map.get(i.prescription_id)
+            if not p:
+                # skip orphan
+                continue
+            data_list.append(drug_report_row(p, i, med_map.get(i.medicine_id)))
 
     return ok({"list": data_list, "total": len(data_list)})
 
 
+@router.get(
+    "/reports/daily/drugs/export",
+    summary="导出药品使用明细",
+    description="按日期（或 date 至 dateEnd 区间）以 NDJSON / CSV 流式导出药品使用明细，逐行读取与写出",
+)
+async def export_daily_drugs(
+    date: str = Query(..., description="日期（YYYY-MM-DD）"),
+    dateEnd: Optional[str] = Query(default=None, description="结束日期（YYYY-MM-DD，含），默认与 date 相同"),
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$", description="导出格式"),
+):
+    try:
+        day_start = datetime.strptime(date, "%Y-%m-%d")
+        day_end = datetime.strptime(dateEnd or date, "%Y-%m-%d") + timedelta(days=1)
+    except Exception:
+        return err(400, "日期格式错误")
+
+    stmt = (
+        select(PrescriptionItem, Prescription, Medicine)
+        .join(Prescription, PrescriptionItem.prescription_id == Prescription.id)
+        .outerjoin(Medicine, PrescriptionItem.medicine_id == Medicine.medicine_id)
+        .where(and_(Prescription.created_at >= day_start, Prescription.created_at < day_end))
+        .order_by(Prescription.created_at.asc(), PrescriptionItem.id.asc())
+        .execution_options(**yield_per_options())
+    )
+
+    async def rows():
+        async with read_session_scope() as session:
+            result = await session.stream(stmt)
+            async for i, p, med in result:
+                yield drug_report_row(p, i, med)
+
+    return stream_export(rows(), format, DRUG_REPORT_COLUMNS, f"drugs-{date}")
+
+
 @router.get(
     "/reports/monthly/visits",
     summary="获取就诊月报",
     description="按月份统计每日就诊数量",
     response_model=MonthlyVisitsResponse,
 )
+@cached("reports")
 async def get_monthly_visits(
     month: str = Query(..., description="月份（YYYY-MM）"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     try:
         month_start = datetime.strptime(month + "-01", "%Y-%m-%d")
@@ -183,9 +290,10 @@ async def get_monthly_visits(
     description="按月份统计每日药品项数",
     response_model=MonthlyDrugsResponse,
 )
+@cached("reports")
 async def get_monthly_drugs(
     month: str = Query(..., description="月份（YYYY-MM）"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     try:
         month_start = datetime.strptime(month + "-01", "%Y-%m-%d")
@@ -210,11 +318,12 @@ async def get_monthly_drugs(
             counts_by_pid[str(pid)] = int(cnt or 0)
 
     items_by_day: Dict[str, int] = {}
-    for p in prescriptions:
-        d = p.created_at.strftime("%Y-%m-%d") if p.created_at else None
-        if not d:
-            continue
-        items_by_day[d] = int(items_by_day.get(d, 0)) + int(counts_by_pid.get(str(p.id), 0))
+    with timed("aggregate"):
+        for p in prescriptions:
+            d = p.created_at.strftime("%Y-%m-%d") if p.created_at else None
+            if not d:
+                continue
+            items_by_day[d] = int(items_by_day.get(d, 0)) + int(counts_by_pid.get(str(p.id), 0))
 
     data_list = [{"date": d, "items": items_by_day[d]} for d in sorted(items_by_day.keys())]
     return ok({"list": data_list, "totalDays": len(data_list)})
@@ -226,12 +335,13 @@ async def get_monthly_drugs(
     description="按筛选条件返回包含就诊与处方聚合的行数据",
     response_model=CustomReportResponse,
 )
+@cached("reports")
 async def get_custom_report(
     deptName: Optional[str] = Query(default=None, description="科室名称"),
     doctorName: Optional[str] = Query(default=None, description="医生姓名"),
     dateStart: Optional[str] = Query(default=None, description="开始日期（YYYY-MM-DD）"),
     dateEnd: Optional[str] = Query(default=None, description="结束日期（YYYY-MM-DD）"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     # build date range
     start_dt: Optional[datetime] = None
@@ -244,84 +354,44 @@ async def get_custom_report(
     except Exception:
         return err(400, "日期格式错误")
 
-    stmt = (
-        select(
-            Appointment,
-            Patient.name.label("patient_name"),
-            Doctor.doctor_name,
-            Department.dept_name,
-        )
-        .join(Patient, Appointment.patient_id == Patient.patient_id)
-        .join(Doctor, Appointment.doctor_id == Doctor.doctor_id)
-        .join(Department, Doctor.dept_id == Department.dept_id)
-    )
-    if deptName:
-        stmt = stmt.where(Department.dept_name == deptName)
-    if doctorName:
-        stmt = stmt.where(Doctor.doctor_name == doctorName)
-    if start_dt:
-        stmt = stmt.where(Appointment.appt_time >= start_dt)
-    if end_dt:
-        stmt = stmt.where(Appointment.appt_time < end_dt)
-    stmt = stmt.order_by(Appointment.appt_time.asc())
+    rows = (await session.execute(custom_report_stmt(deptName, doctorName, start_dt, end_dt))).all()
+    items_by_dday = await drug_items_by_day(session, start_dt, end_dt) if rows else {}
+    with timed("aggregate"):
+        data_list = [custom_report_row(row, items_by_dday) for row in rows]
+    return ok({"list": data_list, "total": len(data_list)})
 
-    res = await session.execute(stmt)
-    rows = res.all()
 
-    # 预抓处方，并按 day|doctor|department 聚合条目数
-    # 这样即使同一医生当日为不同患者开具处方，也能正确计数
-    days: Dict[str, None] = {}
-    for appt, _, _, _ in rows:
-        if appt.appt_time:
-            days[appt.appt_time.strftime("%Y-%m-%d")] = None
-    if days:
-        p_stmt = select(Prescription).where(
-            and_(
-                (start_dt or datetime.min) <= Prescription.created_at,
-                Prescription.created_at < (end_dt or datetime.max),
-            )
-        )
-        prescriptions: List[Prescription] = (await session.execute(p_stmt)).scalars().all()
-        pids = [p.id for p in prescriptions]
-        item_count_by_pid: Dict[str, int] = {}
-        if pids:
-            i_stmt = (
-                select(PrescriptionItem.prescription_id, func.count().label("cnt"))
-                .where(PrescriptionItem.prescription_id.in_(pids))
-                .group_by(PrescriptionItem.prescription_id)
-            )
-            for pid, cnt in (await session.execute(i_stmt)).all():
-                item_count_by_pid[str(pid)] = int(cnt or 0)
-        # sum by day|doctor|department
-        items_by_dday: Dict[str, int] = {}
-        for p in prescriptions:
-            d = p.created_at.strftime("%Y-%m-%d") if p.created_at else None
-            if not d:
-                continue
-            key = f"{d}|{p.doctor}|{p.department}"
-            items_by_dday[key] = int(items_by_dday.get(key, 0)) + int(item_count_by_pid.get(str(p.id), 0))
-    else:
-        items_by_dday = {}
+@router.get(
+    "/reports/custom/export",
+    summary="导出自定义报表",
+    description="按与 /reports/custom 相同的筛选条件以 NDJSON / CSV 流式导出，内存占用与日期范围无关",
+)
+async def export_custom_report(
+    deptName: Optional[str] = Query(default=None, description="科室名称"),
+    doctorName: Optional[str] = Query(default=None, description="医生姓名"),
+    dateStart: Optional[str] = Query(default=None, description="开始日期（YYYY-MM-DD）"),
+    dateEnd: Optional[str] = Query(default=None, description="结束日期（YYYY-MM-DD）"),
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$", description="导出格式"),
+):
+    start_dt: Optional[datetime] = None
+    end_dt: Optional[datetime] = None
+    try:
+        if dateStart:
+            start_dt = datetime.strptime(dateStart, "%Y-%m-%d")
+        if dateEnd:
+            end_dt = datetime.strptime(dateEnd, "%Y-%m-%d") + timedelta(days=1)
+    except Exception:
+        return err(400, "日期格式错误")
 
-    data_list = []
-    for appt, patient_name, doctor_name, dept_name in rows:
-        tstr = appt.appt_time.strftime("%Y-%m-%d %H:%M:%S") if appt.appt_time else None
-        day = appt.appt_time.strftime("%Y-%m-%d") if appt.appt_time else ""
-        num = str(appt.appt_id or 0)
-        padded = num[-4:] if len(num) >= 4 else num.zfill(4)
-        rid = f"R-{day.replace('-', '')}-{padded}"
-        key_dday = f"{day}|{doctor_name}|{dept_name}"
-        total_items = int(items_by_dday.get(key_dday, 0))
-        data_list.append(
-            {
-                "id": rid,
-                "patient": patient_name,
-                "department": dept_name,
-                "doctor": doctor_name,
-                "time": tstr,
-                "status": status_str(appt.status),
-                "drugItems": total_items,
-            }
-        )
+    stmt = custom_report_stmt(deptName, doctorName, start_dt, end_dt).execution_options(**yield_per_options())
+
+    async def rows():
+        async with read_session_scope() as session:
+            # 按天/医生/科室聚合的处方条目数，行数与天数 x 医生数相当
+            items_by_dday = await drug_items_by_day(session, start_dt, end_dt)
+            result = await session.stream(stmt)
+            async for row in result:
+                yield custom_report_row(row, items_by_dday)
+
+    return stream_export(rows(), format, CUSTOM_REPORT_COLUMNS, "custom-report")
 
-    return ok({"list": data_list, "total": len(data_list)})
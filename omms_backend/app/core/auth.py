@@ -2,15 +2,95 @@ from typing import Optional
 
 from fastapi import Depends, Header, HTTPException, status
 from jose import JWTError, jwt
+from sqlalchemy import event, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.settings import settings
+from app.core.timing import timed
 from app.db.session import get_session
 from app.models.user import User
-from app.core.settings import settings
 
 
-async def get_current_user(authorization: Optional[str] = Header(None), session: AsyncSession = Depends(get_session)) -> User:
+class Principal:
+    """已认证用户主体：令牌声明 + 路由常用的用户字段"""
+
+    __slots__ = ("user_id", "role_id", "status", "username", "claims")
+
+    def __init__(self, user_id: int, role_id: Optional[int], status: int, username: Optional[str] = None, claims: Optional[dict] = None):
+        self.user_id = user_id
+        self.role_id = role_id
+        self.status = status
+        self.username = username
+        self.claims = claims or {}
+
+
+# 按 user_id 缓存用户主体，避免每个受保护请求都查询 users 表
+principal_cache = TTLCache(max_size=settings.PRINCIPAL_CACHE_MAX_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal(user_id: Optional[int] = None) -> None:
+    """用户被禁用或角色变更后调用；不传 user_id 时清空全部缓存"""
+    if user_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.pop(int(user_id))
+
+
+# 刷新时立即失效一次，但提交前并发请求仍可能从库中读到旧的状态/角色并重新缓存；
+# 受影响的 user_id 记在会话中，提交后再失效一次（"*" 表示清空全部）
+_PENDING = "principal_cache_user_ids"
+_ALL = "*"
+
+
+def _invalidate_after_commit(session: Optional[Session], user_id=_ALL) -> None:
+    invalidate_principal(None if user_id == _ALL else user_id)
+    if session is not None:
+        session.info.setdefault(_PENDING, set()).add(user_id)
+
+
+@event.listens_for(User, "after_update")
+def _on_user_update(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if state.attrs.status.history.has_changes() or state.attrs.role_id.history.has_changes():
+        _invalidate_after_commit(state.session, target.user_id)
+
+
+@event.listens_for(User, "after_delete")
+def _on_user_delete(mapper, connection, target: User) -> None:
+    _invalidate_after_commit(inspect(target).session, target.user_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_bulk_user_write(orm_execute_state) -> None:
+    # update(User)/delete(User) 批量语句不会触发实例事件，无法定位具体用户，直接清空
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        _invalidate_after_commit(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING, None)
+    if not user_ids:
+        return
+    if _ALL in user_ids:
+        invalidate_principal()
+        return
+    for user_id in user_ids:
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    # 回滚后库中仍是旧值，刷新时的失效只会多一次查询
+    session.info.pop(_PENDING, None)
+
+
+def decode_token(authorization: Optional[str]) -> tuple[int, dict]:
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="未认证")
     token = authorization.split(" ", 1)[1]
@@ -20,15 +100,33 @@ async def get_current_user(authorization: Optional[str] = Header(None), session:
         if not sub:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="无效令牌")
         user_id = int(sub)
-    except JWTError:
+    except (JWTError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="令牌解析失败")
-    res = await session.execute(select(User).where(User.user_id == user_id))
-    user = res.scalars().first()
-    if not user or user.status != 1:
+    return user_id, payload
+
+
+async def load_principal(session: AsyncSession, user_id: int, claims: dict) -> Principal:
+    cached: Optional[Principal] = principal_cache.get(user_id)
+    if cached is None:
+        res = await session.execute(
+            select(User.user_id, User.role_id, User.status, User.username).where(User.user_id == user_id)
+        )
+        row = res.first()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户不可用")
+        cached = Principal(user_id=row[0], role_id=row[1], status=row[2], username=row[3])
+        principal_cache.set(user_id, cached)
+    if cached.status != 1:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户不可用")
-    return user
+    # 缓存条目在多个令牌之间共享，声明按本次请求的令牌返回
+    return Principal(cached.user_id, cached.role_id, cached.status, cached.username, claims)
 
 
-async def require_auth(user: User = Depends(get_current_user)) -> User:
-    return user
+async def get_current_user(authorization: Optional[str] = Header(None), session: AsyncSession = Depends(get_session)) -> Principal:
+    with timed("auth"):
+        user_id, payload = decode_token(authorization)
+        return await load_principal(session, user_id, payload)
+
 
+async def require_auth(user: Principal = Depends(get_current_user)) -> Principal:
+    return user
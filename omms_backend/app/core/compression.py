@@ -0,0 +1,183 @@
+import zlib
+from typing import Optional
+
+from app.core.settings import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli 为可选依赖
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    codings: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, val = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        codings[name] = q
+    return codings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """按 Accept-Encoding 的 q 值选择 br / gzip，q 相同时优先 br"""
+    codings = parse_accept_encoding(accept_encoding)
+    wildcard = codings.get("*", 0.0)
+    candidates = []
+    if brotli is not None:
+        candidates.append(("br", codings.get("br", wildcard)))
+    candidates.append(("gzip", codings.get("gzip", codings.get("x-gzip", wildcard))))
+    best, q = max(candidates, key=lambda c: c[1])
+    return best if q > 0 else None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits=16+MAX_WBITS 输出带 gzip 头的流
+            self._z = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + self._br.flush() if flush else out
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.finish()
+        return self._z.compress(data) + self._z.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """按 Accept-Encoding 协商 br（安装 brotli 时）/ gzip 压缩响应体
+
+    单块响应小于 COMPRESSION_MIN_SIZE 字节时原样返回；流式响应逐块压缩并 flush，不在内存中整体缓冲。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept) if accept else None
+        responder = _CompressionResponder(send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: Optional[str]):
+        self._send = send
+        self.encoding = encoding
+        self.start_message: Optional[dict] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = {k.lower(): v for k, v in message.get("headers", [])}
+            content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+            compressible = content_type.startswith(COMPRESSIBLE_TYPES) and message.get("status", 200) not in (204, 304)
+            if not compressible or b"content-encoding" in headers:
+                self.passthrough = True
+                await self._send(message)
+                self.start_message = None
+                return
+            # 可压缩的类型无论本次是否压缩都需声明 Vary，避免缓存把压缩体返回给不支持的客户端
+            message = {**message, "headers": _with_vary(list(message.get("headers", [])))}
+            self.start_message = message
+            if self.encoding is None:
+                self.passthrough = True
+                await self._send(message)
+                self.start_message = None
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < settings.COMPRESSION_MIN_SIZE:
+                self.passthrough = True
+                await self._send(self.start_message)
+                self.start_message = None
+                await self._send(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            if not more_body:
+                # 单块响应：压缩后带上新的 Content-Length 一次发出
+                compressed = self.compressor.finish(body)
+                await self._send(self._compressed_start(len(compressed)))
+                self.start_message = None
+                await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+                return
+            await self._send(self._compressed_start(None))
+            self.start_message = None
+
+        if more_body:
+            chunk = self.compressor.compress(body, flush=True)
+            if chunk:
+                await self._send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self._send({"type": "http.response.body", "body": self.compressor.finish(body), "more_body": False})
+
+    def _compressed_start(self, content_length: Optional[int]) -> dict:
+        headers = []
+        for key, value in self.start_message.get("headers", []):
+            lower = key.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"etag" and not value.startswith(b"W/"):
+                # 压缩后的表示与原始字节不同，强 ETag 降级为弱 ETag
+                value = b"W/" + value
+            headers.append((key, value))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        return {**self.start_message, "headers": headers}
+
+
+def _with_vary(headers: list) -> list:
+    for i, (key, value) in enumerate(headers):
+        if key.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[i] = (key, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
@@ -0,0 +1,137 @@
+import zlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.record_dictionary import dictionary_changed
+from app.db.session import get_read_session
+from app.models.appointment import Department, Doctor
+from app.models.record import MedicalRecord, RecordTemplate
+from app.models.resource_version import ResourceVersion
+from app.models.supplier import Supplier
+
+
+# 资源 -> 影响其响应内容的模型
+RESOURCE_MODELS: dict[str, tuple[type, ...]] = {
+    "departments": (Department,),
+    "doctors": (Doctor, Department),
+    "record-templates": (RecordTemplate,),
+    "record-dictionaries": (MedicalRecord, RecordTemplate),
+    "suppliers": (Supplier,),
+}
+# 资源 -> 判断一次写入（new / deleted / dirty）是否影响其内容；未登记的资源相关模型的任何写入都递增。
+# 病历写入频繁，只有引用的检验/影像项目确有变化时才更新词典版本行，避免所有病历写入在同一行上串行
+RESOURCE_FILTERS = {
+    "record-dictionaries": dictionary_changed,
+}
+
+_version_table = ResourceVersion.__table__
+
+
+def resources_for(model: type) -> set[str]:
+    return {name for name, models in RESOURCE_MODELS.items() if model in models}
+
+
+def bump_versions(connection, names: Iterable[str]) -> None:
+    """在当前事务内递增资源版本号，随业务数据一起提交或回滚"""
+    names = sorted(set(names))
+    if not names:
+        return
+    now = datetime.now().replace(microsecond=0)
+    result = connection.execute(
+        update(_version_table)
+        .where(_version_table.c.name.in_(names))
+        .values(version=_version_table.c.version + 1, updated_at=now)
+    )
+    if result.rowcount != len(names):
+        existing = set(connection.execute(select(_version_table.c.name).where(_version_table.c.name.in_(names))).scalars())
+        missing = [n for n in names if n not in existing]
+        if missing:
+            connection.execute(insert(_version_table), [{"name": n, "version": 1, "updated_at": now} for n in missing])
+
+
+def _affected(obj, change: str) -> set[str]:
+    return {
+        name for name in resources_for(type(obj))
+        if name not in RESOURCE_FILTERS or RESOURCE_FILTERS[name](obj, change)
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session: Session, flush_context) -> None:
+    names: set[str] = set()
+    for obj in session.new:
+        names |= _affected(obj, "new")
+    for obj in session.deleted:
+        names |= _affected(obj, "deleted")
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            names |= _affected(obj, "dirty")
+    if names:
+        bump_versions(session.connection(), names)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_bulk_write(orm_execute_state) -> None:
+    # insert()/update()/delete() 批量语句不经过 flush，按目标模型直接递增
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        names = resources_for(mapper.class_)
+        if names:
+            bump_versions(orm_execute_state.session.connection(), names)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # 弱比较：压缩中间件等可能给 ETag 加上 W/ 前缀
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == target for tag in header.split(","))
+
+
+def conditional_get(resource: str):
+    """条件 GET 依赖：按资源版本号生成 ETag / Last-Modified，命中 If-None-Match / If-Modified-Since 时
+    直接返回 304，不执行路由中的查询"""
+
+    async def dependency(request: Request, response: Response, session: AsyncSession = Depends(get_read_session)):
+        row = (
+            await session.execute(
+                select(ResourceVersion.version, ResourceVersion.updated_at).where(ResourceVersion.name == resource)
+            )
+        ).first()
+        version, updated_at = (row[0], row[1]) if row else (0, None)
+        # 同一资源的不同查询参数（分页、筛选）返回不同内容，ETag 中带上 URL 摘要
+        url_key = zlib.crc32(f"{request.url.path}?{request.url.query}".encode())
+        etag = f'W/"{resource}-{version}-{url_key:08x}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if updated_at is not None:
+            # updated_at 为服务器本地时间（naive），转换为 GMT
+            headers["Last-Modified"] = format_datetime(updated_at.astimezone(timezone.utc), usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            not_modified = _not_modified_since(request.headers.get("if-modified-since"), updated_at)
+        if not_modified:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
+
+
+def _not_modified_since(header: Optional[str], updated_at: Optional[datetime]) -> bool:
+    if not header or updated_at is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return updated_at.astimezone() <= since
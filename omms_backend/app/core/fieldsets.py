@@ -0,0 +1,22 @@
+from typing import Iterable, Optional
+
+
+class UnknownFieldError(ValueError):
+    """fields 参数包含接口不支持的字段"""
+
+    def __init__(self, names: Iterable[str]):
+        self.names = sorted(names)
+        super().__init__(", ".join(self.names))
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str], always: Iterable[str] = ()) -> tuple[str, ...]:
+    """解析逗号分隔的 fields 参数，按 allowed 的顺序返回；未传时返回全部字段，always 中的字段总是包含"""
+    allowed = tuple(allowed)
+    if not raw or not raw.strip():
+        return allowed
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise UnknownFieldError(unknown)
+    requested |= set(always)
+    return tuple(name for name in allowed if name in requested)
@@ -0,0 +1,151 @@
+import logging
+import os
+import time
+
+from app.core.security import hash_pool
+from app.core.settings import settings
+from app.core.timing import finish_timings, start_timings
+from app.db.instrumentation import current_stats
+from app.db.pool import pool_stats
+from app.db.session import engine, read_engine
+
+try:
+    import prometheus_client
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:  # pragma: no cover - prometheus_client 为可选依赖
+    prometheus_client = None
+
+
+logger = logging.getLogger(__name__)
+
+# 多 worker 部署时在启动前设置 PROMETHEUS_MULTIPROC_DIR，各进程把指标写入该目录，/metrics 汇总全部进程
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+UNMATCHED_ROUTE = "unmatched"
+
+if prometheus_client is not None:
+    REQUESTS = Counter("omms_http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"])
+    LATENCY = Histogram(
+        "omms_http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS
+    )
+    IN_PROGRESS = Gauge(
+        "omms_http_requests_in_progress", "HTTP requests being served", ["method"], multiprocess_mode="livesum"
+    )
+    DB_SECONDS = Histogram(
+        "omms_http_db_seconds", "Time spent executing SQL per request", ["route"], buckets=PHASE_BUCKETS
+    )
+    DB_STATEMENTS = Histogram(
+        "omms_http_db_statements", "SQL statements executed per request", ["route"], buckets=STATEMENT_BUCKETS
+    )
+    SERIALIZE_SECONDS = Histogram(
+        "omms_http_serialization_seconds", "Time spent rendering JSON per request", ["route"], buckets=PHASE_BUCKETS
+    )
+    POOL_SIZE = Gauge("omms_db_pool_size", "Configured pool size", ["engine"], multiprocess_mode="livesum")
+    POOL_CHECKED_OUT = Gauge(
+        "omms_db_pool_checked_out", "Connections currently checked out", ["engine"], multiprocess_mode="livesum"
+    )
+    POOL_OVERFLOW = Gauge("omms_db_pool_overflow", "Overflow connections in use", ["engine"], multiprocess_mode="livesum")
+    POOL_CHECKOUT_TIMEOUTS = Gauge(
+        "omms_db_pool_checkout_timeouts", "Pool checkout timeouts since worker start", ["engine"], multiprocess_mode="livesum"
+    )
+    HASH_POOL_QUEUE_DEPTH = Gauge(
+        "omms_password_hash_queue_depth", "Password hash tasks waiting for a worker", multiprocess_mode="livesum"
+    )
+    HASH_POOL_REJECTIONS = Counter(
+        "omms_password_hash_rejections_total", "Password hash tasks rejected with 503 because the queue was full"
+    )
+
+
+def metrics_enabled() -> bool:
+    return settings.METRICS_ENABLED and prometheus_client is not None
+
+
+def update_pool_gauges() -> None:
+    engines = {"primary": engine}
+    if read_engine is not None:
+        engines["replica"] = read_engine
+    for name, eng in engines.items():
+        data = pool_stats(eng.pool)
+        if "size" not in data:
+            continue
+        POOL_SIZE.labels(name).set(data["size"])
+        POOL_CHECKED_OUT.labels(name).set(data["checkedOut"])
+        POOL_OVERFLOW.labels(name).set(data["overflow"])
+        POOL_CHECKOUT_TIMEOUTS.labels(name).set(data.get("checkoutTimeouts", 0))
+    HASH_POOL_QUEUE_DEPTH.set(hash_pool.queue_depth)
+
+
+def record_hash_pool_rejection() -> None:
+    if metrics_enabled():
+        HASH_POOL_REJECTIONS.inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    update_pool_gauges()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    """worker 退出时清理其 livesum 仪表，避免汇总中残留已退出进程的值"""
+    if MULTIPROCESS and prometheus_client is not None:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def route_template(scope) -> str:
+    """以路由模板（如 /api/records/{id}）作为标签，未匹配的路径归为一类，避免标签基数失控"""
+    # 较新的 FastAPI 惰性挂载子路由，scope["route"] 是未加前缀的原始路由，带前缀的模板在 effective_route_context 中
+    context = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(context, "path_format", None) or getattr(scope.get("route"), "path", None)
+    return path or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """按路由模板统计请求数、状态码、延迟直方图与进行中的请求数，并记录每个请求的数据库与序列化耗时。
+    需位于 QueryStatsMiddleware 之内，才能读取本请求的 SQL 统计"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics_enabled():
+            await self.app(scope, receive, send)
+            return
+        method = scope.get("method", "")
+        timings, token = start_timings()
+        status_code = 500
+        start = time.perf_counter()
+        IN_PROGRESS.labels(method).inc()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_PROGRESS.labels(method).dec()
+            finish_timings(token)
+            route = route_template(scope)
+            try:
+                REQUESTS.labels(method, route, str(status_code)).inc()
+                LATENCY.labels(method, route).observe(elapsed)
+                SERIALIZE_SECONDS.labels(route).observe(timings.get("serialize"))
+                stats = current_stats()
+                if stats is not None:
+                    DB_SECONDS.labels(route).observe(stats.db_seconds)
+                    DB_STATEMENTS.labels(route).observe(stats.statements)
+                update_pool_gauges()
+            except Exception:  # pragma: no cover - 指标失败不影响请求
+                logger.exception("failed to record request metrics")
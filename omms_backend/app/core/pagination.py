@@ -0,0 +1,134 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Optional, Sequence
+
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# exact 精确 COUNT | estimate 优化器估算（MySQL EXPLAIN，其余数据库退回精确计数）| none 不返回总数
+TOTAL_MODES = ("exact", "estimate", "none")
+
+
+class CursorError(ValueError):
+    """游标无法解析，或不属于当前列表"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise CursorError("unknown cursor value")
+    return value
+
+
+class Keyset:
+    """游标分页的排序键：按 keys 依次排序（最后一个键须唯一），游标记录上一页最后一行的键值，
+    下一页以 (k1, k2, ...) 严格在其之后为条件，避免 OFFSET 逐行跳过"""
+
+    def __init__(self, name: str, *keys: tuple[Any, bool]):
+        self.name = name
+        self.keys = keys
+
+    def order_by(self) -> list:
+        return [column.desc() if descending else column.asc() for column, descending in self.keys]
+
+    def encode(self, values: Sequence[Any]) -> str:
+        raw = json.dumps([self.name, [_encode_value(v) for v in values]], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> list:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            name, values = json.loads(raw)
+            values = [_decode_value(v) for v in values]
+        except (ValueError, TypeError):
+            raise CursorError("invalid cursor")
+        if name != self.name or len(values) != len(self.keys):
+            raise CursorError("cursor does not belong to this list")
+        return values
+
+    def after(self, values: Sequence[Any]):
+        # 展开为 k1 > v1 OR (k1 = v1 AND k2 > v2) ...，MySQL 5.5 无法对行构造器比较使用索引范围扫描
+        clauses = []
+        for i, (column, descending) in enumerate(self.keys):
+            equal = [self.keys[j][0] == values[j] for j in range(i)]
+            beyond = column < values[i] if descending else column > values[i]
+            clauses.append(and_(*equal, beyond))
+        return or_(*clauses)
+
+
+@dataclass
+class Page:
+    rows: list
+    total: Optional[int]
+    next_cursor: Optional[str]
+
+
+async def count_rows(session: AsyncSession, stmt: Select, mode: str = "exact") -> Optional[int]:
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        estimated = await _estimate_rows(session, stmt)
+        if estimated is not None:
+            return estimated
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return int((await session.execute(count_stmt)).scalar_one())
+
+
+async def _estimate_rows(session: AsyncSession, stmt: Select) -> Optional[int]:
+    connection = await session.connection()
+    dialect = connection.dialect
+    if dialect.name != "mysql":
+        return None
+    compiled = stmt.order_by(None).compile(dialect=dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    rows = (await connection.exec_driver_sql(f"EXPLAIN {compiled.string}", params)).mappings().all()
+    # 取驱动表（执行计划第一行）的估算行数
+    return int(rows[0]["rows"] or 0) if rows else 0
+
+
+async def paginate(
+    session: AsyncSession,
+    stmt: Select,
+    keyset: Keyset,
+    key_of: Callable[[Any], Sequence[Any]],
+    *,
+    page: int,
+    page_size: int,
+    cursor: Optional[str] = None,
+    total_mode: str = "exact",
+    scalars: bool = False,
+) -> Page:
+    """传入 cursor 时按键集翻页，否则按 page 使用 OFFSET；两种方式都会返回下一页游标。
+    多取一行判断是否还有下一页；key_of 从结果行取出排序键值"""
+    if total_mode not in TOTAL_MODES:
+        raise ValueError(f"totalMode must be one of {', '.join(TOTAL_MODES)}")
+    after = keyset.decode(cursor) if cursor else None
+    total = await count_rows(session, stmt, total_mode)
+    page_stmt = stmt.order_by(*keyset.order_by())
+    if after is not None:
+        page_stmt = page_stmt.where(keyset.after(after))
+    else:
+        page_stmt = page_stmt.offset((page - 1) * page_size)
+    result = await session.execute(page_stmt.limit(page_size + 1))
+    rows = list(result.scalars().all() if scalars else result.all())
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = keyset.encode(key_of(rows[-1]))
+    return Page(rows=rows, total=total, next_cursor=next_cursor)
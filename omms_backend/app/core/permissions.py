@@ -1,38 +1,134 @@
-from typing import Iterable
+import asyncio
+import hmac
+import logging
+import time
+from typing import Iterable, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.core.auth import get_current_user
+from app.core.auth import decode_token, get_current_user, load_principal
+from app.core.settings import settings
+from app.core.timing import timed
 from app.db.session import get_session
 
 
-async def require_role_in(roles: Iterable[str], user=Depends(get_current_user), session: AsyncSession = Depends(get_session)):
-    rid = user.role_id or 0
-    res = await session.execute(text("SELECT role_name FROM roles WHERE role_id=:rid"), {"rid": rid})
-    row = res.first()
-    role_name = (row[0] if row else None) or ""
-    if role_name not in set(roles):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
-    return user
-
-
-async def require_perm_codes(perms: Iterable[str], user=Depends(get_current_user), session: AsyncSession = Depends(get_session)):
-    rid = user.role_id or 0
-    res = await session.execute(
-        text(
-            """
-            SELECT p.perm_code FROM role_permissions rp
-            JOIN permissions p ON rp.perm_id = p.perm_id
-            WHERE rp.role_id = :rid
-            """
-        ),
-        {"rid": rid},
-    )
-    user_perms = {row[0] for row in res.all()}
-    need = set(perms)
-    if not need.issubset(user_perms):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
-    return user
+logger = logging.getLogger(__name__)
+
+
+class PermissionSnapshot:
+    """角色/权限的进程内快照：role_id -> 角色名、role_id -> 权限码集合
+
+    启动时加载，之后按 PERMISSION_SNAPSHOT_TTL_SECONDS 定期刷新；
+    修改 roles / role_permissions / permissions 后调用 bump() 可在下次校验时立即重新加载。
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = float(ttl)
+        self.version = 0
+        self.role_names: dict[int, str] = {}
+        self.role_perms: dict[int, frozenset[str]] = {}
+        self._loaded_version = -1
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_fresh(self) -> bool:
+        return self._loaded_version == self.version and time.monotonic() < self._expires_at
+
+    def bump(self) -> int:
+        self.version += 1
+        return self.version
+
+    async def load(self, session: AsyncSession) -> None:
+        version = self.version
+        role_rows = await session.execute(text("SELECT role_id, role_name FROM roles"))
+        role_names = {int(rid): (name or "") for rid, name in role_rows.all()}
+        perm_rows = await session.execute(
+            text(
+                """
+                SELECT rp.role_id, p.perm_code FROM role_permissions rp
+                JOIN permissions p ON rp.perm_id = p.perm_id
+                """
+            )
+        )
+        role_perms: dict[int, set[str]] = {}
+        for rid, code in perm_rows.all():
+            role_perms.setdefault(int(rid), set()).add(code)
+        self.role_names = role_names
+        self.role_perms = {rid: frozenset(codes) for rid, codes in role_perms.items()}
+        self._loaded_version = version
+        self._expires_at = time.monotonic() + self.ttl
+
+    async def ensure_fresh(self, session: AsyncSession) -> None:
+        if self.is_fresh:
+            return
+        async with self._lock:
+            if self.is_fresh:
+                return
+            try:
+                await self.load(session)
+            except Exception as e:
+                # 加载失败时沿用旧快照，并在一个刷新周期后重试，避免每个请求都打到数据库
+                logger.warning("failed to load role/permission snapshot: %s", e)
+                self._loaded_version = self.version
+                self._expires_at = time.monotonic() + self.ttl
+
+    def role_name(self, role_id: Optional[int]) -> str:
+        return self.role_names.get(int(role_id or 0), "")
+
+    def perm_codes(self, role_id: Optional[int]) -> frozenset[str]:
+        return self.role_perms.get(int(role_id or 0), frozenset())
+
+
+permission_snapshot = PermissionSnapshot(ttl=settings.PERMISSION_SNAPSHOT_TTL_SECONDS)
 
+
+async def has_role_in(session: AsyncSession, user, roles: Iterable[str]) -> bool:
+    await permission_snapshot.ensure_fresh(session)
+    return permission_snapshot.role_name(user.role_id) in roles
+
+
+def require_role_in(roles: Iterable[str]):
+    allowed = frozenset(roles)
+
+    async def dependency(user=Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+        with timed("permission"):
+            if not await has_role_in(session, user, allowed):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
+        return user
+
+    return dependency
+
+
+def require_perm_codes(perms: Iterable[str]):
+    need = frozenset(perms)
+
+    async def dependency(user=Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+        with timed("permission"):
+            await permission_snapshot.ensure_fresh(session)
+            if not need.issubset(permission_snapshot.perm_codes(user.role_id)):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
+        return user
+
+    return dependency
+
+
+INTERNAL_ROLES = frozenset({"admin"})
+
+
+async def require_internal_access(
+    authorization: Optional[str] = Header(None), session: AsyncSession = Depends(get_session)
+) -> None:
+    """/internal/* 与 /metrics：INTERNAL_ENDPOINTS_ENABLED 关闭时返回 404；
+    开启后需携带 INTERNAL_ENDPOINTS_TOKEN（供 Prometheus 等抓取）或管理员令牌"""
+    if not settings.INTERNAL_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    token = settings.INTERNAL_ENDPOINTS_TOKEN
+    if token and authorization and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        return
+    user_id, claims = decode_token(authorization)
+    user = await load_principal(session, user_id, claims)
+    if not await has_role_in(session, user, INTERNAL_ROLES):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
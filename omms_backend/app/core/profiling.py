@@ -0,0 +1,162 @@
+import cProfile
+import io
+import itertools
+import logging
+import os
+import pstats
+import re
+import time
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+
+from app.core.auth import decode_token, load_principal
+from app.core.permissions import has_role_in
+from app.core.settings import settings
+from app.db.session import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "_profile"
+PROFILER_ROLES = frozenset({"admin"})
+
+# file：报告写入 PROFILING_DIR，响应照常返回；inline：丢弃原响应，直接返回文本报告
+_MODES = {"1": "file", "true": "file", "file": "file", "inline": "inline"}
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# cProfile 按线程采集，事件循环内同一时刻只允许一个请求被分析
+_active = False
+_sequence = itertools.count(1)
+
+
+def requested_mode(scope) -> Optional[str]:
+    value = Headers(scope=scope).get(PROFILE_HEADER)
+    if value is None:
+        values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(PROFILE_QUERY)
+        value = values[0] if values else None
+    if value is None:
+        return None
+    return _MODES.get(value.strip().lower())
+
+
+async def is_profiler_user(scope) -> bool:
+    """与 require_role_in(["admin"]) 相同的判定；令牌无效或角色不符时返回 False"""
+    try:
+        # 先做不访问数据库的令牌校验：匿名或伪造令牌的请求不会打开会话
+        user_id, claims = decode_token(Headers(scope=scope).get("authorization"))
+    except HTTPException:
+        return False
+    try:
+        async with AsyncSessionLocal() as session:
+            user = await load_principal(session, user_id, claims)
+            return await has_role_in(session, user, PROFILER_ROLES)
+    except HTTPException:
+        return False
+
+
+def profile_report(profiler: cProfile.Profile) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(settings.PROFILING_TOP_N)
+    return stream.getvalue()
+
+
+def report_name(scope) -> str:
+    path = _UNSAFE_CHARS.sub("_", scope.get("path", "").strip("/")) or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{scope.get('method', '')}-{path[:80]}-{os.getpid()}-{next(_sequence)}"
+
+
+def save_report(profiler: cProfile.Profile, name: str) -> str:
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    base = os.path.join(settings.PROFILING_DIR, name)
+    # .prof 可用 snakeviz / pstats 打开，.txt 为按累计耗时排序的摘要
+    profiler.dump_stats(base + ".prof")
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(profile_report(profiler))
+    return base + ".prof"
+
+
+class ProfilerMiddleware:
+    """管理员通过 X-Profile 请求头（或 _profile 查询参数）对单个请求做 cProfile 分析。
+    值为 1/file 时报告写入 PROFILING_DIR 并在 X-Profile-Report 头返回文件名；值为 inline 时直接返回文本报告。
+    分析期间事件循环上并发执行的其他请求也会计入报告"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        mode = requested_mode(scope)
+        if mode is None or not await is_profiler_user(scope):
+            await self.app(scope, receive, send)
+            return
+        global _active
+        if _active:
+            await self.app(scope, receive, _with_headers(send, [(b"x-profile-status", b"busy")]))
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 已有其他分析工具占用（Python 3.12+ 的 sys.monitoring）
+            await self.app(scope, receive, _with_headers(send, [(b"x-profile-status", b"busy")]))
+            return
+        _active = True
+        name = report_name(scope)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_inline(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        if mode == "inline":
+            downstream = send_inline
+        else:
+            downstream = _with_headers(send, [(b"x-profile-report", f"{name}.prof".encode())])
+
+        try:
+            await self.app(scope, receive, downstream)
+        finally:
+            profiler.disable()
+            _active = False
+            elapsed = time.perf_counter() - start
+
+        if mode == "inline":
+            body = f"{scope.get('method')} {scope.get('path')} status={status_code} wall={elapsed * 1000:.1f}ms\n\n"
+            body = (body + profile_report(profiler)).encode("utf-8")
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/plain; charset=utf-8"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"cache-control", b"no-store"),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            path = save_report(profiler, name)
+            logger.info("request profile saved path=%s elapsed_ms=%.1f", path, elapsed * 1000)
+        except OSError:
+            logger.exception("failed to save request profile")
+
+
+def _with_headers(send, extra: list[tuple[bytes, bytes]]):
+    async def wrapper(message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": list(message.get("headers", [])) + extra}
+        await send(message)
+
+    return wrapper
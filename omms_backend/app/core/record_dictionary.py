@@ -0,0 +1,135 @@
+import json
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, event, inspect, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.upsert import increment_upsert
+from app.models.record import MedicalRecord, RecordDictionaryEntry, RecordTemplate
+
+
+KINDS = ("labs", "imaging")
+# 病历上各词典对应的 JSON 列
+RECORD_COLUMNS = {"labs": "labs_json", "imaging": "imaging_json"}
+KEY_COLUMNS = ("kind", "name")
+NAME_MAX_LENGTH = RecordDictionaryEntry.__table__.c.name.type.length
+
+_table = RecordDictionaryEntry.__table__
+
+
+def _names(values) -> set[str]:
+    if not isinstance(values, list):
+        return set()
+    return {v.strip()[:NAME_MAX_LENGTH] for v in values if isinstance(v, str) and v.strip()}
+
+
+def record_items(text_val: Optional[str]) -> set[str]:
+    """病历 labs_json / imaging_json 中的项目名（去空白、去重）"""
+    try:
+        return _names(json.loads(text_val)) if text_val else set()
+    except Exception:
+        return set()
+
+
+def template_items(defaults_json: Optional[str], kind: str) -> set[str]:
+    """模板 defaults_json 中 labs / imaging 默认值的项目名"""
+    try:
+        defaults = json.loads(defaults_json or "{}")
+    except Exception:
+        return set()
+    return _names(defaults.get(kind)) if isinstance(defaults, dict) else set()
+
+
+def _items(obj, kind: str, value) -> set[str]:
+    if isinstance(obj, MedicalRecord):
+        return record_items(value)
+    return template_items(value, kind)
+
+
+def _column(obj, kind: str) -> str:
+    return RECORD_COLUMNS[kind] if isinstance(obj, MedicalRecord) else "defaults_json"
+
+
+async def dictionary_names(session: AsyncSession, kinds: Iterable[str] = KINDS) -> dict[str, set[str]]:
+    """按词典类型返回仍被引用（usage_count > 0）的项目名"""
+    kinds = list(kinds)
+    res = await session.execute(
+        select(_table.c.kind, _table.c.name).where(_table.c.kind.in_(kinds), _table.c.usage_count > 0)
+    )
+    names = {kind: set() for kind in kinds}
+    for kind, name in res.all():
+        names[kind].add(name)
+    return names
+
+
+def rebuild_record_dictionary(connection) -> None:
+    """按 records 与模板全量重算词典表；绕过 ORM 批量写入病历或模板（如 scripts/init_db.py）后调用"""
+    counts: Counter = Counter()
+    records = connection.execute(
+        select(MedicalRecord.labs_json, MedicalRecord.imaging_json)
+        .where(or_(MedicalRecord.has_lab == True, MedicalRecord.has_imaging == True))
+        .execution_options(yield_per=1000)
+    )
+    for labs_json, imaging_json in records:
+        counts.update(("labs", name) for name in record_items(labs_json))
+        counts.update(("imaging", name) for name in record_items(imaging_json))
+    for (defaults_json,) in connection.execute(select(RecordTemplate.defaults_json)):
+        for kind in KINDS:
+            counts.update((kind, name) for name in template_items(defaults_json, kind))
+    connection.execute(delete(_table))
+    if counts:
+        connection.execute(
+            insert(_table),
+            [{"kind": kind, "name": name, "usage_count": n} for (kind, name), n in counts.items()],
+        )
+
+
+def _previous(obj, column: str):
+    history = inspect(obj).attrs[column].history
+    return history.deleted[0] if history.deleted else getattr(obj, column)
+
+
+def entries(obj, previous: bool = False) -> set[tuple[str, str]]:
+    """病历或模板引用的 (词典类型, 项目名)；previous=True 时取本次修改前的值"""
+    result = set()
+    for kind in KINDS:
+        column = _column(obj, kind)
+        value = _previous(obj, column) if previous else getattr(obj, column)
+        result |= {(kind, name) for name in _items(obj, kind, value)}
+    return result
+
+
+def _columns_changed(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[_column(obj, kind)].history.has_changes() for kind in KINDS)
+
+
+def dictionary_changed(obj, change: str) -> bool:
+    """一次 flush 中病历或模板的写入（new / deleted / dirty）是否改变了其引用的词典项目"""
+    if change == "new":
+        return bool(entries(obj))
+    if change == "deleted":
+        return bool(entries(obj, previous=True))
+    return _columns_changed(obj) and entries(obj, previous=True) != entries(obj)
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session: Session, flush_context) -> None:
+    # 与病历、模板写入同一事务内按差量更新引用次数，随业务数据一起提交或回滚
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, (MedicalRecord, RecordTemplate)):
+            deltas.update(entries(obj))
+    for obj in session.deleted:
+        if isinstance(obj, (MedicalRecord, RecordTemplate)):
+            deltas.subtract(entries(obj, previous=True))
+    for obj in session.dirty:
+        if isinstance(obj, (MedicalRecord, RecordTemplate)) and _columns_changed(obj):
+            before, after = entries(obj, previous=True), entries(obj)
+            deltas.update(after - before)
+            deltas.subtract(before - after)
+    rows = [{"kind": kind, "name": name, "usage_count": n} for (kind, name), n in deltas.items() if n]
+    if rows:
+        increment_upsert(session.connection(), _table, KEY_COLUMNS, ("usage_count",), rows)
@@ -0,0 +1,71 @@
+from typing import Optional
+
+from sqlalchemy import column, literal_column, or_, table
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.models.record import MedicalRecord
+
+
+# MySQL 5.7.6 起 InnoDB FULLTEXT 支持 ngram 分词器；更早的版本（如 5.5）迁移 0009 不建全文索引
+FULLTEXT_MIN_VERSION = (5, 7, 6)
+# 少于该长度的词无法命中索引（FTS5 trigram 按三字切分，MySQL ngram 默认 ngram_token_size=2），改用 LIKE
+MIN_TERM_LENGTH = {"fts5": 3, "fulltext": 2}
+
+_fts = table("records_fts", column("rowid"))
+_fts_ids = table("records_fts_ids", column("search_id"), column("record_id"))
+
+
+def search_backend(dialect) -> str:
+    """fts5：SQLite FTS5 虚表 records_fts；fulltext：MySQL FULLTEXT ngram 索引；like：不走索引的 LIKE"""
+    if not settings.RECORD_SEARCH_FULLTEXT:
+        return "like"
+    if dialect.name == "sqlite":
+        return "fts5"
+    if dialect.name == "mysql" and (dialect.server_version_info or ()) >= FULLTEXT_MIN_VERSION:
+        return "fulltext"
+    return "like"
+
+
+class RecordSearch:
+    """主诉与诊断的全文检索；关键词按空白拆分，各词需同时命中，apply 给病历查询加上匹配条件与相关度排序"""
+
+    def __init__(self, backend: str, keyword: str):
+        self.backend = backend
+        terms = list(dict.fromkeys(keyword.split()))
+        min_length = MIN_TERM_LENGTH.get(backend)
+        self.indexed = [t for t in terms if min_length and len(t) >= min_length]
+        self.like_filters = [
+            or_(
+                MedicalRecord.chief_complaint.contains(t, autoescape=True),
+                MedicalRecord.diagnosis.contains(t, autoescape=True),
+            )
+            for t in terms
+            if t not in self.indexed
+        ]
+
+    def apply(self, stmt):
+        stmt = stmt.where(*self.like_filters)
+        newest = (MedicalRecord.created_at.desc(), MedicalRecord.id.desc())
+        if not self.indexed:
+            return stmt.order_by(*newest)
+        if self.backend == "fts5":
+            # 各词作为短语，双引号转义后以 AND 连接；bm25 越小越相关
+            query = " AND ".join('"' + t.replace('"', '""') + '"' for t in self.indexed)
+            return (
+                stmt.join(_fts_ids, _fts_ids.c.record_id == MedicalRecord.id)
+                .join(_fts, _fts.c.rowid == _fts_ids.c.search_id)
+                .where(literal_column("records_fts").op("MATCH")(query))
+                .order_by(literal_column("bm25(records_fts)"), *newest)
+            )
+        # 布尔模式下每个词加 + 表示必须命中，词内引号去掉后整体作为短语
+        query = " ".join('+"' + t.replace('"', "") + '"' for t in self.indexed)
+        score = match(MedicalRecord.chief_complaint, MedicalRecord.diagnosis, against=query).in_boolean_mode()
+        return stmt.where(score).order_by(score.desc(), *newest)
+
+
+async def record_search(session: AsyncSession, keyword: str) -> RecordSearch:
+    connection = await session.connection()
+    return RecordSearch(search_backend(connection.dialect), keyword)
+
@@ -0,0 +1,127 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import case, delete, event, func, inspect, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.upsert import increment_upsert
+from app.models.record import MedicalRecord, RecordDailyStat
+
+
+STATUSES = ("draft", "finalized", "cancelled")
+# 汇总列 -> 统计接口字段
+COUNT_FIELDS = {
+    "total": "total",
+    "draft": "draft",
+    "finalized": "finalized",
+    "cancelled": "cancelled",
+    "with_lab": "withLab",
+    "with_imaging": "withImaging",
+}
+KEY_COLUMNS = ("day", "dept_id", "doctor_id")
+# 影响汇总的病历字段
+TRACKED_ATTRS = ("created_at", "dept_id", "doctor_id", "status", "has_lab", "has_imaging")
+
+_table = RecordDailyStat.__table__
+
+
+def _flag(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def count_columns() -> list:
+    """records 上的条件聚合：一次扫描得到总数、各状态数与含检验/影像的病历数"""
+    return [
+        func.count().label("total"),
+        *[_flag(MedicalRecord.status == s).label(s) for s in STATUSES],
+        _flag(MedicalRecord.has_lab == True).label("with_lab"),
+        _flag(MedicalRecord.has_imaging == True).label("with_imaging"),
+    ]
+
+
+async def records_stats_data(
+    session: AsyncSession,
+    bounds: Optional[tuple[datetime, datetime]],
+    dept_id: Optional[int],
+    doctor_id: Optional[int],
+) -> dict:
+    """bounds 为 [起始, 结束) 的整日区间；RECORD_STATS_ROLLUP 开启时读按日汇总表，否则对 records 做一次条件聚合"""
+    if settings.RECORD_STATS_ROLLUP:
+        stmt = select(*[func.coalesce(func.sum(_table.c[name]), 0).label(name) for name in COUNT_FIELDS])
+        if bounds:
+            stmt = stmt.where(_table.c.day >= bounds[0].date(), _table.c.day < bounds[1].date())
+        if dept_id:
+            stmt = stmt.where(_table.c.dept_id == dept_id)
+        if doctor_id:
+            stmt = stmt.where(_table.c.doctor_id == doctor_id)
+    else:
+        stmt = select(*count_columns())
+        if bounds:
+            stmt = stmt.where(MedicalRecord.created_at >= bounds[0], MedicalRecord.created_at < bounds[1])
+        if dept_id:
+            stmt = stmt.where(MedicalRecord.dept_id == dept_id)
+        if doctor_id:
+            stmt = stmt.where(MedicalRecord.doctor_id == doctor_id)
+    row = (await session.execute(stmt)).one()
+    return {field: int(row._mapping[name] or 0) for name, field in COUNT_FIELDS.items()}
+
+
+def rebuild_record_daily_stats(connection) -> None:
+    """按 records 全量重算汇总表；绕过 ORM 批量写入病历（如 scripts/init_db.py）后调用"""
+    day = func.date(MedicalRecord.created_at)
+    source = select(day, MedicalRecord.dept_id, MedicalRecord.doctor_id, *count_columns()).group_by(
+        day, MedicalRecord.dept_id, MedicalRecord.doctor_id
+    )
+    connection.execute(delete(_table))
+    connection.execute(insert(_table).from_select([*KEY_COLUMNS, *COUNT_FIELDS], source))
+
+
+def _values(obj, previous: bool) -> dict:
+    state = inspect(obj)
+    values = {}
+    for name in TRACKED_ATTRS:
+        history = state.attrs[name].history
+        values[name] = history.deleted[0] if previous and history.deleted else getattr(obj, name)
+    return values
+
+
+def _add(deltas: dict, values: dict, sign: int) -> None:
+    created_at = values["created_at"]
+    if created_at is None:
+        return
+    day = created_at.date() if isinstance(created_at, datetime) else created_at
+    counts = deltas[(day, values["dept_id"], values["doctor_id"])]
+    counts["total"] += sign
+    if values["status"] in STATUSES:
+        counts[values["status"]] += sign
+    counts["with_lab"] += sign if values["has_lab"] else 0
+    counts["with_imaging"] += sign if values["has_imaging"] else 0
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session: Session, flush_context) -> None:
+    # 与病历写入同一事务内按差量更新汇总行，随业务数据一起提交或回滚
+    deltas: dict = defaultdict(lambda: dict.fromkeys(COUNT_FIELDS, 0))
+    for obj in session.new:
+        if isinstance(obj, MedicalRecord):
+            _add(deltas, _values(obj, previous=False), 1)
+    for obj in session.deleted:
+        if isinstance(obj, MedicalRecord):
+            _add(deltas, _values(obj, previous=True), -1)
+    for obj in session.dirty:
+        if not isinstance(obj, MedicalRecord):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[name].history.has_changes() for name in TRACKED_ATTRS):
+            _add(deltas, _values(obj, previous=True), -1)
+            _add(deltas, _values(obj, previous=False), 1)
+    rows = [
+        {"day": day, "dept_id": dept_id, "doctor_id": doctor_id, **counts}
+        for (day, dept_id, doctor_id), counts in deltas.items()
+        if any(counts.values())
+    ]
+    if rows:
+        increment_upsert(session.connection(), _table, KEY_COLUMNS, COUNT_FIELDS, rows)
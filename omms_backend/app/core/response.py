@@ -1,7 +1,63 @@
+import json
+from decimal import Decimal
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.timing import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None
+
 
 def ok(data=None, message="success"):
     return {"code": 200, "message": message, "data": data}
 
 def err(code: int, message: str, data=None):
     return {"code": code, "message": message, "data": data}
+
+
+def _orjson_default(obj: Any) -> Any:
+    # orjson 原生支持 dict/list/str/int/float/bool/None、datetime/date/time、UUID、Enum 与 dataclass，
+    # 其余类型按 jsonable_encoder 的规则转换
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """序列化为 UTF-8 JSON 字节：有 orjson 时一次遍历直接处理 pydantic 模型、datetime、Decimal，
+    未安装 orjson 时退回 jsonable_encoder + json.dumps"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class UTF8JSONResponse(JSONResponse):
+    """UTF-8、不转义中文的 JSON 响应，不再经过 jsonable_encoder；渲染耗时计入请求的 serialize 阶段"""
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return dumps(content)
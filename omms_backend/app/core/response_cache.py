@@ -0,0 +1,382 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from itertools import chain
+from typing import Any, Awaitable, Callable, Iterable, Optional
+from urllib.parse import urlencode
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from app.core.auth import Principal, get_current_user
+from app.core.cache import TTLCache
+from app.core.response import dumps, loads
+from app.core.settings import settings
+from app.db.session import REPLICA_SESSION, AsyncSessionLocal
+from app.models.appointment import Appointment, Department, Doctor
+from app.models.medicine import Medicine
+from app.models.patient import Patient
+from app.models.prescription import Prescription, PrescriptionItem
+from app.models.record import MedicalRecord, RecordTemplate
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - redis 为可选依赖
+    aioredis = None
+    RedisError = OSError
+
+
+logger = logging.getLogger(__name__)
+
+# 缓存命名空间 -> 影响其内容的模型；这些模型的写入提交后，该命名空间下的全部条目失效
+NAMESPACE_MODELS: dict[str, tuple[type, ...]] = {
+    "records": (MedicalRecord, RecordTemplate),
+    "reports": (Appointment, Patient, Doctor, Department, Prescription, PrescriptionItem, Medicine),
+}
+
+BACKEND_ERRORS = (RedisError, OSError, asyncio.TimeoutError)
+_POLL_SECONDS = 0.05
+
+
+def namespaces_for(model: type) -> set[str]:
+    return {name for name, models in NAMESPACE_MODELS.items() if model in models}
+
+
+class MemoryCacheBackend:
+    """进程内后端：LRU + TTL，失效时递增命名空间代数，旧条目随 LRU/TTL 淘汰。
+    条目与代数都在本进程内，写入后只有处理该请求的 worker 失效，仅适用于单进程部署"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._cache = TTLCache(max_size=max_entries, ttl=ttl)
+        self._generations: dict[str, int] = {}
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, value, ttl)
+
+    def bump(self, namespaces: Iterable[str]) -> None:
+        for ns in namespaces:
+            self._generations[ns] = self._generations.get(ns, 0) + 1
+
+    async def invalidate(self, namespaces: Iterable[str]) -> None:
+        self.bump(namespaces)
+
+    async def acquire(self, key: str, ttl: float) -> bool:
+        # 进程内的 single-flight 已保证同一键只计算一次
+        return True
+
+    async def release(self, key: str) -> None:
+        return None
+
+    async def stats(self) -> dict:
+        return {"backend": self.name, **self._cache.stats(), "generations": dict(self._generations)}
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+
+class RedisCacheBackend:
+    """Redis 后端：多个 worker 共享条目与命名空间代数，跨进程以 SET NX 锁防止击穿。
+    容量上限由 Redis 的 maxmemory + allkeys-lru 控制"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "omms:rc:"):
+        self._client = aioredis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self._prefix = prefix
+
+    async def generation(self, namespace: str) -> int:
+        value = await self._client.get(f"{self._prefix}gen:{namespace}")
+        return int(value or 0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(self._prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(self._prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    async def invalidate(self, namespaces: Iterable[str]) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for ns in namespaces:
+                pipe.incr(f"{self._prefix}gen:{ns}")
+            await pipe.execute()
+
+    async def acquire(self, key: str, ttl: float) -> bool:
+        return bool(await self._client.set(f"{self._prefix}lock:{key}", b"1", nx=True, px=max(1, int(ttl * 1000))))
+
+    async def release(self, key: str) -> None:
+        await self._client.delete(f"{self._prefix}lock:{key}")
+
+    async def stats(self) -> dict:
+        info = await self._client.info("stats")
+        memory = await self._client.info("memory")
+        return {
+            "backend": self.name,
+            "hits": info.get("keyspace_hits"),
+            "misses": info.get("keyspace_misses"),
+            "evictedKeys": info.get("evicted_keys"),
+            "usedMemory": memory.get("used_memory"),
+            "maxMemory": memory.get("maxmemory"),
+            "maxMemoryPolicy": memory.get("maxmemory_policy"),
+        }
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+_backend: Any = None
+_backend_ready = False
+
+
+def get_backend():
+    """按 RESPONSE_CACHE_BACKEND 惰性创建后端；off 时返回 None"""
+    global _backend, _backend_ready
+    if _backend_ready:
+        return _backend
+    kind = (settings.RESPONSE_CACHE_BACKEND or "off").lower()
+    if kind == "redis" and aioredis is None:
+        # 不退回 memory：redis 用于多 worker 部署，进程内缓存的失效无法到达其他 worker
+        logger.warning("RESPONSE_CACHE_BACKEND=redis but the redis package is not installed; response cache disabled")
+        kind = "off"
+    if kind == "redis":
+        _backend = RedisCacheBackend(settings.RESPONSE_CACHE_REDIS_URL)
+    elif kind == "memory":
+        _backend = MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+    else:
+        _backend = None
+    _backend_ready = True
+    return _backend
+
+
+async def close_backend() -> None:
+    global _backend, _backend_ready
+    if _backend is not None:
+        await _backend.close()
+    _backend, _backend_ready = None, False
+
+
+async def response_cache_stats() -> dict:
+    backend = get_backend()
+    if backend is None:
+        return {"backend": "off"}
+    try:
+        return await backend.stats()
+    except BACKEND_ERRORS as exc:
+        return {"backend": backend.name, "error": str(exc)}
+
+
+# 进程内 single-flight：同一键只有一个请求执行查询，其余请求等待其结果
+_inflight: dict[str, asyncio.Future] = {}
+
+
+async def _single_flight(key: str, compute: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+    while True:
+        future = _inflight.get(key)
+        if future is None:
+            break
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # 领头请求被取消（客户端断开）时由等待者重新竞争；自身被取消则照常抛出
+            if not future.cancelled():
+                raise
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        payload = await compute()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        future.exception()  # 没有等待者时不输出 "exception was never retrieved"
+        raise
+    else:
+        future.set_result(payload)
+        return payload
+    finally:
+        _inflight.pop(key, None)
+
+
+def _cache_payload(result: Any) -> Optional[bytes]:
+    # 只缓存成功的 ok(...) 结果；err(...) 与直接返回的 Response 不缓存
+    if isinstance(result, dict) and result.get("code") == 200:
+        return dumps(result)
+    return None
+
+
+async def _entry_key(backend, namespace: str, request: Request, user: Principal) -> str:
+    query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}|role={user.role_id}".encode()).hexdigest()
+    generation = await backend.generation(namespace)
+    return f"{namespace}:{generation}:{digest}"
+
+
+async def _wait_for_entry(backend, key: str, timeout: float) -> Optional[bytes]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(_POLL_SECONDS)
+        data = await backend.get(key)
+        if data is not None:
+            return data
+    return None
+
+
+async def _compute_on_primary(func, args, kwargs):
+    # 失效在主库提交后立即生效，副本此时可能仍落后；在副本上计算会把旧数据存到新代数下，
+    # 写入在整个 TTL 内不可见。缓存未命中时改用主库会话计算
+    replica = [
+        name for name, value in kwargs.items()
+        if isinstance(value, AsyncSession) and value.info.get(REPLICA_SESSION)
+    ]
+    if not replica:
+        return await func(*args, **kwargs)
+    async with AsyncSessionLocal() as session:
+        return await func(*args, **{**kwargs, **dict.fromkeys(replica, session)})
+
+
+def cached(namespace: str, ttl: Optional[float] = None):
+    """GET 路由响应缓存：按路径、查询参数与角色生成键，带 TTL 与 single-flight。
+    放在 @router.get 之下；命中时返回缓存的数据，仍经过 response_model 校验"""
+    if namespace not in NAMESPACE_MODELS:
+        raise ValueError(f"unknown response cache namespace: {namespace}")
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, _cache_request: Request, _cache_response: Response, _cache_user: Principal, **kwargs):
+            backend = get_backend()
+            if backend is None:
+                return await func(*args, **kwargs)
+            entry_ttl = settings.RESPONSE_CACHE_TTL_SECONDS if ttl is None else ttl
+            try:
+                key = await _entry_key(backend, namespace, _cache_request, _cache_user)
+                data = await backend.get(key)
+            except BACKEND_ERRORS as exc:
+                logger.warning("response cache unavailable, computing %s directly: %s", _cache_request.url.path, exc)
+                return await func(*args, **kwargs)
+            if data is not None:
+                _cache_response.headers["X-Cache"] = "HIT"
+                return loads(data)
+
+            own: dict = {}
+
+            async def compute() -> Optional[bytes]:
+                lock_seconds = settings.RESPONSE_CACHE_LOCK_SECONDS
+                locked = await _guarded(backend.acquire(key, lock_seconds), default=True)
+                if not locked:
+                    # 其他 worker 正在计算同一键
+                    data = await _guarded(_wait_for_entry(backend, key, lock_seconds))
+                    if data is not None:
+                        return data
+                try:
+                    own["result"] = await _compute_on_primary(func, args, kwargs)
+                    payload = _cache_payload(own["result"])
+                    if payload is not None:
+                        await _guarded(backend.set(key, payload, entry_ttl))
+                    return payload
+                finally:
+                    if locked:
+                        await _guarded(backend.release(key))
+
+            payload = await _single_flight(key, compute)
+            if "result" in own:
+                _cache_response.headers["X-Cache"] = "MISS"
+                return own["result"]
+            if payload is None:
+                # 领头请求的结果不可缓存（如参数错误），各自执行
+                return await func(*args, **kwargs)
+            _cache_response.headers["X-Cache"] = "HIT"
+            return loads(payload)
+
+        signature = inspect.signature(func)
+        extra = [
+            inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            inspect.Parameter("_cache_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+            inspect.Parameter(
+                "_cache_user", inspect.Parameter.KEYWORD_ONLY, annotation=Principal, default=Depends(get_current_user)
+            ),
+        ]
+        wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), *extra])
+        return wrapper
+
+    return decorator
+
+
+async def _guarded(awaitable, default=None):
+    try:
+        return await awaitable
+    except BACKEND_ERRORS as exc:
+        logger.warning("response cache backend error: %s", exc)
+        return default
+
+
+_PENDING = "response_cache_namespaces"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flush(session: Session, flush_context) -> None:
+    names: set[str] = set()
+    for obj in chain(session.new, session.deleted, session.dirty):
+        names |= namespaces_for(type(obj))
+    if names:
+        session.info.setdefault(_PENDING, set()).update(names)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_write(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        names = namespaces_for(mapper.class_)
+        if names:
+            orm_execute_state.session.info.setdefault(_PENDING, set()).update(names)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    names = session.info.pop(_PENDING, None)
+    if names:
+        invalidate(names)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def invalidate(namespaces: Iterable[str]) -> None:
+    """使命名空间下的缓存失效；在 AsyncSession 提交流程中同步等待 Redis，其余情况投递为后台任务"""
+    backend = get_backend()
+    if backend is None:
+        return
+    names = sorted(set(namespaces))
+    if isinstance(backend, MemoryCacheBackend):
+        backend.bump(names)
+        return
+    if in_greenlet():
+        try:
+            await_only(backend.invalidate(names))
+        except BACKEND_ERRORS as exc:
+            logger.warning("response cache invalidation failed for %s: %s", names, exc)
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning("response cache invalidation skipped for %s: no running event loop", names)
+        return
+    loop.create_task(_guarded(backend.invalidate(names)))
@@ -1,5 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -18,6 +21,87 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class HashPoolBusy(Exception):
+    """密码哈希队列已满，调用方应返回 503 并提示稍后重试"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("password hash pool is busy")
+        self.retry_after = retry_after
+
+
+class PasswordHashPool:
+    """在独立线程/进程池中执行 bcrypt，限制并发并在排队过深时拒绝新任务"""
+
+    def __init__(self, workers: int, max_queue: int, kind: str = "thread", retry_after: int = 1):
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.kind = kind
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._pending - self.workers)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "inFlight": min(self._pending, self.workers),
+            "queueDepth": self.queue_depth,
+            "maxQueue": self.max_queue,
+            "rejected": self.rejected,
+            "completed": self.completed,
+        }
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HashPoolBusy(self.retry_after)
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None, extra: Optional[dict] = None) -> str:
     to_encode: dict[str, Any] = {"sub": subject}
     if extra:
@@ -25,4 +109,3 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None,
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-
@@ -16,6 +16,80 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # 认证用户主体缓存（按进程），TTL 为 0 时关闭；失效只作用于执行写入的进程，默认关闭，仅单进程部署时开启
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # bcrypt 哈希工作池：thread | process，排队超过上限时登录返回 503
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER: int = 2
+
+    # 角色/权限快照刷新间隔
+    PERMISSION_SNAPSHOT_TTL_SECONDS: float = 60
+
+    # 连接池：MySQL 需保证 DB_POOL_RECYCLE 小于服务端 wait_timeout
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # 只读副本（可选），为空时只读路由仍使用主库
+    READ_REPLICA_URL: str | None = None
+    READ_REPLICA_MAX_LAG_SECONDS: float = 5
+    READ_REPLICA_CHECK_INTERVAL: float = 10
+    READ_REPLICA_RETRY_SECONDS: float = 30
+
+    # 按请求统计 SQL 条数/耗时（X-DB-Statements、X-DB-Time-ms 响应头），慢查询与重复语句告警阈值
+    SQL_INSTRUMENTATION: bool = True
+    SQL_SLOW_QUERY_MS: float = 200
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 10
+
+    # 响应压缩：按 Accept-Encoding 协商 br（需安装 brotli）/ gzip，小于 COMPRESSION_MIN_SIZE 字节的响应不压缩
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # GET 响应缓存：off（默认） | redis 多 worker 共享（需安装 redis） | memory 进程内 LRU，
+    # memory 的失效只作用于处理写请求的进程，仅适用于单进程部署
+    RESPONSE_CACHE_BACKEND: str = "off"
+    RESPONSE_CACHE_REDIS_URL: str = "redis://127.0.0.1:6379/0"
+    RESPONSE_CACHE_TTL_SECONDS: float = 60
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_LOCK_SECONDS: float = 10
+
+    # 流式导出每批从服务端游标读取的行数
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # 病历统计读取按日汇总表 record_daily_stats；关闭时直接对 records 做一次条件聚合
+    RECORD_STATS_ROLLUP: bool = True
+
+    # 病历全文检索使用 SQLite FTS5 / MySQL 5.7.6+ FULLTEXT ngram 索引；关闭或数据库不支持时退回 LIKE
+    RECORD_SEARCH_FULLTEXT: bool = True
+
+    # Server-Timing 响应头；SERVER_TIMING_DEBUG 开启后请求可带 X-Timing-Debug: 1 获取 X-Timing-Detail 明细（含 SQL 语句形状）
+    SERVER_TIMING_ENABLED: bool = True
+    SERVER_TIMING_DEBUG: bool = False
+
+    # 管理员按请求触发的 cProfile 分析（X-Profile 请求头 / _profile 查询参数），报告目录与摘要行数；默认关闭，排查时开启
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str = "profiles"
+    PROFILING_TOP_N: int = 50
+
+    # Prometheus 指标（GET /metrics，需安装 prometheus-client）
+    METRICS_ENABLED: bool = True
+
+    # /internal/*（连接池、哈希线程池、响应缓存状态）与 /metrics 默认关闭（404）；开启后需管理员令牌，
+    # 或请求头 Authorization: Bearer <INTERNAL_ENDPOINTS_TOKEN>（留空则只接受管理员令牌）
+    INTERNAL_ENDPOINTS_ENABLED: bool = False
+    INTERNAL_ENDPOINTS_TOKEN: str = ""
+
+    # 启动时的表结构版本检查：warn 仅告警 | strict 不一致时拒绝启动 | off 跳过
+    DB_SCHEMA_CHECK: str = "warn"
+
     DB_SSL: bool = False
     SSL_CA: str | None = None
     SSL_CERT: str | None = None
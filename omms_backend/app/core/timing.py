@@ -0,0 +1,131 @@
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional
+
+from app.core.settings import settings
+from app.db.instrumentation import QueryStats, current_stats
+
+
+class RequestTimings:
+    """单个请求内各阶段的累计耗时（秒），如 serialize；数据库耗时见 app.db.instrumentation.QueryStats"""
+
+    __slots__ = ("phases",)
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def get(self, phase: str) -> float:
+        return self.phases.get(phase, 0.0)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("omms_request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def start_timings() -> tuple[RequestTimings, Optional[Token]]:
+    """外层中间件已创建时复用；否则新建并返回用于 reset 的 token"""
+    timings = _current.get()
+    if timings is not None:
+        return timings, None
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def finish_timings(token: Optional[Token]) -> None:
+    if token is not None:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+
+# Server-Timing 中各阶段的输出顺序；db 为本请求全部 SQL 的累计耗时，与 auth/permission 中的查询有重叠
+_PHASE_ORDER = ("auth", "permission", "db", "aggregate", "serialize")
+_DEBUG_HEADER = b"x-timing-debug"
+_DEBUG_SHAPES = 5
+
+
+def server_timing_header(timings: RequestTimings, stats: Optional[QueryStats], total: float) -> str:
+    phases = dict(timings.phases)
+    if stats is not None:
+        phases["db"] = stats.db_seconds
+    names = [name for name in _PHASE_ORDER if name in phases] + sorted(set(phases) - set(_PHASE_ORDER))
+    entries = []
+    for name in names:
+        entry = f"{name};dur={phases[name] * 1000:.1f}"
+        if name == "db":
+            entry += f';desc="{stats.statements} statements"'
+        entries.append(entry)
+    entries.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def timing_detail(timings: RequestTimings, stats: Optional[QueryStats], total: float) -> str:
+    detail: dict = {
+        "totalMs": round(total * 1000, 3),
+        "phasesMs": {name: round(seconds * 1000, 3) for name, seconds in timings.phases.items()},
+    }
+    if stats is not None:
+        detail["db"] = {
+            "statements": stats.statements,
+            "timeMs": round(stats.db_seconds * 1000, 3),
+            "slow": stats.slow,
+            "topStatements": [
+                {"count": n, "statement": shape[:200]} for shape, n in stats.shapes.most_common(_DEBUG_SHAPES)
+            ],
+        }
+    # 响应头只能是 latin-1，非 ASCII 字符转义
+    return json.dumps(detail, ensure_ascii=True, separators=(",", ":"))
+
+
+class ServerTimingMiddleware:
+    """为每个 HTTP 响应写入 Server-Timing 头（auth、permission、db、aggregate、serialize 与总耗时 app）；
+    SERVER_TIMING_DEBUG 开启时，带 X-Timing-Debug: 1 请求头的请求额外返回 X-Timing-Detail（JSON，含 SQL 条数与最频繁的语句）。
+    需位于 QueryStatsMiddleware 之内"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SERVER_TIMING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        debug = settings.SERVER_TIMING_DEBUG and any(
+            name == _DEBUG_HEADER and value in (b"1", b"true") for name, value in scope.get("headers", [])
+        )
+        timings, token = start_timings()
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - start
+                stats = current_stats()
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings, stats, total).encode("latin-1")))
+                if debug:
+                    headers.append((b"x-timing-detail", timing_detail(timings, stats, total).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish_timings(token)
@@ -0,0 +1,147 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """归一化语句：合并空白并折叠 IN (...) 占位符列表，用于识别循环内的重复查询"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+class QueryStats:
+    """单个请求内的 SQL 统计"""
+
+    __slots__ = ("statements", "db_seconds", "shapes", "slow")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+        self.slow = 0
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.db_seconds += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("omms_query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("omms_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("omms_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        if stats is not None:
+            stats.slow += 1
+        logger.warning(
+            "slow query elapsed_ms=%.1f statement=%s",
+            elapsed * 1000,
+            _WHITESPACE.sub(" ", statement).strip()[:1000],
+            extra={"db_elapsed_ms": round(elapsed * 1000, 3), "db_statement": statement},
+        )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    target = engine.sync_engine
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """为每个 HTTP 请求统计 SQL 条数与耗时，写入 X-DB-Statements / X-DB-Time-ms 响应头与日志，
+    同一语句形状在单个请求内重复超过 SQL_REPEATED_STATEMENT_THRESHOLD 次时告警（疑似 N+1）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-statements", str(stats.statements).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.db_seconds * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._log(scope, stats, status_code, time.perf_counter() - start)
+
+    @staticmethod
+    def _log(scope, stats: QueryStats, status_code: int, elapsed: float) -> None:
+        method = scope.get("method", "")
+        path = scope.get("path", "")
+        db_ms = round(stats.db_seconds * 1000, 3)
+        logger.info(
+            "request sql method=%s path=%s status=%s statements=%d db_ms=%.1f total_ms=%.1f slow=%d",
+            method,
+            path,
+            status_code,
+            stats.statements,
+            db_ms,
+            elapsed * 1000,
+            stats.slow,
+            extra={
+                "http_method": method,
+                "http_path": path,
+                "http_status": status_code,
+                "db_statements": stats.statements,
+                "db_time_ms": db_ms,
+                "total_ms": round(elapsed * 1000, 3),
+                "db_slow_statements": stats.slow,
+            },
+        )
+        for shape, count in stats.repeated(settings.SQL_REPEATED_STATEMENT_THRESHOLD):
+            logger.warning(
+                "repeated statement (possible N+1) method=%s path=%s count=%d statement=%s",
+                method,
+                path,
+                count,
+                shape[:1000],
+                extra={"http_method": method, "http_path": path, "db_repeat_count": count, "db_statement": shape},
+            )
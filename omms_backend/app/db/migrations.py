@@ -0,0 +1,64 @@
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+
+
+class SchemaOutOfDate(RuntimeError):
+    """数据库结构版本与代码中的迁移 head 不一致"""
+
+
+def alembic_config(url: str | None = None) -> Config:
+    cfg = Config(str(BACKEND_ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(BACKEND_ROOT / "alembic"))
+    if url:
+        cfg.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    return cfg
+
+
+def head_revisions() -> set[str]:
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+async def current_revisions(engine: AsyncEngine) -> set[str]:
+    async with engine.connect() as conn:
+        try:
+            rows = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except exc.DBAPIError:
+            # 尚未执行过任何迁移
+            return set()
+        return {r[0] for r in rows.all()}
+
+
+async def check_schema_version(engine: AsyncEngine) -> None:
+    """启动时只读一行 alembic_version 与迁移 head 比对，不做表结构反射"""
+    mode = settings.DB_SCHEMA_CHECK
+    if mode == "off":
+        return
+    current = await current_revisions(engine)
+    heads = head_revisions()
+    if current == heads:
+        return
+    message = (
+        f"database schema revision {sorted(current) or 'none'} != code head {sorted(heads)}, "
+        "run `alembic upgrade head`"
+    )
+    if mode == "strict":
+        raise SchemaOutOfDate(message)
+    logger.warning(message)
+
+
+def upgrade_to_head(url: str | None = None) -> None:
+    """同步执行 alembic upgrade head（供部署脚本与 scripts/init_db.py 调用）"""
+    command.upgrade(alembic_config(url), "head")
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """记录连接获取等待时间与超时次数的连接池"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                if waited > self.wait_seconds_max:
+                    self.wait_seconds_max = waited
+
+
+def pool_stats(pool: Pool) -> dict:
+    data: dict = {"pool": pool.__class__.__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        data.update(
+            {
+                "size": pool.size(),
+                "checkedIn": pool.checkedin(),
+                "checkedOut": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+                "maxOverflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        )
+    if isinstance(pool, InstrumentedAsyncPool):
+        checkouts = pool.checkouts
+        data.update(
+            {
+                "checkouts": checkouts,
+                "checkoutTimeouts": pool.checkout_timeouts,
+                "waitSecondsTotal": round(pool.wait_seconds_total, 6),
+                "waitSecondsAvg": round(pool.wait_seconds_total / checkouts, 6) if checkouts else 0.0,
+                "waitSecondsMax": round(pool.wait_seconds_max, 6),
+            }
+        )
+    return data
@@ -1,27 +1,145 @@
-from typing import AsyncGenerator
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.settings import settings
-from app.models import Base
+from app.db.instrumentation import instrument_engine
+from app.db.pool import InstrumentedAsyncPool
+
+
+logger = logging.getLogger(__name__)
+
+
+def engine_options(url: str) -> dict:
+    opts: dict = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        # 内存 SQLite 使用方言默认的单连接池
+        return opts
+    opts.update(
+        {
+            "poolclass": InstrumentedAsyncPool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+        }
+    )
+    return opts
 
 
 engine = create_async_engine(
     settings.database_url,
-    pool_pre_ping=True,
+    **engine_options(settings.database_url),
     echo=False,
     future=True,
     connect_args=settings.connect_args(),
 )
 
+instrument_engine(engine)
+
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+read_engine: Optional[AsyncEngine] = None
+if settings.READ_REPLICA_URL:
+    read_engine = create_async_engine(
+        settings.READ_REPLICA_URL,
+        **engine_options(settings.READ_REPLICA_URL),
+        echo=False,
+        future=True,
+        connect_args=settings.connect_args(),
+    )
+    instrument_engine(read_engine)
+
+AsyncReadSessionLocal = async_sessionmaker(read_engine or engine, expire_on_commit=False)
+
+# 连接只读副本的会话在 session.info 中带此标记
+REPLICA_SESSION = "read_replica"
+
+
+class ReplicaState:
+    """只读副本健康与延迟状态：故障后在 READ_REPLICA_RETRY_SECONDS 内回退主库，
+    延迟超过 READ_REPLICA_MAX_LAG_SECONDS 时同样回退主库"""
+
+    def __init__(self):
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self.lag_seconds: Optional[float] = None
+        self.lag_ok = True
+
+    def mark_down(self, reason: object) -> None:
+        self.down_until = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+        self.checked_at = 0.0
+        logger.warning("read replica unavailable, falling back to primary: %s", reason)
+
+    async def check(self) -> None:
+        async with read_engine.connect() as conn:
+            lag: Optional[float] = None
+            if conn.dialect.name == "mysql":
+                try:
+                    row = (await conn.execute(text("SHOW SLAVE STATUS"))).mappings().first()
+                except exc.DBAPIError:
+                    # 无 REPLICATION CLIENT 权限时无法获取延迟，只做连通性检查
+                    row = None
+                if row is not None:
+                    lag = row.get("Seconds_Behind_Master")
+                    if lag is None:
+                        raise RuntimeError("replication is not running")
+            else:
+                await conn.execute(text("SELECT 1"))
+        self.lag_seconds = None if lag is None else float(lag)
+        self.lag_ok = self.lag_seconds is None or self.lag_seconds <= settings.READ_REPLICA_MAX_LAG_SECONDS
+
+    async def usable(self) -> bool:
+        if read_engine is None:
+            return False
+        now = time.monotonic()
+        if now < self.down_until:
+            return False
+        if now - self.checked_at >= settings.READ_REPLICA_CHECK_INTERVAL:
+            self.checked_at = now
+            try:
+                await self.check()
+            except Exception as e:
+                self.mark_down(e)
+                return False
+        return self.lag_ok
+
+
+replica_state = ReplicaState()
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
 
 
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """只读路由使用的会话：副本可用且延迟在阈值内时连接副本，否则连接主库"""
+    if await replica_state.usable():
+        session = AsyncReadSessionLocal()
+        try:
+            # 先借出副本连接：两次健康检查之间副本宕机或拒绝连接时在此失败，本次请求改用主库
+            await session.connection()
+        except exc.DBAPIError as e:
+            await session.close()
+            replica_state.mark_down(e)
+        else:
+            session.info[REPLICA_SESSION] = True
+            async with session:
+                try:
+                    yield session
+                except exc.DBAPIError as e:
+                    if e.connection_invalidated:
+                        replica_state.mark_down(e)
+                    raise
+            return
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+# 在依赖注入之外（如流式导出的生成器内）使用只读会话
+read_session_scope = asynccontextmanager(get_read_session)
@@ -0,0 +1,20 @@
+from typing import Iterable
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+
+def increment_upsert(connection, table: Table, keys: Iterable[str], counters: Iterable[str], rows: list[dict]) -> None:
+    """按主键 keys 插入计数行，已存在时各计数列累加本次的值（可为负），用于增量维护汇总表"""
+    keys, counters = list(keys), list(counters)
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update({name: table.c[name] + stmt.inserted[name] for name in counters})
+    else:
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: table.c[name] + stmt.excluded[name] for name in counters},
+        )
+    connection.execute(stmt, rows)
@@ -7,8 +7,9 @@ Base = declarative_base()
 from .user import User
 from .patient import Patient
 from .appointment import Appointment
-from .record import MedicalRecord as Record
+from .record import MedicalRecord as Record, RecordDailyStat, RecordDictionaryEntry
 from .medicine import Medicine
 from .inventory import InventoryBatch, InventoryLog, MedicineStock
 from .prescription import Prescription, PrescriptionItem
 from .supplier import Supplier, SupplierOrder, SupplierOrderItem
+from .resource_version import ResourceVersion
@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime
 
-from sqlalchemy import Integer, String, Text, Date, Time, DateTime, ForeignKey
+from sqlalchemy import Integer, String, Text, Date, Time, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models import Base
@@ -15,7 +15,7 @@ class Department(Base):
     dept_name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True, index=True)
     description: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     parent_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    sort_order: Mapped[int] = mapped_column(Integer, default=0)
+    sort_order: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, default=datetime.now)
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, onupdate=datetime.now)
     
@@ -47,6 +47,7 @@ class Doctor(Base):
 class Schedule(Base):
     """医生排班表模型"""
     __tablename__ = "doctor_schedules"
+    __table_args__ = (Index("ix_doctor_schedules_doctor_id_work_date", "doctor_id", "work_date"),)
     
     schedule_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     doctor_id: Mapped[int] = mapped_column(Integer, ForeignKey("doctors.doctor_id"), nullable=False, index=True)
@@ -67,6 +68,13 @@ class Schedule(Base):
 class Appointment(Base):
     """预约表模型"""
     __tablename__ = "appointments"
+    __table_args__ = (
+        # 排班已约数量：schedule_id = ? AND status != 2
+        Index("ix_appointments_schedule_id_status", "schedule_id", "status"),
+        # 重复预约检查：patient_id = ? AND appt_time = ?；患者预约列表按 appt_time 排序
+        Index("ix_appointments_patient_id_appt_time", "patient_id", "appt_time"),
+        Index("ix_appointments_doctor_id_appt_time", "doctor_id", "appt_time"),
+    )
     
     appt_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     patient_id: Mapped[int] = mapped_column(Integer, ForeignKey("patients.patient_id"), nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models import Base
@@ -6,6 +6,7 @@ from app.models import Base
 
 class InventoryBatch(Base):
     __tablename__ = "inventory_batches"
+    __table_args__ = (Index("ix_inventory_batches_expiry_date", "expiry_date"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     medicine_id = Column(BigInteger, ForeignKey("medicines.medicine_id"), nullable=False, index=True)
@@ -20,6 +21,7 @@ class InventoryBatch(Base):
 
 class InventoryLog(Base):
     __tablename__ = "inventory_logs"
+    __table_args__ = (Index("ix_inventory_logs_type_id", "type", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     type = Column(String(8), nullable=False)  # 'in' | 'out'
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models import Base
@@ -6,6 +6,11 @@ from app.models import Base
 
 class Prescription(Base):
     __tablename__ = "pharmacy_prescriptions"
+    __table_args__ = (
+        Index("ix_pharmacy_prescriptions_status_created_at", "status", "created_at"),
+        # 报表按 created_at 区间统计
+        Index("ix_pharmacy_prescriptions_created_at", "created_at"),
+    )
 
     id = Column(String(32), primary_key=True)
     patient = Column(String(50), nullable=False)
@@ -1,6 +1,7 @@
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Integer, String, Text
+from sqlalchemy import Boolean, Date, DateTime, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models import Base
@@ -8,12 +9,21 @@ from app.models import Base
 
 class MedicalRecord(Base):
     __tablename__ = "records"
+    __table_args__ = (
+        # 列表按科室/医生/状态筛选后按 created_at 倒序
+        Index("ix_records_dept_id_created_at", "dept_id", "created_at"),
+        Index("ix_records_doctor_id_created_at", "doctor_id", "created_at"),
+        Index("ix_records_status_created_at", "status", "created_at"),
+        Index("ix_records_has_lab_created_at", "has_lab", "created_at"),
+        Index("ix_records_has_imaging_created_at", "has_imaging", "created_at"),
+    )
     id: Mapped[str] = mapped_column(String(24), primary_key=True)
     dept_id: Mapped[int] = mapped_column(Integer, index=True)
     doctor_id: Mapped[int] = mapped_column(Integer, index=True)
     patient_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     patient_name: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, index=True)
-    created_at: Mapped[str] = mapped_column(String(19), index=True)
+    # 接口中以 "YYYY-MM-DD HH:MM" 字符串收发，库中为 DATETIME，按日期筛选走范围条件
+    created_at: Mapped[datetime] = mapped_column(DateTime, index=True)
     status: Mapped[str] = mapped_column(String(20), index=True, default="draft")
     template_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
     chief_complaint: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -21,6 +31,40 @@ class MedicalRecord(Base):
     prescriptions_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     labs_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     imaging_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # labs_json / imaging_json 是否非空，写入时随之维护，列表按检验/影像筛选时走索引
+    has_lab: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text("0"))
+    has_imaging: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text("0"))
+
+
+class RecordDailyStat(Base):
+    """按 (日期, 科室, 医生) 汇总的病历数，随病历写入增量维护，统计接口按区间读取汇总行而不扫描 records"""
+    __tablename__ = "record_daily_stats"
+    __table_args__ = (
+        Index("ix_record_daily_stats_dept_id_day", "dept_id", "day"),
+        Index("ix_record_daily_stats_doctor_id_day", "doctor_id", "day"),
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    dept_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    doctor_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    total: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    draft: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    finalized: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    cancelled: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    with_lab: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    with_imaging: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+
+
+class RecordDictionaryEntry(Base):
+    """病历与模板默认值中出现过的检验/影像项目及引用次数，随病历、模板写入增量维护，词典接口直接读取"""
+    __tablename__ = "record_dictionary"
+    __table_args__ = (
+        Index("ix_record_dictionary_kind_usage_count", "kind", "usage_count"),
+    )
+    # labs / imaging
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)
+    # MySQL 5.5 InnoDB 索引长度上限 767 字节，utf8mb4 下 (kind, name) 共 720 字节
+    name: Mapped[str] = mapped_column(String(160), primary_key=True)
+    usage_count: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
 
 
 class RecordTemplate(Base):
@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from sqlalchemy import Integer, String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class ResourceVersion(Base):
+    """读多写少资源的版本号：写入时递增，用于生成 ETag / Last-Modified"""
+    __tablename__ = "resource_versions"
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
@@ -170,9 +170,10 @@ class AppointmentOut(BaseModel):
 # 响应模型
 class DepartmentListData(BaseModel):
     list: List[DepartmentOut]
-    total: int
+    total: Optional[int] = None
     page: int
     pageSize: int
+    nextCursor: Optional[str] = None
 
 
 class DepartmentListResponse(BaseModel):
@@ -189,9 +190,10 @@ class DepartmentResponse(BaseModel):
 
 class DoctorListData(BaseModel):
     list: List[DoctorOut]
-    total: int
+    total: Optional[int] = None
     page: int
     pageSize: int
+    nextCursor: Optional[str] = None
 
 
 class DoctorListResponse(BaseModel):
@@ -208,9 +210,10 @@ class DoctorResponse(BaseModel):
 
 class ScheduleListData(BaseModel):
     list: List[ScheduleOut]
-    total: int
+    total: Optional[int] = None
     page: int
     pageSize: int
+    nextCursor: Optional[str] = None
 
 
 class ScheduleListResponse(BaseModel):
@@ -219,11 +222,29 @@ class ScheduleListResponse(BaseModel):
     data: Optional[ScheduleListData]
 
 
+class AppointmentListItem(BaseModel):
+    """预约列表项；按 fields 参数只返回请求的字段"""
+    apptId: int
+    patientId: Optional[int] = None
+    patientName: Optional[str] = None
+    doctorId: Optional[int] = None
+    doctorName: Optional[str] = None
+    deptId: Optional[int] = None
+    deptName: Optional[str] = None
+    scheduleId: Optional[int] = None
+    apptTime: Optional[str] = None
+    status: Optional[int] = None
+    symptomDesc: Optional[str] = None
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+
+
 class AppointmentListData(BaseModel):
-    list: List[AppointmentOut]
-    total: int
+    list: List[AppointmentListItem]
+    total: Optional[int] = None
     page: int
     pageSize: int
+    nextCursor: Optional[str] = None
 
 
 class AppointmentListResponse(BaseModel):
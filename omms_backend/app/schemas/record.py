@@ -83,19 +83,20 @@ class TemplateUpdate(BaseModel):
 
 
 class MedicalRecordOut(BaseModel):
+    """病历列表项；按 fields 参数只返回请求的字段"""
     id: str
-    patient: str
-    department: str
-    doctor: str
-    createdAt: str
-    status: str
-    hasLab: bool
-    hasImaging: bool
-    chiefComplaint: str
-    diagnosis: str
-    prescriptions: List[str]
-    labs: List[str]
-    imaging: List[str]
+    patient: Optional[str] = None
+    department: Optional[str] = None
+    doctor: Optional[str] = None
+    createdAt: Optional[str] = None
+    status: Optional[str] = None
+    hasLab: Optional[bool] = None
+    hasImaging: Optional[bool] = None
+    chiefComplaint: Optional[str] = None
+    diagnosis: Optional[str] = None
+    prescriptions: Optional[List[str]] = None
+    labs: Optional[List[str]] = None
+    imaging: Optional[List[str]] = None
 
 
 class RecordsListData(BaseModel):
@@ -173,7 +174,7 @@ class RecordsStatsData(BaseModel):
 class RecordsStatsResponse(BaseModel):
     code: int
     message: str
-    data: RecordsStatsData
+    data: Optional[RecordsStatsData]
 
 class DictionariesData(BaseModel):
     imaging: List[str]
@@ -1,25 +1,21 @@
 # server.py
-import json
-from typing import Any
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import APIRouter, Depends, FastAPI, Response
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import get_api_router
-from app.db.session import init_db
-
-# 设置响应编码，确保中文正确显示
-class UTF8JSONResponse(JSONResponse):
-    def render(self, content: Any) -> bytes:
-        return json.dumps(
-            jsonable_encoder(content),
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-        ).encode("utf-8")
+from app.db.session import AsyncSessionLocal, engine
+from app.db.migrations import check_schema_version
+from app.db.pool import pool_stats
+from app.db.instrumentation import QueryStatsMiddleware
+from app.core.permissions import permission_snapshot, require_internal_access
+from app.core.security import hash_pool
+from app.core.response import UTF8JSONResponse
+from app.core.compression import CompressionMiddleware
+from app.core.response_cache import close_backend, response_cache_stats
+from app.core.timing import ServerTimingMiddleware
+from app.core.profiling import ProfilerMiddleware
+from app.core.metrics import MetricsMiddleware, mark_worker_dead, metrics_enabled, render_metrics
 
 app = FastAPI(
     title="OMMS",
@@ -42,16 +38,54 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Statements", "X-DB-Time-ms", "Server-Timing", "X-Timing-Detail"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ProfilerMiddleware)
 
 @app.on_event("startup")
 async def on_startup():
-    await init_db()
+    await check_schema_version(engine)
+    async with AsyncSessionLocal() as session:
+        await permission_snapshot.ensure_fresh(session)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    hash_pool.shutdown()
+    await close_backend()
+    mark_worker_dead()
 
 @app.get("/health")
 async def health():
     return {"code": 200, "message": "success", "data": "ok"}
 
+# 运行状态与指标暴露连接池、缓存键与各路由流量，不对公网开放，见 require_internal_access
+internal = APIRouter(include_in_schema=False, dependencies=[Depends(require_internal_access)])
+
+@internal.get("/internal/db-pool")
+async def db_pool_stats():
+    return {"code": 200, "message": "success", "data": pool_stats(engine.pool)}
+
+@internal.get("/internal/hash-pool")
+async def hash_pool_stats():
+    return {"code": 200, "message": "success", "data": hash_pool.stats()}
+
+@internal.get("/internal/response-cache")
+async def response_cache_status():
+    return {"code": 200, "message": "success", "data": await response_cache_stats()}
+
+@internal.get("/metrics")
+async def metrics():
+    if not metrics_enabled():
+        return Response("metrics disabled\n", status_code=503, media_type="text/plain")
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+app.include_router(internal)
+
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui():
     return get_swagger_ui_html(
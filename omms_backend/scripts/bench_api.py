@@ -0,0 +1,226 @@
+"""并发压测主要接口，输出每个路由的吞吐与 p50/p95/p99 延迟，结果写入 JSON 便于与上一次对比
+
+先用 init_db.py 按目标规模灌数据并启动服务（基准应关闭响应缓存，否则测到的是缓存命中）：
+
+    python scripts/init_db.py --sqlite --appointments 1000000 --records 500000 --prescriptions 200000
+    RESPONSE_CACHE_BACKEND=off uvicorn app.server:app --workers 4
+    python scripts/bench_api.py --concurrency 32 --requests 500 --output bench/after.json --compare bench/before.json
+
+也可以不启动服务，用 --asgi 在进程内直接驱动应用（只测应用本身，单进程，不含网络与 uvicorn 开销），
+此时通过 DATABASE_URL 指定与 init_db.py 相同的库。
+--compare 指定的上一次结果中，p95 变慢或吞吐下降超过 --threshold 百分比的路由会被标出，
+配合 --fail-on-regression 以非零状态退出，可用于 CI。
+"""
+import sys
+import json
+import time
+import logging
+import asyncio
+import argparse
+import os
+import platform
+import subprocess
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def default_routes() -> list[tuple[str, str]]:
+    """(名称, 路径)；日期参数按今天计算，与 init_db.py 的数据分布（最近一年）一致"""
+    today = date.today()
+    month_ago = today - timedelta(days=30)
+    return [
+        ("appointments", "/api/appointments?page=1&pageSize=20"),
+        ("appointments deep page", "/api/appointments?page=200&pageSize=20"),
+        ("appointments cursor", "/api/appointments?pageSize=20&totalMode=none"),
+        ("appointments by doctor", "/api/appointments?doctorId=1&pageSize=20"),
+        ("records", "/api/records?page=1&pageSize=20"),
+        ("records deep page", "/api/records?page=200&pageSize=20"),
+        ("records sparse fields", "/api/records?page=1&pageSize=20&fields=patient,status,createdAt"),
+        ("records-ext", "/api/records-ext?page=1&pageSize=20"),
+        ("records stats", "/api/records/stats"),
+        ("records dictionaries", "/api/records/dictionaries"),
+        ("departments", "/api/departments"),
+        ("doctors", "/api/doctors?page=1&pageSize=20"),
+        ("schedules", f"/api/schedules?workDate={today + timedelta(days=3)}"),
+        ("medicines", "/api/pharmacy/medicines?page=1&pageSize=20"),
+        ("prescriptions", "/api/pharmacy/prescriptions?page=1&pageSize=20"),
+        ("report daily visits", f"/api/reports/daily/visits?date={today - timedelta(days=3)}"),
+        ("report daily drugs", f"/api/reports/daily/drugs?date={today - timedelta(days=3)}"),
+        ("report custom 30d", f"/api/reports/custom?dateStart={month_ago}&dateEnd={today}"),
+    ]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+async def run_route(client, path: str, headers: dict, requests: int, concurrency: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await client.get(path, headers=headers)
+
+    latencies: list[float] = []
+    errors = 0
+    statuses: dict[str, int] = {}
+    total_bytes = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors, total_bytes
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                r = await client.get(path, headers=headers)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            total_bytes += len(r.content)
+            key = str(r.status_code)
+            # 业务错误以 HTTP 200 + code 返回，一并统计
+            if r.status_code == 200 and r.headers.get("content-type", "").startswith("application/json"):
+                code = r.json().get("code")
+                if code not in (None, 200):
+                    key = f"200/code={code}"
+            statuses[key] = statuses.get(key, 0) + 1
+            if key != "200":
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "meanMs": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50Ms": round(percentile(latencies, 50), 2),
+        "p95Ms": round(percentile(latencies, 95), 2),
+        "p99Ms": round(percentile(latencies, 99), 2),
+        "maxMs": round(latencies[-1], 2) if latencies else 0.0,
+        "avgBytes": int(total_bytes / len(latencies)) if latencies else 0,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current: dict, previous: dict, threshold: float) -> list[str]:
+    """返回退化的路由名；同时打印每个路由 p95 与吞吐的变化"""
+    regressions = []
+    print(f"\ncompared with {previous.get('startedAt')} (commit {previous.get('commit')}):")
+    for name, cur in current["routes"].items():
+        prev = previous.get("routes", {}).get(name)
+        if not prev or not prev.get("p95Ms") or not prev.get("rps"):
+            print(f"  {name:<26} (no previous result)")
+            continue
+        p95_delta = (cur["p95Ms"] - prev["p95Ms"]) / prev["p95Ms"] * 100
+        rps_delta = (cur["rps"] - prev["rps"]) / prev["rps"] * 100
+        flag = ""
+        if p95_delta > threshold or rps_delta < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<26} p95 {prev['p95Ms']:>8.1f} -> {cur['p95Ms']:>8.1f} ms ({p95_delta:+6.1f}%)   rps {prev['rps']:>8.1f} -> {cur['rps']:>8.1f} ({rps_delta:+6.1f}%){flag}")
+    return regressions
+
+
+async def login(client, username: str, password: str) -> str:
+    r = await client.post("/api/auth/login", json={"username": username, "password": password})
+    body = r.json()
+    if body.get("code") != 200:
+        raise SystemExit(f"login failed: {body.get('message')}")
+    return body["data"]["accessToken"]
+
+
+async def run(args) -> dict:
+    import httpx
+
+    if args.asgi:
+        from app.server import app
+
+        # 进程内运行时应用日志（含慢查询告警）会淹没结果表
+        logging.getLogger("app").setLevel(logging.ERROR)
+
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+    else:
+        transport = None
+        base_url = args.base_url
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        token = args.token or await login(client, args.username, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        routes = default_routes()
+        if args.only:
+            routes = [(name, path) for name, path in routes if any(key in name for key in args.only)]
+        results = {}
+        print(f"{'route':<26} {'reqs':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+        for name, path in routes:
+            res = await run_route(client, path, headers, args.requests, args.concurrency, args.warmup)
+            results[name] = res
+            print(f"{name:<26} {res['requests']:>6} {res['errors']:>4} {res['rps']:>8.1f} {res['p50Ms']:>8.1f} {res['p95Ms']:>8.1f} {res['p99Ms']:>8.1f}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench_api", description="Concurrent API benchmark with per-route latency percentiles")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--asgi", action="store_true", help="drive app.server:app in-process instead of over HTTP")
+    parser.add_argument("--username", default="admin@omms")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--token", default=None)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per route")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--only", nargs="*", help="run routes whose name contains any of these strings")
+    parser.add_argument("--output", default=None, help="result JSON path (default bench/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="previous result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    started = datetime.now()
+    routes = asyncio.run(run(args))
+    result = {
+        "startedAt": started.isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "target": "asgi" if args.asgi else args.base_url,
+        "python": platform.python_version(),
+        "concurrency": args.concurrency,
+        "requestsPerRoute": args.requests,
+        "database": os.environ.get("DATABASE_URL", "").split("@")[-1] or None,
+        "routes": routes,
+    }
+    output = Path(args.output or ROOT / "bench" / f"{started:%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(result, previous, args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"\n{len(regressions)} route(s) regressed by more than {args.threshold:.0f}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
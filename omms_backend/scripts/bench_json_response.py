@@ -0,0 +1,122 @@
+"""对比 JSON 响应序列化方式在大病历列表上的耗时
+
+    python scripts/bench_json_response.py --rows 5000 --repeat 20
+
+- legacy：响应模型序列化为 Python 对象后，jsonable_encoder + json.dumps（原 server.UTF8JSONResponse）
+- orjson：响应模型序列化为 Python 对象后，orjson 一次序列化（app.core.response.UTF8JSONResponse）
+- pydantic dump_json：响应模型直接由 pydantic-core 序列化为 JSON 字节（FastAPI 未设置自定义响应类时的路径，作参照）
+- 另外对比直接渲染 ok(pydantic 模型列表)（未声明 response_model 的路由，FastAPI 仍会先执行一次 jsonable_encoder）
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def build_payload(rows: int):
+    from app.core.response import ok
+    from app.schemas.record import MedicalRecordOut, RecordsListData
+
+    items = [
+        MedicalRecordOut(
+            id=f"MR{i:010d}",
+            patient=f"患者{i}",
+            department="心内科",
+            doctor=f"医生{i % 50}",
+            createdAt="2026-10-17 09:30",
+            status="finalized",
+            hasLab=i % 2 == 0,
+            hasImaging=i % 3 == 0,
+            chiefComplaint="反复胸闷、气短一周，活动后加重",
+            diagnosis="冠状动脉粥样硬化性心脏病",
+            prescriptions=["阿司匹林肠溶片 100mg qd", "阿托伐他汀钙片 20mg qn"],
+            labs=["血常规", "肝功能", "血脂"],
+            imaging=["心电图"],
+        )
+        for i in range(rows)
+    ]
+    return ok(RecordsListData(list=items, total=rows, page=1, pageSize=rows))
+
+
+def legacy_render(content) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def bench(fn, repeat: int) -> tuple[float, float]:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, min(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench_json_response", description="Benchmark JSON response rendering")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from pydantic import TypeAdapter
+    from app.core.response import UTF8JSONResponse, orjson
+    from app.schemas.record import RecordsListResponse
+
+    if orjson is None:
+        raise SystemExit("orjson is not installed")
+
+    payload = build_payload(args.rows)
+    adapter = TypeAdapter(RecordsListResponse)
+    fast = UTF8JSONResponse(None)
+
+    def model_legacy():
+        return legacy_render(adapter.dump_python(adapter.validate_python(payload), mode="json", by_alias=True))
+
+    def model_orjson():
+        return fast.render(adapter.dump_python(adapter.validate_python(payload), mode="json", by_alias=True))
+
+    def model_dump_json():
+        return adapter.dump_json(adapter.validate_python(payload), by_alias=True)
+
+    def raw_legacy():
+        return legacy_render(payload)
+
+    def raw_orjson():
+        return fast.render(payload)
+
+    assert json.loads(model_legacy()) == json.loads(model_orjson()) == json.loads(model_dump_json())
+    assert json.loads(raw_legacy()) == json.loads(raw_orjson())
+    assert "患者" in model_orjson().decode("utf-8")
+
+    size = len(model_orjson())
+    print(f"rows={args.rows} body={size / 1024:.0f} KiB repeat={args.repeat} (median / min ms)")
+    cases = [
+        ("response_model + legacy", model_legacy),
+        ("response_model + orjson", model_orjson),
+        ("response_model + pydantic dump_json", model_dump_json),
+        ("ok(models) + legacy", raw_legacy),
+        ("ok(models) + orjson", raw_orjson),
+    ]
+    baseline = {}
+    for name, fn in cases:
+        median, best = bench(fn, args.repeat)
+        group = name.split(" + ")[0]
+        baseline.setdefault(group, median)
+        print(f"  {name:<38} {median:8.1f} {best:8.1f}   x{baseline[group] / median:.1f}")
+
+
+if __name__ == "__main__":
+    main()
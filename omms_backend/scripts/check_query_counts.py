@@ -0,0 +1,258 @@
+"""检查各接口每个请求执行的 SQL 条数：不超过登记的上限，且不随结果行数增长（N+1 回归检测）
+
+在临时 SQLite 库中按两种规模（默认每类 3 行与 12 行，写接口的明细条数同样放大）灌入数据，
+分别在子进程中启动应用并请求 ENDPOINTS 中的每个接口，读取 X-DB-Statements 响应头。
+任一接口超过上限、两种规模下条数不同或响应不是 code=200 时以非零状态退出。
+
+    python scripts/check_query_counts.py
+    python scripts/check_query_counts.py --small 5 --large 40
+
+新增接口时在 ENDPOINTS 中登记路径与上限；列表接口请用足够大的 pageSize，使返回行数随规模变化。
+"""
+import sys
+import json
+import asyncio
+import argparse
+import os
+import subprocess
+import tempfile
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+TODAY = date.today()
+
+# (方法, 路径, 请求体, 每个请求允许的最多 SQL 条数)；写接口放在最后，按顺序执行。
+# 请求体可以是以规模 n 为参数的函数，使明细条数随规模放大。病历与模板的写入会触发 etag、按日汇总与词典
+# 三个 after_flush 钩子，检验/影像项目数随规模增长，钩子中出现逐项查询时两种规模的条数会不同
+ENDPOINTS = [
+    ("POST", "/api/auth/login", {"username": "admin", "password": "check-password"}, 2),
+    ("GET", "/api/auth/me", None, 1),
+    ("GET", "/api/departments?pageSize=100", None, 3),
+    ("GET", "/api/departments/1", None, 2),
+    ("GET", "/api/doctors?pageSize=100", None, 3),
+    ("GET", "/api/doctors/1", None, 2),
+    ("GET", "/api/schedules?pageSize=100", None, 3),
+    ("GET", "/api/appointments?pageSize=100", None, 2),
+    ("GET", "/api/appointments/1", None, 2),
+    ("GET", "/api/patients?pageSize=100", None, 2),
+    ("GET", "/api/patients/1", None, 1),
+    ("GET", "/api/records?pageSize=100", None, 4),
+    ("GET", "/api/records-ext?pageSize=100", None, 4),
+    ("GET", "/api/records?hasLab=true&hasImaging=true&pageSize=100", None, 4),
+    ("GET", "/api/records/search?q=偏头痛&pageSize=100", None, 4),
+    ("GET", "/api/records/R0000000001", None, 3),
+    ("GET", "/api/records/stats", None, 1),
+    ("GET", "/api/records/dictionaries", None, 2),
+    ("GET", "/api/records/dictionaries/labs", None, 2),
+    ("GET", "/api/records/dictionaries/imaging", None, 2),
+    ("GET", "/api/record-templates", None, 2),
+    ("GET", "/api/pharmacy/medicines?pageSize=100", None, 3),
+    ("GET", "/api/pharmacy/inventory/batches", None, 2),
+    ("GET", "/api/pharmacy/inventory/logs", None, 2),
+    ("GET", "/api/pharmacy/prescriptions", None, 2),
+    ("GET", "/api/pharmacy/suppliers", None, 2),
+    ("GET", "/api/pharmacy/orders", None, 2),
+    ("GET", f"/api/reports/daily/visits?date={TODAY}", None, 1),
+    ("GET", f"/api/reports/daily/drugs?date={TODAY}", None, 3),
+    ("GET", f"/api/reports/custom?dateStart={TODAY}&dateEnd={TODAY}", None, 2),
+    ("POST", "/api/records", lambda n: {
+        "deptId": 1, "doctorId": 1, "patientId": 1, "patientName": "患者1", "chiefComplaint": "头痛", "diagnosis": "偏头痛",
+        "prescriptions": ["药品1"], "labs": [f"新检验{i}" for i in range(n)], "imaging": [f"新影像{i}" for i in range(n)],
+        "templateId": 1,
+    }, 8),
+    ("PUT", "/api/records/R0000000001", lambda n: {"labs": [f"改检验{i}" for i in range(n)], "imaging": [], "diagnosis": "紧张性头痛"}, 7),
+    ("PATCH", "/api/records/R0000000001/status", {"status": "finalized"}, 3),
+    ("DELETE", "/api/records/R0000000002", None, 3),
+    ("POST", "/api/record-templates", lambda n: {"name": "检查模板", "scope": "通用", "fields": ["chiefComplaint"],
+        "defaults": {"labs": [f"模板检验{i}" for i in range(n)], "imaging": ["胸片"]}}, 4),
+    ("PUT", "/api/record-templates/1", lambda n: {"defaults": {"labs": [f"模板改检验{i}" for i in range(n)], "imaging": []}}, 4),
+    ("DELETE", "/api/record-templates/1000", None, 5),
+    ("POST", "/api/appointments", {
+        "patientId": 1, "doctorId": 1, "scheduleId": 1, "apptTime": f"{TODAY} 11:30:00", "symptomDesc": "发热",
+    }, 8),
+    ("PUT", "/api/appointments/1", {"symptomDesc": "头痛加重"}, 3),
+    ("PATCH", "/api/appointments/2/status", {"status": 1}, 4),
+    ("PATCH", "/api/pharmacy/prescriptions/RX-CHECK/status", {"status": "dispensed"}, 7),
+    ("PATCH", "/api/pharmacy/orders/PO-CHECK/status", {"status": "completed"}, 8),
+    ("POST", "/api/pharmacy/orders", lambda n: {"supplierId": 1, "items": [{"medicineId": i, "qty": 5} for i in range(1, n + 1)]}, 7),
+]
+
+
+async def seed(n: int) -> None:
+    """每类实体 n 行；RX-CHECK 处方与 PO-CHECK 订单各含 n 条明细"""
+    from sqlalchemy import insert
+    from app.core.record_dictionary import rebuild_record_dictionary
+    from app.core.record_stats import rebuild_record_daily_stats
+    from app.core.security import get_password_hash
+    from app.db.session import engine
+    from app.models.user import User
+    from app.models.patient import Patient
+    from app.models.appointment import Department, Doctor, Schedule, Appointment
+    from app.models.medicine import Medicine
+    from app.models.inventory import InventoryBatch, InventoryLog, MedicineStock
+    from app.models.prescription import Prescription, PrescriptionItem
+    from app.models.record import MedicalRecord, RecordTemplate
+    from app.models.supplier import Supplier, SupplierOrder, SupplierOrderItem
+
+    now = datetime.combine(TODAY, time(10, 0))
+    ids = range(1, n + 1)
+    tables = [
+        (User, [{"user_id": 1, "username": "admin", "password": get_password_hash("check-password"), "status": 1, "role_id": 1}]
+            + [{"user_id": 100 + i, "username": f"doctor{i}", "password": "x", "status": 1, "role_id": 2} for i in ids]
+            + [{"user_id": 1000 + i, "username": f"patient{i}", "password": "x", "status": 1, "role_id": 3} for i in ids]),
+        (Department, [{"dept_id": i, "dept_name": f"科室{i}", "sort_order": i} for i in ids]),
+        (Doctor, [{"doctor_id": i, "user_id": 100 + i, "doctor_name": f"医生{i}", "dept_id": i, "available_status": 1} for i in ids]),
+        (Patient, [{"patient_id": i, "user_id": 1000 + i, "name": f"患者{i}"} for i in ids]),
+        (Schedule, [
+            {"schedule_id": i, "doctor_id": i, "work_date": TODAY, "start_time": time(8, 0), "end_time": time(12, 0),
+             "max_appointments": 20, "booked": 1, "status": 1}
+            for i in ids
+        ]),
+        (Appointment, [
+            {"appt_id": i, "patient_id": i, "doctor_id": i, "schedule_id": i, "appt_time": now + timedelta(minutes=i),
+             "status": 0, "symptom_desc": "头痛"}
+            for i in ids
+        ]),
+        (RecordTemplate, [{"id": i, "name": f"模板{i}", "scope": f"科室{i}", "fields_json": "[]", "defaults_json": "{}"} for i in ids]
+            + [{"id": 1000, "name": "未引用模板", "scope": "通用", "fields_json": "[]",
+                "defaults_json": json.dumps({"labs": ["检验1"]}, ensure_ascii=False)}]),
+        (MedicalRecord, [
+            {"id": f"R{i:010d}", "dept_id": i, "doctor_id": i, "patient_id": i, "patient_name": f"患者{i}",
+             "created_at": now, "status": "draft", "template_id": i,
+             "chief_complaint": "头痛", "diagnosis": "偏头痛",
+             "prescriptions_json": json.dumps([f"药品{i}"], ensure_ascii=False),
+             "labs_json": json.dumps([f"检验{i}"], ensure_ascii=False),
+             "imaging_json": json.dumps([f"影像{i}"], ensure_ascii=False),
+             "has_lab": True, "has_imaging": True}
+            for i in ids
+        ]),
+        (Medicine, [
+            {"medicine_id": i, "medicine_name": f"药品{i}", "specification": "10mg", "dosage_form": "片剂",
+             "manufacturer": "厂家", "unit": "盒", "price": 10, "warning_stock": 10}
+            for i in ids
+        ]),
+        (MedicineStock, [{"stock_id": i, "medicine_id": i, "current_stock": 1000} for i in ids]),
+        (InventoryBatch, [{"id": i, "medicine_id": i, "batch_no": f"B{i}", "quantity": 100, "received_at": TODAY} for i in ids]),
+        (InventoryLog, [{"id": i, "type": "in", "medicine_id": i, "quantity": 100, "time": now} for i in ids]),
+        (Supplier, [{"id": i, "name": f"供应商{i}"} for i in ids]),
+        (Prescription, [
+            {"id": f"RX-{i:04d}", "patient": f"患者{i}", "department": f"科室{i}", "doctor": f"医生{i}", "created_at": now, "status": "pending"}
+            for i in ids
+        ] + [{"id": "RX-CHECK", "patient": "患者1", "department": "科室1", "doctor": "医生1", "created_at": now, "status": "approved"}]),
+        (PrescriptionItem, [
+            {"prescription_id": f"RX-{i:04d}", "medicine_id": i, "name": f"药品{i}", "qty": 1, "unit": "盒", "price": 10}
+            for i in ids
+        ] + [{"prescription_id": "RX-CHECK", "medicine_id": i, "name": f"药品{i}", "qty": 1, "unit": "盒", "price": 10} for i in ids]),
+        (SupplierOrder, [
+            {"id": f"PO-{i:04d}", "supplier_id": i, "created_at": now, "status": "completed", "amount": 100}
+            for i in ids
+        ] + [{"id": "PO-CHECK", "supplier_id": 1, "created_at": now, "status": "pending", "amount": 100}]),
+        (SupplierOrderItem, [
+            {"order_id": f"PO-{i:04d}", "medicine_id": i, "name": f"药品{i}", "qty": 10, "unit": "盒", "price": 10}
+            for i in ids
+        ] + [{"order_id": "PO-CHECK", "medicine_id": i, "name": f"药品{i}", "qty": 10, "unit": "盒", "price": 10} for i in ids]),
+    ]
+    async with engine.begin() as conn:
+        for model, values in tables:
+            await conn.execute(insert(model), values)
+        await conn.run_sync(rebuild_record_daily_stats)
+        await conn.run_sync(rebuild_record_dictionary)
+    await engine.dispose()
+
+
+async def measure(n: int) -> dict:
+    import httpx
+    from app.server import app
+    from app.core.security import create_access_token
+
+    await seed(n)
+    headers = {"Authorization": f"Bearer {create_access_token('1')}"}
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://check") as client:
+        # 预热用户主体缓存，之后的请求不再计入加载用户的查询
+        await client.get("/api/auth/me", headers=headers)
+        for method, path, body, _ in ENDPOINTS:
+            if callable(body):
+                body = body(n)
+            r = await client.request(method, path, headers=headers, json=body)
+            code = r.json().get("code") if r.headers.get("content-type", "").startswith("application/json") else None
+            results[f"{method} {path}"] = {
+                "status": r.status_code,
+                "code": code,
+                "statements": int(r.headers.get("x-db-statements", -1)),
+            }
+    return results
+
+
+def run_worker(n: int) -> None:
+    # 子进程：DATABASE_URL 已由父进程设置，应用导入时按其建立引擎
+    from app.db.migrations import upgrade_to_head
+
+    upgrade_to_head(os.environ["DATABASE_URL"])
+    print(json.dumps(asyncio.run(measure(n))))
+
+
+def measure_in_subprocess(n: int, tmp_dir: str) -> dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{Path(tmp_dir, f'query_counts_{n}.db').as_posix()}",
+        "RESPONSE_CACHE_BACKEND": "off",
+        # 上限只统计路由自身的语句：开启主体缓存，使鉴权的 users 查询只出现在首个请求
+        "PRINCIPAL_CACHE_TTL_SECONDS": "3600",
+        "SQL_INSTRUMENTATION": "true",
+        "READ_REPLICA_URL": "",
+    }
+    out = subprocess.run(
+        [sys.executable, __file__, "--worker", str(n)], env=env, capture_output=True, text=True, cwd=ROOT
+    )
+    if out.returncode != 0:
+        sys.stderr.write(out.stderr)
+        raise SystemExit(f"worker for scale {n} failed")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="check_query_counts", description="Assert per-endpoint SQL statement budgets that do not grow with result size"
+    )
+    parser.add_argument("--small", type=int, default=3, help="rows per entity in the small dataset")
+    parser.add_argument("--large", type=int, default=12, help="rows per entity in the large dataset")
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        small = measure_in_subprocess(args.small, tmp_dir)
+        large = measure_in_subprocess(args.large, tmp_dir)
+
+    failures = 0
+    print(f"{'endpoint':<72} {'max':>4} {args.small:>5} {args.large:>5}")
+    for method, path, _, budget in ENDPOINTS:
+        key = f"{method} {path}"
+        a, b = small[key], large[key]
+        problems = []
+        for res in (a, b):
+            if res["status"] != 200 or res["code"] not in (None, 200):
+                problems.append(f"status={res['status']} code={res['code']}")
+        if max(a["statements"], b["statements"]) > budget:
+            problems.append("over budget")
+        if a["statements"] != b["statements"]:
+            problems.append("grows with result rows")
+        mark = "ok" if not problems else "FAIL " + ", ".join(dict.fromkeys(problems))
+        print(f"{key:<72} {budget:>4} {a['statements']:>5} {b['statements']:>5}  {mark}")
+        failures += bool(problems)
+
+    if failures:
+        print(f"\n{failures} endpoint(s) failed the statement budget check")
+        sys.exit(1)
+    print("\nall endpoints within their statement budgets")
+
+
+if __name__ == "__main__":
+    main()
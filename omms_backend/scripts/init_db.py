@@ -5,7 +5,7 @@ import asyncio
 import re
 import argparse
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -51,8 +51,11 @@ def reset_schema_with_sql(settings_obj, sql_path: Path) -> None:
     conn.close()
 
 
-def migrate_schema_with_mysql(settings_obj) -> None:
+def drop_app_tables(settings_obj) -> None:
+    """全量重置前删除模型表与 alembic_version，之后由迁移从头建表"""
     import pymysql
+    from app.models import Base
+
     conn = pymysql.connect(
         host=settings_obj.MYSQL_SERVER,
         user=settings_obj.MYSQL_USER,
@@ -60,70 +63,21 @@ def migrate_schema_with_mysql(settings_obj) -> None:
         database=settings_obj.MYSQL_DB,
         port=settings_obj.MYSQL_PORT,
         charset="utf8mb4",
-        autocommit=False,
+        autocommit=True,
     )
     cur = conn.cursor()
-    def table_exists(name: str) -> bool:
-        cur.execute("SHOW TABLES LIKE %s", (name,))
-        return cur.fetchone() is not None
-    def column_exists(table: str, column: str) -> bool:
-        cur.execute(f"SHOW COLUMNS FROM `{table}` LIKE %s", (column,))
-        return cur.fetchone() is not None
-    if table_exists("departments"):
-        if not column_exists("departments", "parent_id"):
-            cur.execute("ALTER TABLE departments ADD COLUMN parent_id BIGINT(20) NULL DEFAULT NULL AFTER description")
-        if not column_exists("departments", "sort_order"):
-            cur.execute("ALTER TABLE departments ADD COLUMN sort_order INT(11) NULL DEFAULT 0 AFTER parent_id")
-    if table_exists("doctors"):
-        if not column_exists("doctors", "doctor_name"):
-            if column_exists("doctors", "name"):
-                cur.execute("ALTER TABLE doctors CHANGE COLUMN name doctor_name VARCHAR(50) NOT NULL")
-            else:
-                cur.execute("ALTER TABLE doctors ADD COLUMN doctor_name VARCHAR(50) NOT NULL AFTER user_id")
-        if not column_exists("doctors", "dept_id"):
-            cur.execute("ALTER TABLE doctors ADD COLUMN dept_id BIGINT(20) NULL AFTER doctor_name")
-            try:
-                cur.execute("ALTER TABLE doctors ADD INDEX idx_doctors_dept_id (dept_id)")
-            except Exception:
-                pass
-            try:
-                cur.execute("ALTER TABLE doctors ADD CONSTRAINT doctors_ibfk_2 FOREIGN KEY (dept_id) REFERENCES departments(dept_id) ON DELETE RESTRICT ON UPDATE RESTRICT")
-            except Exception:
-                pass
-            try:
-                cur.execute("UPDATE doctors d LEFT JOIN departments dep ON dep.dept_name = d.department SET d.dept_id = dep.dept_id")
-            except Exception:
-                pass
-        if column_exists("doctors", "intro") and not column_exists("doctors", "introduction"):
-            cur.execute("ALTER TABLE doctors CHANGE COLUMN intro introduction TEXT NULL")
-        if column_exists("doctors", "department"):
-            try:
-                cur.execute("ALTER TABLE doctors DROP COLUMN department")
-            except Exception:
-                pass
-    if table_exists("doctor_schedules"):
-        if not column_exists("doctor_schedules", "booked"):
-            cur.execute("ALTER TABLE doctor_schedules ADD COLUMN booked INT(11) NULL DEFAULT 0 AFTER max_appointments")
-    if table_exists("appointments"):
-        if not column_exists("appointments", "schedule_id"):
-            cur.execute("ALTER TABLE appointments ADD COLUMN schedule_id BIGINT(20) NULL AFTER doctor_id")
-            try:
-                cur.execute("ALTER TABLE appointments ADD INDEX idx_appointments_schedule_id (schedule_id)")
-            except Exception:
-                pass
-            try:
-                cur.execute("ALTER TABLE appointments ADD CONSTRAINT appointments_ibfk_3 FOREIGN KEY (schedule_id) REFERENCES doctor_schedules(schedule_id) ON DELETE CASCADE ON UPDATE RESTRICT")
-            except Exception:
-                pass
-    conn.commit()
+    cur.execute("SET FOREIGN_KEY_CHECKS=0")
+    for table in [*Base.metadata.tables, "alembic_version"]:
+        cur.execute(f"DROP TABLE IF EXISTS `{table}`")
+    cur.execute("SET FOREIGN_KEY_CHECKS=1")
     cur.close()
     conn.close()
 
 
 async def seed_app_tables(
-    init_db_func, session_factory, engine_obj, seed_count: int = 20
+    session_factory, engine_obj, seed_count: int = 20
 ) -> None:
-    from sqlalchemy import delete, text
+    from sqlalchemy import delete, inspect, text
     from app.models.record import MedicalRecord, RecordTemplate
     from app.models.appointment import Department, Doctor, Schedule, Appointment
     from app.models.patient import Patient
@@ -133,7 +87,6 @@ async def seed_app_tables(
         def _pwd_hash(p: str) -> str:
             return p
 
-    await init_db_func()
     async with session_factory() as session:
         await session.execute(delete(MedicalRecord))
         await session.execute(delete(RecordTemplate))
@@ -153,6 +106,7 @@ async def seed_app_tables(
         await session.execute(delete(Prescription))
         await session.execute(delete(InventoryLog))
         await session.execute(delete(InventoryBatch))
+        await session.execute(delete(MedicineStock))
         await session.execute(delete(Medicine))
         await session.execute(delete(Supplier))
         await session.commit()
@@ -426,8 +380,12 @@ async def seed_app_tables(
         await session.commit()
 
         nurse_uid = await upsert_user("nurse001", "omms123", "nurse001@omms", "王护士", 4)
-        res_nurse = await session.execute(text("SELECT nurse_id FROM nurses WHERE user_id=:uid"), {"uid": nurse_uid})
-        if not res_nurse.first():
+        # nurses 表只存在于 docs/omms.sql 建的库中，SQLite 等仅按模型迁移的库没有该表
+        has_nurses = await session.run_sync(lambda s: inspect(s.connection()).has_table("nurses"))
+        res_nurse = None
+        if has_nurses:
+            res_nurse = await session.execute(text("SELECT nurse_id FROM nurses WHERE user_id=:uid"), {"uid": nurse_uid})
+        if res_nurse is not None and not res_nurse.first():
             await session.execute(
                 text(
                     """
@@ -457,7 +415,7 @@ async def seed_app_tables(
                 user_id=pat001_uid,
                 name="王小明",
                 gender=1,
-                birthday="1990-01-01",
+                birthday=date(1990, 1, 1),
                 id_card="110101199001010001",
                 created_at=now_dt,
                 updated_at=now_dt,
@@ -479,7 +437,7 @@ async def seed_app_tables(
             year = random.randint(1965, 2015)
             month = random.randint(1, 12)
             day = random.randint(1, 28)
-            birthday = f"{year:04d}-{month:02d}-{day:02d}"
+            birthday = date(year, month, day)
             id_card = f"110101{year:04d}{month:02d}{day:02d}{random.randint(1000,9999)}"
             pat = Patient(
                 user_id=uid,
@@ -570,8 +528,8 @@ async def seed_app_tables(
                 if p.patient_id == ap.patient_id:
                     pat = p
                     break
-            created_at = (now_dt - timedelta(days=random.randint(0, 30), hours=random.randint(0, 12))).strftime("%Y-%m-%d %H:%M")
-            rid = f"MR-{created_at[:10].replace('-', '')}-{random.randint(100000,999999)}"
+            created_at = (now_dt - timedelta(days=random.randint(0, 30), hours=random.randint(0, 12))).replace(second=0, microsecond=0)
+            rid = f"MR-{created_at:%Y%m%d}-{random.randint(100000,999999)}"
             scope_name = None
             for dept in dept_objs:
                 if dept.dept_id == dept_id:
@@ -597,6 +555,8 @@ async def seed_app_tables(
                 prescriptions_json=json.dumps(pres, ensure_ascii=False),
                 labs_json=json.dumps(labs, ensure_ascii=False),
                 imaging_json=json.dumps(imgs, ensure_ascii=False),
+                has_lab=bool(labs),
+                has_imaging=bool(imgs),
             )
             rec_objs.append(rec)
         session.add_all(rec_objs)
@@ -626,7 +586,9 @@ async def seed_app_tables(
             price = round(random.uniform(5.0, 60.0), 2)
             warn = random.randint(20, 80)
             stock = random.randint(0, 200)
+            # BigInteger 主键在 SQLite 上不会自增，显式指定
             m = Medicine(
+                medicine_id=i + 1,
                 medicine_name=nm,
                 specification=sp,
                 dosage_form="片剂",
@@ -640,8 +602,8 @@ async def seed_app_tables(
             med_objs.append(m)
         session.add_all(med_objs)
         await session.commit()
-        for m in med_objs:
-            stock_objs.append(MedicineStock(medicine_id=m.medicine_id, current_stock=random.randint(0, 200)))
+        for idx, m in enumerate(med_objs, start=1):
+            stock_objs.append(MedicineStock(stock_id=idx, medicine_id=m.medicine_id, current_stock=random.randint(0, 200)))
         session.add_all(stock_objs)
         await session.commit()
 
@@ -758,6 +720,144 @@ async def seed_app_tables(
         session.add_all(rx_items)
         await session.commit()
 
+    await rebuild_rollups(engine_obj)
+    await engine_obj.dispose()
+
+
+BULK_BATCH_SIZE = 5000
+
+
+async def _insert_batches(session, model, make_row, total: int, label: str, after_batch=None) -> None:
+    from sqlalchemy import insert
+
+    done = 0
+    while done < total:
+        n = min(BULK_BATCH_SIZE, total - done)
+        await session.execute(insert(model), [make_row(done + i + 1) for i in range(n)])
+        if after_batch is not None:
+            await after_batch()
+        await session.commit()
+        done += n
+        if done % (BULK_BATCH_SIZE * 20) == 0 or done == total:
+            print(f"  {label}: {done}/{total}", flush=True)
+
+
+async def rebuild_rollups(engine_obj) -> None:
+    """病历按日汇总表与检验/影像词典表按最终数据重算；批量写入与清表不经过 ORM 的增量维护"""
+    from app.core.record_dictionary import rebuild_record_dictionary
+    from app.core.record_stats import rebuild_record_daily_stats
+
+    async with engine_obj.begin() as conn:
+        await conn.run_sync(rebuild_record_daily_stats)
+        await conn.run_sync(rebuild_record_dictionary)
+
+
+async def seed_bulk(
+    session_factory,
+    engine_obj,
+    appointments: int = 0,
+    records: int = 0,
+    prescriptions: int = 0,
+    days: int = 365,
+    seed: int = 42,
+) -> None:
+    """在演示数据之上按生产规模追加预约、病历与处方（含明细），供 scripts/bench_api.py 压测；
+    引用已有的医生、排班、患者与药品，时间分布在最近 days 天内，固定随机种子保证可复现"""
+    from sqlalchemy import insert, select
+    from app.models.appointment import Appointment, Department, Doctor, Schedule
+    from app.models.medicine import Medicine
+    from app.models.patient import Patient
+    from app.models.prescription import Prescription, PrescriptionItem
+    from app.models.record import MedicalRecord, RecordTemplate
+
+    rng = random.Random(seed)
+    async with session_factory() as session:
+        schedules = (await session.execute(select(Schedule.schedule_id, Schedule.doctor_id))).all()
+        doctors = {d_id: (name, dept_id) for d_id, name, dept_id in (await session.execute(select(Doctor.doctor_id, Doctor.doctor_name, Doctor.dept_id))).all()}
+        depts = dict((await session.execute(select(Department.dept_id, Department.dept_name))).all())
+        patients = (await session.execute(select(Patient.patient_id, Patient.name))).all()
+        tpl_by_scope = dict((await session.execute(select(RecordTemplate.scope, RecordTemplate.id))).all())
+        meds = (await session.execute(select(Medicine.medicine_id, Medicine.medicine_name, Medicine.unit, Medicine.price))).all()
+        if not (schedules and patients and meds):
+            raise SystemExit("bulk seeding needs the demo data; run without --mode migrate first")
+
+        day_start = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
+
+        def random_time() -> datetime:
+            return day_start - timedelta(days=rng.randrange(days)) + timedelta(minutes=rng.randrange(0, 570, 10))
+
+        def appointment_row(n: int) -> dict:
+            schedule_id, doctor_id = rng.choice(schedules)
+            appt_time = random_time()
+            return {
+                "patient_id": rng.choice(patients)[0],
+                "doctor_id": doctor_id,
+                "schedule_id": schedule_id,
+                "appt_time": appt_time,
+                "status": rng.choice([0, 1, 2]),
+                "symptom_desc": rng.choice(["发热咳嗽", "腹痛", "头痛", "乏力", "皮疹", "牙痛", "视物模糊", "鼻塞流涕"]),
+                "created_at": appt_time - timedelta(days=rng.randint(1, 7)),
+                "updated_at": appt_time,
+            }
+
+        def record_row(n: int) -> dict:
+            doctor_id = rng.choice(schedules)[1]
+            _, dept_id = doctors[doctor_id]
+            patient_id, patient_name = rng.choice(patients)
+            created = random_time()
+            labs = rng.choice([["血常规"], ["肝肾功能"], []])
+            imgs = rng.choice([["胸片"], ["牙片"], []])
+            return {
+                "id": f"MR-{created:%Y%m%d}-B{n:07d}",
+                "dept_id": dept_id,
+                "doctor_id": doctor_id,
+                "patient_id": patient_id,
+                "patient_name": patient_name,
+                "created_at": created.replace(second=0, microsecond=0),
+                "status": rng.choice(["draft", "finalized", "cancelled"]),
+                "template_id": tpl_by_scope.get(depts.get(dept_id)),
+                "chief_complaint": rng.choice(["发热伴咳嗽", "腹痛", "头痛", "皮疹", "胸闷心悸", "关节疼痛", "牙龈肿痛"]),
+                "diagnosis": rng.choice(["上呼吸道感染", "胃炎", "偏头痛", "皮炎", "心律不齐", "关节炎", "龋齿"]),
+                "prescriptions_json": json.dumps(rng.choice([["对乙酰氨基酚"], ["布洛芬"], ["阿莫西林"], []]), ensure_ascii=False),
+                "labs_json": json.dumps(labs, ensure_ascii=False),
+                "imaging_json": json.dumps(imgs, ensure_ascii=False),
+                "has_lab": bool(labs),
+                "has_imaging": bool(imgs),
+            }
+
+        rx_items: list[dict] = []
+
+        def prescription_row(n: int) -> dict:
+            doctor_name, dept_id = doctors[rng.choice(schedules)[1]]
+            created = random_time()
+            rx_id = f"RX-{created:%Y%m%d}-B{n:07d}"
+            for _ in range(rng.randint(1, 3)):
+                med_id, med_name, unit, price = rng.choice(meds)
+                rx_items.append(
+                    {"prescription_id": rx_id, "medicine_id": med_id, "name": med_name, "qty": rng.randint(1, 3), "unit": unit, "price": float(price)}
+                )
+            return {
+                "id": rx_id,
+                "patient": rng.choice(patients)[1],
+                "department": depts.get(dept_id) or "内科",
+                "doctor": doctor_name,
+                "created_at": created,
+                "status": rng.choice(["pending", "approved", "dispensed"]),
+            }
+
+        if appointments:
+            await _insert_batches(session, Appointment, appointment_row, appointments, "appointments")
+        if records:
+            await _insert_batches(session, MedicalRecord, record_row, records, "medical_records")
+        if prescriptions:
+            # 明细随所属处方同批写入，避免在内存中累积全部明细
+            async def insert_items() -> None:
+                await session.execute(insert(PrescriptionItem), rx_items)
+                rx_items.clear()
+
+            await _insert_batches(session, Prescription, prescription_row, prescriptions, "pharmacy_prescriptions", insert_items)
+
+    await rebuild_rollups(engine_obj)
     await engine_obj.dispose()
 
 
@@ -773,6 +873,12 @@ def main() -> None:
     parser.add_argument("--sqlite", action="store_true")
     parser.add_argument("--dsn", default=None)
     parser.add_argument("--seed-count", type=int, default=20)
+    # 压测规模：在演示数据之上追加的行数，如 --appointments 1000000 --records 500000
+    parser.add_argument("--appointments", type=int, default=0)
+    parser.add_argument("--records", type=int, default=0)
+    parser.add_argument("--prescriptions", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365, help="bulk rows are spread over the last N days")
+    parser.add_argument("--random-seed", type=int, default=42)
     args = parser.parse_args()
 
     if args.dsn:
@@ -783,19 +889,34 @@ def main() -> None:
         )
 
     from app.core.settings import settings as settings_obj
+    from app.db.migrations import upgrade_to_head
     from app.db.session import (
-        init_db as init_db_func,
         AsyncSessionLocal as session_factory,
         engine as engine_obj,
     )
 
     if args.mode == "full" and not args.skip_sql:
+        drop_app_tables(settings_obj)
         reset_schema_with_sql(settings_obj, Path(args.sql))
-    else:
-        migrate_schema_with_mysql(settings_obj)
+    # 表结构统一由 alembic 迁移管理（含旧库字段补丁，见 alembic/versions）
+    upgrade_to_head(settings_obj.database_url)
+    if args.mode == "migrate":
+        return
     asyncio.run(
-        seed_app_tables(init_db_func, session_factory, engine_obj, args.seed_count)
+        seed_app_tables(session_factory, engine_obj, args.seed_count)
     )
+    if args.appointments or args.records or args.prescriptions:
+        asyncio.run(
+            seed_bulk(
+                session_factory,
+                engine_obj,
+                appointments=args.appointments,
+                records=args.records,
+                prescriptions=args.prescriptions,
+                days=args.days,
+                seed=args.random_seed,
+            )
+        )
 
 
 if __name__ == "__main__":